@@ -0,0 +1,52 @@
+# bulk_format.py
+"""
+Row formatting for native bulk loaders.
+
+PostgreSQL COPY ... FROM STDIN (text format) and MySQL LOAD DATA share the same
+tab-separated layout: \\N for NULL, one row per line, and backslash escapes for the
+separator, line breaks and the backslash itself. Only the encoding of binary values
+differs, hence the binary_prefix argument.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Any, Iterable, Optional
+
+_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def text_value(value: Any, binary_prefix: Optional[str] = '\\\\x') -> str:
+    """
+    One field in tab-separated bulk-load text format.
+
+    Args:
+        value: The Python value to write.
+        binary_prefix: Prefix written before hex-encoded bytes ('\\\\x' is PostgreSQL bytea
+                       hex input with the backslash escaped). None writes bytes as
+                       escaped latin-1 text instead.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        raw = bytes(value)
+        if binary_prefix is None:
+            return raw.decode('latin-1').translate(_ESCAPES)
+        return binary_prefix + raw.hex()
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        # Interval input as timedelta normalises it: '-1 days 3600 seconds' is 23 hours back
+        seconds = f"{value.seconds}.{value.microseconds:06d}" if value.microseconds else str(value.seconds)
+        return f"{value.days} days {seconds} seconds"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return str(value).translate(_ESCAPES)
+
+
+def write_text_rows(buffer, rows: Iterable[Iterable[Any]], binary_prefix: Optional[str] = '\\\\x') -> None:
+    """Append rows (sequences of values) to a text buffer, one line per row."""
+    write = buffer.write
+    for row in rows:
+        write('\t'.join([text_value(v, binary_prefix) for v in row]))
+        write('\n')
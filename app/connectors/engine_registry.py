@@ -0,0 +1,101 @@
+# engine_registry.py
+"""
+Process-wide registry of SQLAlchemy engines for target endpoints.
+
+Creating an engine per task (and disposing it when the task ends) throws away the
+pool's warm connections, so every task start pays TCP/TLS setup and login again.
+Engines are instead shared by every connector in the worker process that connects to
+the same endpoint with the same engine options; a connector's disconnect only returns
+its connection to the pool.
+
+Pool and driver tuning comes from the endpoint's pool options (config['pool']):
+
+    size                  pool_size (default 5)
+    max_overflow          connections allowed beyond size (default 10)
+    pre_ping              test connections on checkout (default True)
+    recycle               seconds after which a pooled connection is replaced (default 1800)
+    timeout               seconds to wait for a free connection (default 30)
+    statement_cache_size  SQLAlchemy compiled statement cache; also the Oracle driver
+                          statement cache (stmtcachesize)
+    fetch_size            rows per fetch round trip (Oracle arraysize)
+    batch_size            rows per multi-row INSERT of an executemany; PostgreSQL also
+                          pages executemany UPDATE/DELETE through execute_batch
+    connect_args          extra keyword arguments for the DBAPI connect()
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_engines: Dict[Tuple[str, str], Engine] = {}
+_lock = threading.Lock()
+_owner_pid: Optional[int] = None
+
+
+def engine_options(dialect_name: str, pool: Optional[Dict[str, Any]],
+                   connect_args: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """create_engine keyword arguments for a dialect from an endpoint's pool options."""
+    pool = pool or {}
+    options: Dict[str, Any] = {
+        'pool_size': int(pool.get('size', 5)),
+        'max_overflow': int(pool.get('max_overflow', 10)),
+        'pool_pre_ping': bool(pool.get('pre_ping', True)),
+        'pool_recycle': int(pool.get('recycle', 1800)),
+        'pool_timeout': float(pool.get('timeout', 30)),
+    }
+    connect_args = {**(connect_args or {}), **(pool.get('connect_args') or {})}
+
+    if pool.get('statement_cache_size') is not None:
+        options['query_cache_size'] = int(pool['statement_cache_size'])
+        if dialect_name == 'oracle':
+            connect_args.setdefault('stmtcachesize', int(pool['statement_cache_size']))
+    if pool.get('fetch_size') and dialect_name == 'oracle':
+        options['arraysize'] = int(pool['fetch_size'])
+    if pool.get('batch_size'):
+        options['insertmanyvalues_page_size'] = int(pool['batch_size'])
+        if dialect_name == 'postgresql':
+            options['executemany_mode'] = 'values_plus_batch'
+            options['executemany_batch_page_size'] = int(pool['batch_size'])
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+
+def get_engine(url: str, options: Dict[str, Any]) -> Engine:
+    """
+    The shared engine for (url, options), created on first use.
+
+    Pools don't survive a fork, so a child process (e.g. a prefork Celery worker)
+    starts with an empty registry instead of using engines inherited from its parent.
+    """
+    global _owner_pid
+    key = (url, json.dumps(options, sort_keys=True, default=str))
+    with _lock:
+        if _owner_pid != os.getpid():
+            _engines.clear()
+            _owner_pid = os.getpid()
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = create_engine(url, **options)
+            logger.info(f"Created pooled engine for {engine.url.render_as_string(hide_password=True)} "
+                        f"(pool_size={options.get('pool_size')}, max_overflow={options.get('max_overflow')}).")
+        return engine
+
+
+def dispose_all() -> None:
+    """Close the pooled connections of every registered engine and forget the engines."""
+    with _lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        try:
+            engine.dispose()
+        except Exception as e:
+            logger.warning(f"Error disposing engine {engine.url.render_as_string(hide_password=True)}: {e}")
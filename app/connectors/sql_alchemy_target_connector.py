@@ -1,26 +1,96 @@
 # sql_alchemy_target_connector.py (or add to interfaces.py)
 
-from sqlalchemy import create_engine, text, inspect, MetaData, Table, Column # Added Column
+from sqlalchemy import create_engine, text, inspect, select, MetaData, Table, Column, DateTime, Integer, String, Text # Added Column
 #from sqlalchemy.dialects.oracle import oracledb
+import pymysql
 import oracledb
 from sqlalchemy.engine import Engine, Connection
+from sqlalchemy.schema import (AddConstraint, CreateIndex, DropConstraint, DropIndex, ForeignKeyConstraint, Index,
+                               PrimaryKeyConstraint, UniqueConstraint)
+from sqlalchemy.types import NullType, TypeEngine
 from sqlalchemy.exc import SQLAlchemyError, NoSuchTableError
 # --- Add imports for expression language ---
-from sqlalchemy.sql import insert, update, delete # Removed bindparam as not used yet
-from typing import Any, Dict, List, Optional
+from sqlalchemy.sql import insert, update, delete, bindparam
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+import hashlib
+import importlib
+import io
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from inspect import Parameter, signature
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from contextlib import contextmanager
 
 # Assuming interfaces.py is in the same directory or adjust import path
 from app.interfaces import TargetConnector
+from app.services.cdc.compaction import compact_changes
 # --- Import the schema converter ---
 from .schema_converter import BasicSqlAlchemyConverter # Adjust import if needed
+from .bulk_format import write_text_rows
+from . import engine_registry
 from flask import current_app
 
+# ER_NOT_ALLOWED_COMMAND, ER_CLIENT_LOCAL_FILES_DISABLED, CR_LOAD_DATA_LOCAL_INFILE_REJECTED
+_MYSQL_LOCAL_INFILE_REFUSED = (1148, 3948, 2068)
+
+
+def _oracle_input_size(values: Iterable[Any]) -> Any:
+    """setinputsizes() entry for one bind position, from the values it will receive."""
+    kind, size = None, 0
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, str):
+            value_kind, size = 'str', max(size, len(value))
+        elif isinstance(value, (bytes, bytearray)):
+            value_kind, size = 'bytes', max(size, len(value))
+        elif isinstance(value, datetime):
+            value_kind = 'timestamp'
+        elif isinstance(value, date):
+            value_kind = 'date'
+        elif isinstance(value, (int, float, Decimal)):
+            value_kind = 'number'
+        else:
+            return None
+        if kind not in (None, value_kind):
+            return None  # mixed types: let the driver decide
+        kind = value_kind
+    if kind == 'str':
+        return size if size <= 4000 else oracledb.DB_TYPE_LONG
+    if kind == 'bytes':
+        return oracledb.DB_TYPE_RAW if size <= 2000 else oracledb.DB_TYPE_LONG_RAW
+    return {'timestamp': oracledb.DB_TYPE_TIMESTAMP, 'date': oracledb.DB_TYPE_DATE,
+            'number': oracledb.DB_TYPE_NUMBER}.get(kind)
+
+
+def _oracle_input_sizes(rows: List[Any]):
+    """Bind sizes for a whole array, so a leading NULL or short value doesn't force re-binds."""
+    if not rows:
+        return []
+    if isinstance(rows[0], dict):
+        return {name: _oracle_input_size(row.get(name) for row in rows) for name in rows[0]}
+    return [_oracle_input_size(row[i] for row in rows) for i in range(len(rows[0]))]
+
+
 class SqlAlchemyTargetConnector(TargetConnector):
     """
     TargetConnector implementation using SQLAlchemy Core.
     Aims to support multiple standard SQL databases (Oracle, MySQL, Postgres, etc.).
     """
 
+    # Bytes handed to the driver per read while streaming a COPY buffer
+    COPY_READ_SIZE = 1 << 20
+
     def __init__(self):
         self.config: Dict[str, Any] = {}
         self.engine: Optional[Engine] = None
@@ -28,6 +98,25 @@ class SqlAlchemyTargetConnector(TargetConnector):
         self.metadata: MetaData = MetaData()
         # --- Instantiate the schema converter ---
         self.schema_converter: BasicSqlAlchemyConverter = BasicSqlAlchemyConverter()
+        # Counters reported through get_apply_metrics
+        self._apply_metrics: Dict[str, Any] = {'rejected_rows': 0, 'statement_cache_hits': 0,
+                                               'statement_cache_misses': 0}
+        # LRU of parameterized apply statements per run key (see _statement_for)
+        self._statement_cache: 'OrderedDict[Tuple, Tuple[Any, Optional[str], Optional[Tuple[str, ...]]]]' = OrderedDict()
+        # MySQL initial load path state (see _mysql_bulk_insert)
+        self._load_file = None
+        self._mysql_local_infile_refused: bool = False
+        self._mysql_max_packet: Optional[int] = None
+        # Reused COPY buffer of the PostgreSQL initial load path
+        self._copy_buffer: io.StringIO = io.StringIO()
+        # Checkpoint table of config 'checkpoint_table' (see read_checkpoint)
+        self._checkpoint_table: Optional[Table] = None
+        # Loaded-range table of config 'load_range_table' (see loaded_ranges)
+        self._load_range_table: Optional[Table] = None
+        # Per-task staging tables used by _apply_via_staging
+        self._staging_metadata: MetaData = MetaData()
+        # Set while load_transaction() is open; initial load chunks then join that transaction
+        self._in_load_transaction: bool = False
 
     def _get_connection_string(self) -> str:
         """Generate SQLAlchemy connection string from config."""
@@ -64,7 +153,12 @@ class SqlAlchemyTargetConnector(TargetConnector):
             raise ValueError(f"Unsupported database type for SQLAlchemy target: {db_type}")
 
     def connect(self, config: Dict[str, Any]) -> None:
-        """Establish connection using SQLAlchemy."""
+        """
+        Establish connection using SQLAlchemy.
+
+        The engine comes from the process-wide engine registry, so connectors of the same
+        endpoint share one pool tuned by config['pool'] (see engine_registry).
+        """
         if self.engine:
             self.disconnect()
 
@@ -74,8 +168,14 @@ class SqlAlchemyTargetConnector(TargetConnector):
             # Add this line before creating engines (only needed if using thick mode)
             #oracledb.init_oracle_client()
 
-            # Consider engine options like pool_size, max_overflow, etc. for production
-            self.engine = create_engine(conn_str)
+            connect_args = {}
+            # Client side of LOAD DATA LOCAL INFILE, only when chosen explicitly: with it enabled the
+            # server may ask the client for any file the worker can read
+            if self.config.get('type') == 'mysql' and self.config.get('mysql_bulk_mode') == 'load_data':
+                connect_args['local_infile'] = True
+            dialect_name = {'postgres': 'postgresql'}.get(self.config.get('type'), self.config.get('type'))
+            self.engine = engine_registry.get_engine(
+                conn_str, engine_registry.engine_options(dialect_name, self.config.get('pool'), connect_args))
             # Establish a connection to test validity
             self.connection = self.engine.connect()
             current_app.logger.info(f"Successfully connected to {self.config.get('type')} target.") # Replace with logging
@@ -86,7 +186,7 @@ class SqlAlchemyTargetConnector(TargetConnector):
             raise
 
     def disconnect(self) -> None:
-        """Dispose engine and close connection."""
+        """Return the connection to the shared pool; the engine stays registered for reuse."""
         if self.connection:
             try:
                 self.connection.close()
@@ -94,24 +194,40 @@ class SqlAlchemyTargetConnector(TargetConnector):
                 current_app.logger.error(f"Error closing SQLAlchemy connection: {e}") # Replace with logging
             finally:
                 self.connection = None
-        if self.engine:
+        self.engine = None
+        if self._load_file:
+            self._load_file.close()
             try:
-                self.engine.dispose()
-            except SQLAlchemyError as e:
-                current_app.logger.error(f"Error disposing SQLAlchemy engine: {e}") # Replace with logging
-            finally:
-                self.engine = None
+                os.remove(self._load_file.name)
+            except OSError:
+                pass
+            self._load_file = None
+        self._statement_cache.clear()
+        self._checkpoint_table = None
+        self._load_range_table = None
         self.config = {}
         current_app.logger.info("Disconnected from SQLAlchemy target.") # Replace with logging
 
+    def _cached_table(self, schema_name: Optional[str], table_name: str) -> Optional[Table]:
+        """Table already in self.metadata, under the given or the dialect-normalized name."""
+        names = [table_name]
+        if self.engine is not None and self.engine.dialect.requires_name_normalize:
+            names.append(self.engine.dialect.normalize_name(table_name))
+        for name in names:
+            table = self.metadata.tables.get(f"{schema_name}.{name}" if schema_name else name)
+            if table is not None:
+                return table
+        return None
+
     def _get_table(self, schema_name: str, table_name: str) -> Table:
         """Gets SQLAlchemy Table object, using reflection and caching in self.metadata."""
         # Construct a unique key for the metadata cache
         # Handle None schema for databases that don't use it explicitly (like default SQLite)
         full_table_name = f"{schema_name}.{table_name}" if schema_name else table_name
 
-        if full_table_name in self.metadata.tables:
-            return self.metadata.tables[full_table_name]
+        cached = self._cached_table(schema_name, table_name)
+        if cached is not None:
+            return cached
         else:
             if not self.engine:
                  raise ConnectionError("Engine not available for table reflection.")
@@ -134,81 +250,699 @@ class SqlAlchemyTargetConnector(TargetConnector):
                  raise # Re-raise the error
 
 
-    def apply_changes(self, changes: List[Dict[str, Any]]) -> None:
+    def prepare_tables(self, tables: List[Tuple[str, str]]) -> None:
+        """
+        Reflect the tables changes will be applied to before the first batch arrives.
+
+        Tables are grouped by schema and every schema is reflected on its own connection,
+        the schemas in parallel ('reflection_parallelism', default 4). Within a schema
+        MetaData.reflect fetches columns, keys and indexes of all the tables with one
+        bulk inspector query per kind instead of one round of queries per table.
+
+        The reflected column and primary key definitions are also stored as JSON per
+        schema under 'reflection_cache_dir' (default <tmp>/rm-reflection-<uid>, created
+        private to the worker's user), together with each table's DDL version (see
+        _ddl_versions). On the next start tables whose version is unchanged are rebuilt
+        from that file without reflecting them again.
+        """
+        if not self.engine:
+            raise ConnectionError("Engine not available for table reflection.")
+        by_schema: Dict[Optional[str], List[str]] = {}
+        for schema_name, table_name in tables:
+            if self._cached_table(schema_name, table_name) is None:
+                by_schema.setdefault(schema_name, []).append(table_name)
+        if not by_schema:
+            return
+
+        started = time.monotonic()
+        app = current_app._get_current_object()
+        workers = min(len(by_schema), max(1, int(self.config.get('reflection_parallelism') or 4)))
+        prepared = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='reflect') as executor:
+            futures = {executor.submit(self._reflect_schema, app, schema_name, names): schema_name
+                       for schema_name, names in by_schema.items()}
+            for future in as_completed(futures):
+                try:
+                    schema_metadata = future.result()
+                except SQLAlchemyError as e:
+                    # Those tables fall back to lazy reflection in _get_table
+                    current_app.logger.warning(f"Could not pre-reflect target schema '{futures[future]}': {e}")
+                    continue
+                for table in schema_metadata.tables.values():
+                    if table.key not in self.metadata.tables:
+                        table.to_metadata(self.metadata)
+                        prepared += 1
+        current_app.logger.info(f"Prepared {prepared} target table(s) in {time.monotonic() - started:.2f}s.")
+
+    def foreign_key_tables(self, tables: List[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        """
+        The given (schema, table) pairs that reference, or are referenced by, a foreign key
+        on the target, named as passed in. Compaction keeps their changes in order.
+        """
+        if not self.engine:
+            raise ConnectionError("Engine not available for table reflection.")
+        by_name = {(str(schema_name).lower(), table_name.lower()): (schema_name, table_name)
+                   for schema_name, table_name in tables}
+        inspector = inspect(self.engine)
+        found: Set[Tuple[str, str]] = set()
+        for schema_name, table_name in tables:
+            try:
+                foreign_keys = inspector.get_foreign_keys(table_name, schema=schema_name)
+            except (NoSuchTableError, SQLAlchemyError) as e:
+                current_app.logger.warning(f"Could not read foreign keys of {schema_name}.{table_name}: {e}")
+                continue
+            for fk in foreign_keys:
+                found.add((schema_name, table_name))
+                referred = (str(fk.get('referred_schema') or schema_name).lower(), fk['referred_table'].lower())
+                if referred in by_name:
+                    found.add(by_name[referred])
+        return found
+
+    def _reflect_schema(self, app, schema_name: Optional[str], table_names: List[str]) -> MetaData:
+        """Reflect (or load from the reflection cache) some tables of one schema into a new MetaData."""
+        dialect = self.engine.dialect
+        wanted = set(table_names)
+        if dialect.requires_name_normalize:
+            wanted |= {dialect.normalize_name(name) for name in table_names}
+
+        with app.app_context(), self.engine.connect() as conn:
+            versions = self._ddl_versions(conn, schema_name)
+            cache_path = self._reflection_cache_path(schema_name) if versions else None
+            cached_versions, cached_tables = self._read_reflection_cache(cache_path)
+
+            schema_metadata = MetaData()
+            stale = []
+            for name in (sorted(n for n in versions if n in wanted) if versions else sorted(wanted)):
+                if versions.get(name) and cached_versions.get(name) == versions[name] and name in cached_tables \
+                        and self._table_from_definition(schema_metadata, schema_name, cached_tables[name]) is not None:
+                    continue
+                stale.append(name)
+            if stale:
+                schema_metadata.reflect(bind=conn, schema=schema_name, resolve_fks=False,
+                                        only=lambda name, _: name in stale)
+
+            if cache_path and stale:
+                # Keep the still-valid entries of tables other tasks asked for
+                definitions = {name: definition for name, definition in cached_tables.items()
+                               if versions.get(name) and cached_versions.get(name) == versions[name]}
+                for table in schema_metadata.tables.values():
+                    definition = self._table_definition(table)
+                    if definition is not None and table.name in versions:
+                        definitions[table.name] = definition
+                self._write_reflection_cache(cache_path, {name: versions[name] for name in definitions},
+                                             definitions)
+            current_app.logger.debug(f"Target schema '{schema_name}': {len(schema_metadata.tables) - len(stale)} "
+                                     f"table(s) from the reflection cache, {len(stale)} reflected.")
+        return schema_metadata
+
+    def _ddl_versions(self, conn: Connection, schema_name: Optional[str]) -> Dict[str, str]:
+        """
+        Version of every table definition in a schema, {table name: version}.
+
+        Oracle reports LAST_DDL_TIME. PostgreSQL and MySQL have no reliable DDL timestamp,
+        so the version is a digest of the table's column definitions and primary key
+        from information_schema. Other dialects return {} and are not cached.
+        """
+        dialect = self.engine.dialect
+        if schema_name is None:
+            return {}
+        try:
+            if dialect.name == 'oracle':
+                rows = conn.execute(text(
+                    "SELECT object_name, TO_CHAR(last_ddl_time, 'YYYY-MM-DD HH24:MI:SS') FROM all_objects "
+                    "WHERE owner = :owner AND object_type = 'TABLE'"),
+                    {'owner': dialect.denormalize_name(schema_name)})
+                return {dialect.normalize_name(name): ddl_time for name, ddl_time in rows}
+            if dialect.name in ('postgresql', 'mysql'):
+                rows = conn.execute(text(
+                    "SELECT c.table_name, c.column_name, c.ordinal_position, c.data_type, c.is_nullable, "
+                    "c.character_maximum_length, c.numeric_precision, c.numeric_scale, c.column_default, "
+                    "pk.column_name "
+                    "FROM information_schema.columns c "
+                    "LEFT JOIN (SELECT kcu.table_name, kcu.column_name "
+                    "           FROM information_schema.table_constraints tc "
+                    "           JOIN information_schema.key_column_usage kcu "
+                    "             ON kcu.constraint_schema = tc.constraint_schema "
+                    "            AND kcu.constraint_name = tc.constraint_name "
+                    "            AND kcu.table_name = tc.table_name "
+                    "           WHERE tc.constraint_type = 'PRIMARY KEY' AND tc.table_schema = :schema) pk "
+                    "  ON pk.table_name = c.table_name AND pk.column_name = c.column_name "
+                    "WHERE c.table_schema = :schema "
+                    "ORDER BY c.table_name, c.ordinal_position"), {'schema': schema_name})
+                digests: Dict[str, Any] = {}
+                for row in rows:
+                    digests.setdefault(row[0], hashlib.md5()).update(repr(tuple(row[1:])).encode())
+                return {name: digest.hexdigest() for name, digest in digests.items()}
+        except SQLAlchemyError as e:
+            current_app.logger.warning(f"Could not read DDL versions of target schema '{schema_name}': {e}")
+            conn.rollback()
+        return {}
+
+    def _reflection_cache_path(self, schema_name: str) -> str:
+        cache_dir = self.config.get('reflection_cache_dir')
+        if not cache_dir:
+            # Per-user directory: files of other users in it are never read (see _read_reflection_cache)
+            suffix = f"-{os.getuid()}" if hasattr(os, 'getuid') else ''
+            cache_dir = os.path.join(tempfile.gettempdir(), f'rm-reflection{suffix}')
+        endpoint = f"{self.engine.url.render_as_string(hide_password=True)}|{schema_name}"
+        return os.path.join(cache_dir, hashlib.md5(endpoint.encode()).hexdigest() + '.json')
+
+    @staticmethod
+    def _read_reflection_cache(path: Optional[str]) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+        """(versions, {table name: definition}) from a cache file, ({}, {}) when absent or not ours."""
+        if path and os.path.exists(path):
+            try:
+                if hasattr(os, 'getuid') and os.stat(path).st_uid != os.getuid():
+                    raise PermissionError("file is owned by another user")
+                with open(path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                return dict(cached['versions']), dict(cached['tables'])
+            except Exception as e:
+                current_app.logger.warning(f"Ignoring unusable reflection cache {path}: {e}")
+        return {}, {}
+
+    @staticmethod
+    def _write_reflection_cache(path: str, versions: Dict[str, str], tables: Dict[str, Dict[str, Any]]) -> None:
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as f:
+                json.dump({'versions': versions, 'tables': tables}, f)
+            os.replace(tmp_path, path)  # readers never see a partial file
+        except (OSError, TypeError, ValueError) as e:
+            current_app.logger.warning(f"Could not write reflection cache {path}: {e}")
+
+    @staticmethod
+    def _table_definition(table: Table) -> Optional[Dict[str, Any]]:
+        """JSON definition of a reflected table's columns and primary key (None if a type can't be stored)."""
+        columns = []
+        for column in table.columns:
+            type_ = column.type
+            args: Dict[str, Any] = {}
+            # Dialect types pass some arguments on through **kw (e.g. MySQL 'unsigned', 'charset')
+            params: List[Parameter] = []
+            for klass in type(type_).__mro__:
+                if '__init__' not in vars(klass):
+                    continue
+                own = list(signature(klass.__init__).parameters.values())
+                params.extend(own)
+                if not any(param.kind == Parameter.VAR_KEYWORD for param in own):
+                    break
+            for param in params:
+                name = param.name
+                if name == 'self' or name in args or param.kind in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD) \
+                        or not hasattr(type_, name):
+                    continue
+                value = getattr(type_, name)
+                if value is not None and not isinstance(value, (str, int, float, bool)):
+                    return None  # e.g. Enum members or ARRAY item types
+                args[name] = value
+            columns.append({'name': column.name, 'nullable': column.nullable, 'primary_key': column.primary_key,
+                            'type': {'module': type(type_).__module__, 'class': type(type_).__name__, 'args': args}})
+        return {'name': table.name, 'primary_key_name': table.primary_key.name, 'columns': columns}
+
+    @staticmethod
+    def _table_from_definition(metadata: MetaData, schema_name: Optional[str],
+                               definition: Dict[str, Any]) -> Optional[Table]:
+        """Rebuild a _table_definition into metadata; None (metadata untouched) if it can't be trusted."""
+        columns = []
+        try:
+            for column in definition['columns']:
+                spec = column['type']
+                # Only SQLAlchemy's own type classes are ever instantiated
+                if not str(spec['module']).startswith('sqlalchemy.'):
+                    return None
+                type_class = getattr(importlib.import_module(spec['module']), spec['class'], None)
+                if not isinstance(type_class, type) or not issubclass(type_class, TypeEngine):
+                    return None
+                columns.append(Column(column['name'], type_class(**spec['args']),
+                                      nullable=bool(column['nullable']), primary_key=bool(column['primary_key'])))
+            table = Table(definition['name'], metadata, *columns, schema=schema_name)
+        except Exception as e:
+            current_app.logger.debug(f"Reflection cache entry {definition.get('name')!r} not usable: {e}")
+            return None
+        if definition.get('primary_key_name'):
+            table.primary_key.name = definition['primary_key_name']
+        return table
+
+    def apply_changes(self, changes: List[Dict[str, Any]], position: Optional[Dict[str, Any]] = None) -> None:
         """
         Apply a batch of *structured* change events using SQLAlchemy Expression Language.
+
+        With config 'checkpoint_table' set, position is written to that table in the same
+        transaction as the changes (see read_checkpoint); an empty batch only moves the
+        checkpoint.
+
+        With config 'apply_mode' = 'upsert' inserts are written as dialect-native upserts
+        (see _upsert_statement); 'plain' issues plain INSERTs. Batches of at least
+        'staging_apply_threshold' changes go through _apply_via_staging instead.
+
+        The batch is cut into order-preserving runs of consecutive changes with the same
+        (table, operation, column set). Each run is sent as one executemany of a single
+        statement with bound parameters instead of one statement per row, so the order
+        in which rows are changed is exactly the order of the batch.
         """
         if not self.connection or not self.engine:
             raise ConnectionError("Not connected to target database.")
 
+        checkpoint_table = self._get_checkpoint_table() if position is not None else None
+        staging_threshold = int(self.config.get('staging_apply_threshold') or 0)
+        if staging_threshold and len(changes) >= staging_threshold:
+            self._apply_via_staging(changes, checkpoint_table, position)
+            return
+
         try:
+            runs = 0
             with self.connection.begin(): # Use a transaction
+                run_key, run_params = None, []
                 for change in changes:
-                    operation = change.get('operation', '').lower()
-                    schema = change.get('schema')
-                    table_name = change.get('table')
-                    primary_keys_data = change.get('primary_keys', {}) # Dict of {'pk_col': value}
-                    before_data = change.get('before_data', {})
-                    after_data = change.get('after_data', {})
-
-                    if not schema or not table_name:
-                        current_app.logger.info(f"Skipping change - Missing schema or table name: {change}") # Replace with logging
+                    prepared = self._prepare_change(change)
+                    if prepared is None:
                         continue
+                    key, params = prepared
+                    if key != run_key:
+                        runs += self._execute_run(run_key, run_params)
+                        run_key, run_params = key, []
+                    run_params.append(params)
+                runs += self._execute_run(run_key, run_params)
+                if checkpoint_table is not None:
+                    self._write_checkpoint(checkpoint_table, position)
 
-                    try:
-                        target_table = self._get_table(schema, table_name)
-                    except (NoSuchTableError, SQLAlchemyError) as e:
-                         current_app.logger.info(f"Skipping change - Cannot get table structure for {schema}.{table_name}: {e}") # Replace with logging
-                         continue # Or handle error differently (e.g., fail the batch)
-
-                    if operation == 'insert':
-                        if not after_data:
-                             current_app.logger.info(f"Skipping insert - Missing 'after_data': {change}") # Replace with logging
-                             continue
-                        stmt = insert(target_table).values(after_data)
-                        self.connection.execute(stmt)
-
-                    elif operation == 'delete':
-                        if not primary_keys_data:
-                             current_app.logger.info(f"Skipping delete - Missing 'primary_keys' data: {change}") # Replace with logging
-                             continue
-                        stmt = delete(target_table)
-                        # Build WHERE clause based on primary keys
-                        for pk_col, pk_val in primary_keys_data.items():
-                            if pk_col in target_table.c:
-                                stmt = stmt.where(target_table.c[pk_col] == pk_val)
-                            else:
-                                current_app.logger.info(f"Warning: PK column '{pk_col}' not found in target table '{target_table.fullname}' for DELETE.") # Replace with logging
-                        self.connection.execute(stmt)
-
-                    elif operation == 'update':
-                        if not primary_keys_data or not after_data:
-                             current_app.logger.info(f"Skipping update - Missing 'primary_keys' or 'after_data': {change}") # Replace with logging
-                             continue
-                        stmt = update(target_table)
-                        # Build WHERE clause based on primary keys
-                        for pk_col, pk_val in primary_keys_data.items():
-                            if pk_col in target_table.c:
-                                stmt = stmt.where(target_table.c[pk_col] == pk_val)
-                            else:
-                                current_app.logger.warning(f"Warning: PK column '{pk_col}' not found in target table '{target_table.fullname}' for UPDATE WHERE.") # Replace with logging
-                        # Set values from after_data (excluding PKs if they shouldn't be updated)
-                        values_to_update = {k: v for k, v in after_data.items() if k not in primary_keys_data and k in target_table.c}
-                        if not values_to_update:
-                             current_app.logger.info(f"Skipping update - No non-PK columns found in 'after_data' to update for: {change}") # Replace with logging
-                             continue
-                        stmt = stmt.values(values_to_update)
-                        self.connection.execute(stmt)
-
-                    else:
-                        current_app.logger.info(f"Skipping change - Unsupported operation '{operation}': {change}") # Replace with logging
-
-            current_app.logger.info(f"Successfully applied {len(changes)} structured changes.") # Replace with logging
+            current_app.logger.info(f"Successfully applied {len(changes)} structured changes in {runs} statement batch(es).") # Replace with logging
         except SQLAlchemyError as e:
             current_app.logger.error(f"Error applying structured changes: {e}") # Replace with logging
             # Transaction rolls back automatically
             raise
 
+    def read_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """
+        Source position last committed together with applied changes, or None.
+
+        Only available with config 'checkpoint_table'. The table (created on first use in
+        the target schema) holds one row per task: task_id, position (JSON) and
+        updated_at. Because each batch and its position commit in one transaction, the
+        stored position is exactly where the applied changes end, whatever happened to
+        the task's own bookkeeping.
+        """
+        if not self.config.get('checkpoint_table'):
+            return None
+        if not self.connection or not self.engine:
+            raise ConnectionError("Not connected to target database.")
+        table = self._get_checkpoint_table()
+        with self.connection.begin():
+            stored = self.connection.execute(
+                select(table.c.position).where(table.c.task_id == str(self.config.get('task_id')))).scalar()
+        return json.loads(stored) if stored else None
+
+    def _get_checkpoint_table(self) -> Optional[Table]:
+        name = self.config.get('checkpoint_table')
+        if not name:
+            return None
+        if self._checkpoint_table is None:
+            table = Table(name, MetaData(),
+                          Column('task_id', String(64), primary_key=True),
+                          Column('position', Text, nullable=False),
+                          Column('updated_at', DateTime, nullable=False),
+                          schema=self.config.get('target_schema') or None)
+            # Before any apply transaction: DDL commits implicitly on Oracle and MySQL
+            with self.connection.begin():
+                table.create(self.connection, checkfirst=True)
+            self._checkpoint_table = table
+        return self._checkpoint_table
+
+    def _write_checkpoint(self, table: Table, position: Dict[str, Any]) -> None:
+        """Store position for this task; must run inside the apply transaction."""
+        task_id = str(self.config.get('task_id'))
+        values = {'position': json.dumps(position, default=str), 'updated_at': datetime.now(timezone.utc)}
+        result = self.connection.execute(update(table).where(table.c.task_id == task_id).values(values))
+        if not result.rowcount:
+            self.connection.execute(insert(table).values(task_id=task_id, **values))
+
+    def _prepare_change(self, change: Dict[str, Any]) -> Optional[Tuple[Tuple, Dict[str, Any]]]:
+        """
+        Validate one change and turn it into (run key, bound parameters).
+
+        The run key is (table, operation, key columns, value columns); changes sharing it
+        can be executed together. Returns None for changes that must be skipped.
+        """
+        operation = change.get('operation', '').lower()
+        schema = change.get('schema')
+        table_name = change.get('table')
+        primary_keys_data = change.get('primary_keys', {}) # Dict of {'pk_col': value}
+        after_data = change.get('after_data', {})
+
+        if not schema or not table_name:
+            current_app.logger.info(f"Skipping change - Missing schema or table name: {change}") # Replace with logging
+            return None
+
+        try:
+            target_table = self._get_table(schema, table_name)
+        except (NoSuchTableError, SQLAlchemyError) as e:
+            current_app.logger.info(f"Skipping change - Cannot get table structure for {schema}.{table_name}: {e}") # Replace with logging
+            return None # Or handle error differently (e.g., fail the batch)
+
+        if operation == 'insert':
+            if not after_data:
+                current_app.logger.info(f"Skipping insert - Missing 'after_data': {change}") # Replace with logging
+                return None
+            return (target_table, operation, (), tuple(sorted(after_data))), dict(after_data)
+
+        if operation not in ('update', 'delete'):
+            current_app.logger.info(f"Skipping change - Unsupported operation '{operation}': {change}") # Replace with logging
+            return None
+        if not primary_keys_data or (operation == 'update' and not after_data):
+            current_app.logger.info(f"Skipping {operation} - Missing 'primary_keys' or 'after_data': {change}") # Replace with logging
+            return None
+
+        # Build WHERE clause based on primary keys
+        key_columns = []
+        for pk_col in primary_keys_data:
+            if pk_col in target_table.c:
+                key_columns.append(pk_col)
+            else:
+                current_app.logger.warning(f"Warning: PK column '{pk_col}' not found in target table '{target_table.fullname}' for {operation.upper()} WHERE.") # Replace with logging
+        if not key_columns:
+            current_app.logger.info(f"Skipping {operation} - No primary key column of the change exists in '{target_table.fullname}': {change}") # Replace with logging
+            return None
+        key_columns = sorted(key_columns)
+        params = {f"k{i}": primary_keys_data[col] for i, col in enumerate(key_columns)}
+
+        value_columns: List[str] = []
+        if operation == 'update':
+            # Set values from after_data (excluding PKs if they shouldn't be updated)
+            value_columns = sorted(k for k in after_data if k not in primary_keys_data and k in target_table.c)
+            if not value_columns:
+                current_app.logger.info(f"Skipping update - No non-PK columns found in 'after_data' to update for: {change}") # Replace with logging
+                return None
+            params.update({f"v{i}": after_data[col] for i, col in enumerate(value_columns)})
+
+        return (target_table, operation, tuple(key_columns), tuple(value_columns)), params
+
+    def _execute_run(self, run_key: Optional[Tuple], params: List[Dict[str, Any]]) -> int:
+        """Execute one run of same-shaped changes as a single executemany; returns statements sent."""
+        if run_key is None or not params:
+            return 0
+        target_table, operation, key_columns, value_columns = run_key
+        stmt, oracle_sql, merge_columns = self._statement_for(run_key)
+        if merge_columns is not None:
+            params = [{f"p{i}": row[col] for i, col in enumerate(merge_columns)} for row in params]
+
+        if oracle_sql is not None:
+            if operation == 'insert' and merge_columns is None:
+                rows = [[row[col] for col in value_columns] for row in params]
+            else:
+                rows = params
+            self._oracle_array_dml(oracle_sql, rows, f"{operation} on '{target_table.fullname}'")
+            return 1
+
+        self.connection.execute(stmt, params)
+        return 1
+
+    def _statement_for(self, run_key: Tuple) -> Tuple[Any, Optional[str], Optional[Tuple[str, ...]]]:
+        """
+        Parameterized statement of a run key, from the connector's LRU statement cache.
+
+        Returns (statement, Oracle SQL text or None, MERGE parameter columns or None). The
+        statement is built once per (table, operation, key columns, value columns) and
+        reused, so hot tables skip building the construct and, on the Oracle array path,
+        compiling it. At most 'apply_statement_cache_size' (default 256) entries are kept; hits
+        and misses are reported through get_apply_metrics.
+        """
+        cached = self._statement_cache.get(run_key)
+        if cached is not None:
+            self._statement_cache.move_to_end(run_key)
+            self._apply_metrics['statement_cache_hits'] += 1
+            return cached
+        self._apply_metrics['statement_cache_misses'] += 1
+
+        target_table, operation, key_columns, value_columns = run_key
+        merge_columns = None
+        if operation == 'insert':
+            stmt = insert(target_table)
+            if self.config.get('apply_mode') == 'upsert':
+                stmt, merge_columns = self._upsert_statement(target_table, value_columns)
+        else:
+            stmt = update(target_table) if operation == 'update' else delete(target_table)
+            for i, col in enumerate(key_columns):
+                stmt = stmt.where(target_table.c[col] == bindparam(f"k{i}"))
+            if operation == 'update':
+                stmt = stmt.values({col: bindparam(f"v{i}") for i, col in enumerate(value_columns)})
+
+        oracle_sql = None
+        if self.engine.dialect.name == 'oracle' and self.config.get('oracle_array_dml', True):
+            if isinstance(stmt, TextClause):
+                oracle_sql = stmt.text
+            elif operation == 'insert':
+                oracle_sql = self._oracle_insert_sql(target_table.schema, target_table.name, list(value_columns))
+            else:
+                oracle_sql = str(stmt.compile(dialect=self.engine.dialect))
+
+        entry = (stmt, oracle_sql, merge_columns)
+        self._statement_cache[run_key] = entry
+        if len(self._statement_cache) > int(self.config.get('apply_statement_cache_size') or 256):
+            self._statement_cache.popitem(last=False)
+        return entry
+
+    def _oracle_insert_sql(self, schema_name: Optional[str], table_name: str, column_names: List[str],
+                           append_values: bool = False) -> str:
+        preparer = self.engine.dialect.identifier_preparer
+        table_sql = f"{preparer.quote_schema(schema_name)}.{preparer.quote(table_name)}" if schema_name \
+            else preparer.quote(table_name)
+        hint = "/*+ APPEND_VALUES */ " if append_values else ""
+        return (f"INSERT {hint}INTO {table_sql} ({', '.join(preparer.quote(c) for c in column_names)}) "
+                f"VALUES ({', '.join(f':{i + 1}' for i in range(len(column_names)))})")
+
+    def _oracle_array_dml(self, sql: str, rows: List[Any], label: str, batch_errors: bool = False) -> int:
+        """
+        Oracle path: one oracledb executemany with pre-sized binds.
+
+        By default any rejected row fails the whole statement, so the caller's transaction
+        (and the checkpoint committed with it) is rolled back. With batch_errors, rows
+        Oracle rejects are instead logged one by one and counted in the 'rejected_rows'
+        apply metric while the rest of the array is kept; only the initial load uses this,
+        on by default ('oracle_batch_errors'). CDC apply never does, so a rejected change
+        can't be skipped past the checkpoint. Returns the number of rejected rows.
+        """
+        cursor = self.connection.connection.cursor()
+        try:
+            sizes = _oracle_input_sizes(rows)
+            if isinstance(sizes, dict):
+                cursor.setinputsizes(**sizes)
+            else:
+                cursor.setinputsizes(*sizes)
+            cursor.executemany(sql, rows, batcherrors=batch_errors)
+            errors = cursor.getbatcherrors() if batch_errors else []
+        finally:
+            cursor.close()
+        for error in errors:
+            current_app.logger.error(f"Oracle rejected row {error.offset} of {label}: "
+                                     f"{error.message.strip()} -- {rows[error.offset]}")
+        self._apply_metrics['rejected_rows'] += len(errors)
+        return len(errors)
+
+    def get_apply_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self._apply_metrics)
+        lookups = metrics['statement_cache_hits'] + metrics['statement_cache_misses']
+        metrics['statement_cache_hit_rate'] = round(metrics['statement_cache_hits'] / lookups, 4) if lookups else None
+        return metrics
+
+    def _upsert_statement(self, target_table: Table,
+                          columns: Tuple[str, ...]) -> Tuple[Any, Optional[Tuple[str, ...]]]:
+        """
+        Insert-or-update statement for the 'upsert' apply mode, keyed on the target primary key.
+
+        PostgreSQL uses INSERT ... ON CONFLICT DO UPDATE, MySQL INSERT ... ON DUPLICATE KEY
+        UPDATE and Oracle a MERGE from DUAL, so replaying changes after a restart neither
+        fails on duplicates nor needs a delete first. Tables without a primary key, and
+        other dialects, keep the plain INSERT.
+
+        Returns (statement, columns bound as :p0..:pN in that order for the Oracle MERGE,
+        else None).
+        """
+        key_columns = [col.name for col in target_table.primary_key.columns]
+        dialect = self.engine.dialect.name
+        if not key_columns or not all(col in columns for col in key_columns):
+            current_app.logger.debug(f"No usable primary key on '{target_table.fullname}'; applying inserts without upsert.")
+            return insert(target_table), None
+        update_columns = [col for col in columns if col not in key_columns]
+
+        if dialect == 'postgresql':
+            stmt = pg_insert(target_table)
+            if update_columns:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=key_columns,
+                    set_={col: stmt.excluded[col] for col in update_columns})
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=key_columns)
+            return stmt, None
+
+        if dialect == 'mysql':
+            stmt = mysql_insert(target_table)
+            # With only key columns, "update" the key to itself so duplicates are a no-op
+            stmt = stmt.on_duplicate_key_update(
+                {col: stmt.inserted[col] for col in (update_columns or key_columns[:1])})
+            return stmt, None
+
+        if dialect == 'oracle':
+            quote = self.engine.dialect.identifier_preparer.quote
+            table_sql = self.engine.dialect.identifier_preparer.format_table(target_table)
+            source_cols = ", ".join(f":p{i} AS {quote(col)}" for i, col in enumerate(columns))
+            on_clause = " AND ".join(f"t.{quote(col)} = s.{quote(col)}" for col in key_columns)
+            merge_sql = f"MERGE INTO {table_sql} t USING (SELECT {source_cols} FROM dual) s ON ({on_clause})"
+            if update_columns:
+                merge_sql += " WHEN MATCHED THEN UPDATE SET " + ", ".join(
+                    f"t.{quote(col)} = s.{quote(col)}" for col in update_columns)
+            merge_sql += (f" WHEN NOT MATCHED THEN INSERT ({', '.join(quote(col) for col in columns)})"
+                          f" VALUES ({', '.join(f's.{quote(col)}' for col in columns)})")
+            return text(merge_sql), columns
+
+        return insert(target_table), None
+
+    def _apply_via_staging(self, changes: List[Dict[str, Any]], checkpoint_table: Optional[Table] = None,
+                           position: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Apply a large batch set-based through per-task staging tables.
+
+        The batch is first reduced to its net change per primary key, then every change
+        is bulk-inserted into the staging table of its target table, tagged with its
+        operation ('rm_op'), batch sequence ('rm_seq') and shape group ('rm_grp', one per
+        operation and column set). Each group is then applied with a single statement
+        joining the staging table: deletes first, then inserts (upserts in 'upsert' mode),
+        then updates, table by table in order of first appearance. Ordering between rows
+        of different tables is not preserved, so targets with enforced foreign keys
+        should keep the threshold off. Everything runs in one transaction and the
+        staging rows are removed before it commits.
+        """
+        groups: Dict[Tuple, List[Dict[str, Any]]] = {}
+        for seq, change in enumerate(compact_changes(changes)):
+            prepared = self._prepare_change(change)
+            if prepared is None:
+                continue
+            run_key, params = prepared
+            target_table, operation, key_columns, value_columns = run_key
+            if operation == 'insert':
+                row = dict(params)
+            else:
+                row = {col: params[f"k{i}"] for i, col in enumerate(key_columns)}
+                row.update({col: params[f"v{i}"] for i, col in enumerate(value_columns)})
+            row.update(rm_op=operation[0].upper(), rm_seq=seq)
+            groups.setdefault(run_key, []).append(row)
+
+        op_order = {'delete': 0, 'insert': 1, 'update': 2}
+        tables = list(dict.fromkeys(key[0] for key in groups))
+        ordered = sorted(groups.items(), key=lambda item: (tables.index(item[0][0]), op_order[item[0][1]]))
+
+        try:
+            # Created before the apply transaction: DDL commits implicitly on Oracle and MySQL
+            staging_tables = {table: self._get_staging_table(table) for table in tables}
+            with self.connection.begin():
+                for grp, (run_key, rows) in enumerate(ordered):
+                    target_table, operation, key_columns, value_columns = run_key
+                    staging = staging_tables[target_table]
+                    for row in rows:
+                        row['rm_grp'] = grp
+                    self.connection.execute(insert(staging), self._uniform_rows(staging, rows))
+                    self.connection.execute(
+                        self._staging_apply_sql(target_table, staging, operation, key_columns, value_columns),
+                        {'grp': grp})
+                for staging in staging_tables.values():
+                    self.connection.execute(delete(staging))
+                if checkpoint_table is not None:
+                    self._write_checkpoint(checkpoint_table, position)
+            current_app.logger.info(
+                f"Applied {len(changes)} changes set-based through {len(staging_tables)} staging table(s) "
+                f"in {len(ordered)} group(s).")
+        except SQLAlchemyError as e:
+            current_app.logger.error(f"Error applying changes through staging tables: {e}")
+            raise
+
+    @staticmethod
+    def _uniform_rows(staging: Table, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # executemany needs the same keys in every row
+        names = list(dict.fromkeys(name for row in rows for name in row if name in staging.c))
+        return [{name: row.get(name) for name in names} for row in rows]
+
+    def _get_staging_table(self, target_table: Table) -> Table:
+        """Staging table of target_table for this task (created on first use)."""
+        task_id = self.config.get('task_id', 0)
+        name = f"rm_stg_{task_id}_{target_table.name}".lower()
+        if len(name) > 60:
+            name = f"rm_stg_{task_id}_{hashlib.md5(target_table.name.encode()).hexdigest()[:12]}"
+        full_name = f"{target_table.schema}.{name}" if target_table.schema else name
+        if full_name in self._staging_metadata.tables:
+            return self._staging_metadata.tables[full_name]
+
+        columns = [Column(col.name, col.type, nullable=True) for col in target_table.columns]
+        columns += [Column('rm_op', String(1)), Column('rm_seq', Integer), Column('rm_grp', Integer)]
+        staging = Table(name, self._staging_metadata, *columns, schema=target_table.schema)
+        with self.connection.begin():
+            staging.create(self.connection, checkfirst=True)
+        current_app.logger.info(f"Using staging table '{staging.fullname}' for '{target_table.fullname}'.")
+        return staging
+
+    def _staging_apply_sql(self, target_table: Table, staging: Table, operation: str,
+                           key_columns: Tuple[str, ...], value_columns: Tuple[str, ...]):
+        """One set-based statement applying the staging rows of one group (bound as :grp)."""
+        preparer = self.engine.dialect.identifier_preparer
+        quote = preparer.quote
+        dialect = self.engine.dialect.name
+        tgt = preparer.format_table(target_table)
+        stg = preparer.format_table(staging)
+
+        if operation == 'delete':
+            join = " AND ".join(f"s.{quote(col)} = {tgt}.{quote(col)}" for col in key_columns)
+            return text(f"DELETE FROM {tgt} WHERE EXISTS "
+                        f"(SELECT 1 FROM {stg} s WHERE s.rm_grp = :grp AND {join})")
+
+        if operation == 'insert':
+            columns = value_columns
+            col_list = ", ".join(quote(col) for col in columns)
+            select = f"SELECT {col_list} FROM {stg} s WHERE s.rm_grp = :grp"
+            pk = [col.name for col in target_table.primary_key.columns]
+            upsert = (self.config.get('apply_mode') == 'upsert' and pk and all(col in columns for col in pk))
+            if not upsert:
+                return text(f"INSERT INTO {tgt} ({col_list}) {select}")
+            update_columns = [col for col in columns if col not in pk]
+            if dialect == 'postgresql':
+                action = ("DO UPDATE SET " + ", ".join(f"{quote(c)} = EXCLUDED.{quote(c)}" for c in update_columns)
+                          if update_columns else "DO NOTHING")
+                return text(f"INSERT INTO {tgt} ({col_list}) {select} "
+                            f"ON CONFLICT ({', '.join(quote(c) for c in pk)}) {action}")
+            if dialect == 'mysql':
+                assignments = ", ".join(f"{quote(c)} = s.{quote(c)}" for c in (update_columns or pk[:1]))
+                return text(f"INSERT INTO {tgt} ({col_list}) {select} ON DUPLICATE KEY UPDATE {assignments}")
+            if dialect == 'oracle':
+                on_clause = " AND ".join(f"t.{quote(c)} = s.{quote(c)}" for c in pk)
+                merge_sql = f"MERGE INTO {tgt} t USING ({select}) s ON ({on_clause})"
+                if update_columns:
+                    merge_sql += " WHEN MATCHED THEN UPDATE SET " + ", ".join(
+                        f"t.{quote(c)} = s.{quote(c)}" for c in update_columns)
+                merge_sql += (f" WHEN NOT MATCHED THEN INSERT ({col_list})"
+                              f" VALUES ({', '.join(f's.{quote(c)}' for c in columns)})")
+                return text(merge_sql)
+            return text(f"INSERT INTO {tgt} ({col_list}) {select}")
+
+        # update
+        if dialect == 'postgresql':
+            assignments = ", ".join(f"{quote(c)} = s.{quote(c)}" for c in value_columns)
+            join = " AND ".join(f"t.{quote(c)} = s.{quote(c)}" for c in key_columns)
+            return text(f"UPDATE {tgt} t SET {assignments} FROM {stg} s WHERE s.rm_grp = :grp AND {join}")
+        if dialect == 'mysql':
+            assignments = ", ".join(f"t.{quote(c)} = s.{quote(c)}" for c in value_columns)
+            join = " AND ".join(f"t.{quote(c)} = s.{quote(c)}" for c in key_columns)
+            return text(f"UPDATE {tgt} t JOIN {stg} s ON {join} SET {assignments} WHERE s.rm_grp = :grp")
+        if dialect == 'oracle':
+            columns = list(dict.fromkeys(key_columns + value_columns))
+            on_clause = " AND ".join(f"t.{quote(c)} = s.{quote(c)}" for c in key_columns)
+            assignments = ", ".join(f"t.{quote(c)} = s.{quote(c)}" for c in value_columns)
+            return text(f"MERGE INTO {tgt} t USING (SELECT {', '.join(quote(c) for c in columns)} FROM {stg} "
+                        f"WHERE rm_grp = :grp) s ON ({on_clause}) WHEN MATCHED THEN UPDATE SET {assignments}")
+        join = " AND ".join(f"s.{quote(c)} = {tgt}.{quote(c)}" for c in key_columns)
+        assignments = ", ".join(f"{quote(c)} = (SELECT s.{quote(c)} FROM {stg} s WHERE s.rm_grp = :grp AND {join})"
+                                for c in value_columns)
+        return text(f"UPDATE {tgt} SET {assignments} WHERE EXISTS "
+                    f"(SELECT 1 FROM {stg} s WHERE s.rm_grp = :grp AND {join})")
+
     # ... (create_schema_if_not_exists, create_table_if_not_exists, write_initial_load_chunk remain the same for now) ...
     def create_schema_if_not_exists(self, schema_name: str) -> None:
         """Create the schema in the target if it doesn't already exist."""
@@ -335,56 +1069,253 @@ class SqlAlchemyTargetConnector(TargetConnector):
     # *** ADD THIS METHOD IMPLEMENTATION ***
     # *** REPLACE existing truncate_table method with this ***
     def truncate_table(self, schema_name: str, table_name: str) -> None:
-        """Deletes all rows from the specified table using direct DELETE statement."""
+        """
+        Remove all rows of a target table before an initial load.
+
+        config 'clear_strategy' picks how:
+            'truncate' (default)  TRUNCATE TABLE; no per-row undo/WAL
+            'recreate'            drop the table and create it again from its reflected definition
+                                  (grants, triggers and dependent views are not recreated)
+            'swap'                swap in an empty copy: CREATE ... LIKE and an atomic rename on
+                                  MySQL and PostgreSQL, EXCHANGE PARTITION with an empty table
+                                  per partition on partitioned Oracle tables
+            'delete'              DELETE FROM in one transaction
+        When a strategy is refused (foreign keys referencing the table, privileges, an
+        unpartitioned Oracle table for 'swap') the table is cleared with DELETE instead.
+        """
         if not self.connection or not self.engine: # Need engine for inspect
             raise ConnectionError("Target connection or engine not established.")
 
         logger = current_app.logger
-        logger.info(f"Attempting to clear data from target table '{schema_name}'.'{table_name}'...")
+        strategy = self.config.get('clear_strategy', 'truncate')
+        logger.info(f"Attempting to clear data from target table '{schema_name}'.'{table_name}' ({strategy})...")
 
-        inspector = inspect(self.engine)
-        has_table = False
-        try:
-            # Check table existence using inspector, handling case sensitivity for Oracle
-            # Oracle typically stores unquoted identifiers in uppercase.
-            # Adjust schema/table names if needed based on how they are stored/queried.
-            has_table = inspector.has_table(table_name, schema=schema_name)
-            # Optionally, try uppercase if case sensitivity is the issue:
-            # if not has_table:
-            #     has_table = inspector.has_table(table_name.upper(), schema=schema_name.upper())
-            #     if has_table:
-            #         table_name = table_name.upper()
-            #         schema_name = schema_name.upper()
-
-        except Exception as inspect_err:
-             logger.warning(f"Error checking existence for table '{schema_name}'.'{table_name}': {inspect_err}. Assuming it might exist and proceeding with DELETE.", exc_info=True)
-             # If inspect fails, we can still try the DELETE and let it fail if table truly doesn't exist
-             has_table = True # Proceed cautiously
-
-        if not has_table:
-             logger.warning(f"Inspector confirmed table '{schema_name}'.'{table_name}' not found in target, skipping clear.")
-             return # Explicitly return if table not found
-
-        # If table exists (or check failed), attempt DELETE
+        if self._cached_table(schema_name, table_name) is None:
+            try:
+                if not inspect(self.engine).has_table(table_name, schema=schema_name):
+                    logger.warning(f"Inspector confirmed table '{schema_name}'.'{table_name}' not found in target, skipping clear.")
+                    return
+            except Exception as inspect_err:
+                # If inspect fails, we can still try the clear and let it fail if table truly doesn't exist
+                logger.warning(f"Error checking existence for table '{schema_name}'.'{table_name}': {inspect_err}. "
+                               f"Assuming it might exist and proceeding with clear.", exc_info=True)
+
+        preparer = self.engine.dialect.identifier_preparer
+        table_sql = f"{preparer.quote_schema(schema_name)}.{preparer.quote(table_name)}" if schema_name \
+            else preparer.quote(table_name)
+        started = time.monotonic()
         try:
-            # Use standard SQL DELETE FROM statement via text() for broader compatibility
-            # Ensure schema/table names are quoted correctly for the specific database dialect (Oracle uses double quotes)
-            delete_sql = text(f'DELETE FROM "{schema_name}"."{table_name}"')
+            if strategy == 'truncate':
+                with self.connection.begin():
+                    self.connection.execute(text(f"TRUNCATE TABLE {table_sql}"))
+            elif strategy == 'recreate':
+                self._recreate_table(schema_name, table_name)
+            elif strategy == 'swap':
+                self._swap_in_empty_table(schema_name, table_name, table_sql)
+            elif strategy == 'delete':
+                self._delete_all_rows(table_sql)
+            else:
+                raise ValueError(f"Unknown clear_strategy '{strategy}'.")
+        except (SQLAlchemyError, NotImplementedError) as e:
+            if strategy == 'delete':
+                logger.error(f"Error clearing data from '{schema_name}'.'{table_name}': {e}", exc_info=True)
+                raise # Re-raise to signal failure in the task
+            logger.warning(f"Clear strategy '{strategy}' failed for '{schema_name}'.'{table_name}' ({e}); "
+                           f"falling back to DELETE.")
+            try:
+                self._delete_all_rows(table_sql)
+            except SQLAlchemyError as delete_err:
+                logger.error(f"Error clearing data from '{schema_name}'.'{table_name}': {delete_err}", exc_info=True)
+                raise
+        logger.info(f"Cleared '{schema_name}'.'{table_name}' in {time.monotonic() - started:.2f}s.")
 
-            with self.connection.begin(): # Use transaction
-                result = self.connection.execute(delete_sql)
+    def _delete_all_rows(self, table_sql: str) -> None:
+        with self.connection.begin(): # Use transaction
+            self.connection.execute(text(f"DELETE FROM {table_sql}"))
 
-            # Log success (rowcount might be -1 or unreliable)
-            logger.info(f"Successfully executed clear command for '{schema_name}'.'{table_name}'.")
+    def _recreate_table(self, schema_name: str, table_name: str) -> None:
+        """DROP and CREATE a table from its reflected definition (columns, keys, indexes)."""
+        table = Table(table_name, MetaData(), autoload_with=self.engine, schema=schema_name)
+        with self.connection.begin():
+            table.drop(self.connection)
+            table.create(self.connection)
+        # Reflected shapes of the old table are stale now
+        cached = self._cached_table(schema_name, table_name)
+        if cached is not None:
+            self.metadata.remove(cached)
+            self._statement_cache.clear()
+
+    def _swap_in_empty_table(self, schema_name: str, table_name: str, table_sql: str) -> None:
+        """Replace a table's data by swapping an empty copy in (see truncate_table 'swap')."""
+        dialect = self.engine.dialect.name
+        preparer = self.engine.dialect.identifier_preparer
+        suffix = hashlib.md5(f"{table_name}{time.time()}".encode()).hexdigest()[:8]
+
+        def sibling(prefix: str) -> Tuple[str, str]:
+            name = f"{prefix}_{suffix}_{table_name}"[:30 if dialect == 'oracle' else 60]
+            return name, (f"{preparer.quote_schema(schema_name)}.{preparer.quote(name)}" if schema_name
+                          else preparer.quote(name))
+
+        if dialect == 'mysql':
+            _, new_sql = sibling('rm_new')
+            _, old_sql = sibling('rm_old')
+            with self.connection.begin():
+                self.connection.execute(text(f"CREATE TABLE {new_sql} LIKE {table_sql}"))
+            # RENAME TABLE swaps both names atomically
+            with self.connection.begin():
+                self.connection.execute(text(f"RENAME TABLE {table_sql} TO {old_sql}, {new_sql} TO {table_sql}"))
+                self.connection.execute(text(f"DROP TABLE {old_sql}"))
+        elif dialect == 'postgresql':
+            new_name, new_sql = sibling('rm_new')
+            old_name, old_sql = sibling('rm_old')
+            # DDL is transactional: readers see the old table until the commit
+            with self.connection.begin():
+                self.connection.execute(text(f"CREATE TABLE {new_sql} (LIKE {table_sql} INCLUDING ALL)"))
+                self.connection.execute(text(f"ALTER TABLE {table_sql} RENAME TO {preparer.quote(old_name)}"))
+                self.connection.execute(text(f"ALTER TABLE {new_sql} RENAME TO {preparer.quote(table_name)}"))
+                self.connection.execute(text(f"DROP TABLE {old_sql}"))
+        elif dialect == 'oracle':
+            partitions = self.connection.execute(text(
+                "SELECT partition_name FROM all_tab_partitions WHERE table_owner = :owner AND table_name = :name"),
+                {'owner': self.engine.dialect.denormalize_name(schema_name),
+                 'name': self.engine.dialect.denormalize_name(table_name)}).scalars().all()
+            self.connection.rollback()
+            if not partitions:
+                raise NotImplementedError("table is not partitioned")
+            _, swap_sql = sibling('RM_X')
+            with self.connection.begin():
+                self.connection.execute(text(f"CREATE TABLE {swap_sql} FOR EXCHANGE WITH TABLE {table_sql}"))
+            try:
+                for partition in partitions:
+                    # The partition takes the empty segment; its rows move to the swap table
+                    with self.connection.begin():
+                        self.connection.execute(text(
+                            f"ALTER TABLE {table_sql} EXCHANGE PARTITION {preparer.quote(partition)} "
+                            f"WITH TABLE {swap_sql} WITHOUT VALIDATION"))
+                        self.connection.execute(text(f"TRUNCATE TABLE {swap_sql}"))
+            finally:
+                with self.connection.begin():
+                    self.connection.execute(text(f"DROP TABLE {swap_sql} PURGE"))
+        else:
+            raise NotImplementedError(f"no table swap for {dialect}")
+
+        cached = self._cached_table(schema_name, table_name)
+        if cached is not None:
+            self.metadata.remove(cached)
+            self._statement_cache.clear()
 
-        except SQLAlchemyError as e:
-            logger.error(f"Error clearing data from '{schema_name}'.'{table_name}': {e}", exc_info=True)
-            raise # Re-raise to signal failure in the task
-        except Exception as e:
-            logger.error(f"Unexpected error clearing data from '{schema_name}'.'{table_name}': {e}", exc_info=True)
-            raise
     # *** END REPLACE ***
 
+    def defer_indexes(self, schema_name: str, table_name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Drop the keys and indexes of a target table so an initial load doesn't maintain them.
+
+        Foreign keys, plain secondary indexes, unique constraints and the primary key are
+        dropped in that order, each in its own transaction. Objects the database refuses
+        to drop (e.g. a primary key other tables reference, or a MySQL AUTO_INCREMENT key)
+        and expression indexes are left in place. Returns the dropped objects as
+        JSON-serializable entries for rebuild_indexes, or None if the table is missing.
+        """
+        if not self.connection or not self.engine:
+            raise ConnectionError("Target connection or engine not established.")
+        inspector = inspect(self.engine)
+        if not inspector.has_table(table_name, schema=schema_name):
+            return None
+
+        candidates: List[Dict[str, Any]] = []
+        for fk in inspector.get_foreign_keys(table_name, schema=schema_name):
+            if fk.get('name'):
+                candidates.append({'kind': 'foreign_key', 'name': fk['name'], 'columns': fk['constrained_columns'],
+                                   'referred_schema': fk.get('referred_schema'), 'referred_table': fk['referred_table'],
+                                   'referred_columns': fk['referred_columns']})
+        for index in inspector.get_indexes(table_name, schema=schema_name):
+            if (index.get('duplicates_constraint') or not index.get('name') or index.get('expressions')
+                    or None in index['column_names']):
+                continue
+            candidates.append({'kind': 'index', 'name': index['name'], 'columns': index['column_names'],
+                               'unique': bool(index.get('unique'))})
+        for unique in inspector.get_unique_constraints(table_name, schema=schema_name):
+            if unique.get('name'):
+                candidates.append({'kind': 'unique', 'name': unique['name'], 'columns': unique['column_names']})
+        pk = inspector.get_pk_constraint(table_name, schema=schema_name)
+        if pk.get('constrained_columns') and (pk.get('name') or self.engine.dialect.name == 'mysql'):
+            # MySQL primary keys are always named PRIMARY and can't be given a name
+            name = None if self.engine.dialect.name == 'mysql' else pk['name']
+            candidates.append({'kind': 'primary_key', 'name': name, 'columns': pk['constrained_columns']})
+
+        deferred = []
+        for entry in candidates:
+            try:
+                with self.connection.begin():
+                    self.connection.execute(self._index_ddl(schema_name, table_name, entry, create=False))
+                deferred.append(entry)
+            except SQLAlchemyError as e:
+                current_app.logger.warning(f"Keeping {entry['kind']} '{entry['name']}' on '{schema_name}'.'{table_name}' "
+                                           f"during the initial load: {e}")
+        current_app.logger.info(f"Deferred {len(deferred)} index(es)/constraint(s) of '{schema_name}'.'{table_name}' "
+                                f"until after the initial load.")
+        return deferred
+
+    def rebuild_indexes(self, schema_name: str, table_name: str, deferred: List[Dict[str, Any]],
+                        on_progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """
+        Re-create what defer_indexes dropped: primary key, unique constraints, indexes, foreign keys.
+
+        Objects that already exist (rebuilt before an interruption) are skipped, so this
+        can be repeated. on_progress(done, total) is called after every object.
+        """
+        if not self.connection or not self.engine:
+            raise ConnectionError("Target connection or engine not established.")
+        inspector = inspect(self.engine)
+        existing = {index['name'] for index in inspector.get_indexes(table_name, schema=schema_name)}
+        existing |= {uc['name'] for uc in inspector.get_unique_constraints(table_name, schema=schema_name)}
+        existing |= {fk['name'] for fk in inspector.get_foreign_keys(table_name, schema=schema_name)}
+        has_pk = bool(inspector.get_pk_constraint(table_name, schema=schema_name).get('constrained_columns'))
+
+        order = {'primary_key': 0, 'unique': 1, 'index': 2, 'foreign_key': 3}
+        entries = sorted(deferred, key=lambda e: order[e['kind']])
+        for done, entry in enumerate(entries, 1):
+            if (has_pk if entry['kind'] == 'primary_key' else entry['name'] in existing):
+                current_app.logger.debug(f"{entry['kind']} '{entry['name']}' of '{schema_name}'.'{table_name}' already exists.")
+            else:
+                started = time.monotonic()
+                with self.connection.begin():
+                    self.connection.execute(self._index_ddl(schema_name, table_name, entry, create=True))
+                current_app.logger.info(f"Rebuilt {entry['kind']} '{entry['name']}' of '{schema_name}'.'{table_name}' "
+                                        f"in {time.monotonic() - started:.1f}s ({done}/{len(entries)}).")
+            if on_progress:
+                on_progress(done, len(entries))
+
+    @staticmethod
+    def _index_ddl(schema_name: str, table_name: str, entry: Dict[str, Any], create: bool) -> Any:
+        """CREATE/DROP DDL element for one defer_indexes entry."""
+        metadata = MetaData()
+        kind = entry['kind']
+        columns = list(entry['columns'])
+        self_reference = kind == 'foreign_key' and entry['referred_table'] == table_name \
+            and entry.get('referred_schema') in (None, schema_name)
+        if self_reference:
+            columns += [c for c in entry['referred_columns'] if c not in columns]
+        table = Table(table_name, metadata, *[Column(c, NullType()) for c in columns], schema=schema_name)
+
+        if kind == 'index':
+            index = Index(entry['name'], *[table.c[c] for c in entry['columns']], unique=entry.get('unique', False))
+            return CreateIndex(index) if create else DropIndex(index)
+        if kind == 'primary_key':
+            constraint = PrimaryKeyConstraint(*entry['columns'], name=entry.get('name'))
+        elif kind == 'unique':
+            constraint = UniqueConstraint(*entry['columns'], name=entry['name'])
+        else:
+            referred_schema = schema_name if self_reference else entry.get('referred_schema')
+            if not self_reference:
+                Table(entry['referred_table'], metadata, *[Column(c, NullType()) for c in entry['referred_columns']],
+                      schema=referred_schema)
+            prefix = f"{referred_schema}.{entry['referred_table']}" if referred_schema else entry['referred_table']
+            constraint = ForeignKeyConstraint(entry['columns'], [f"{prefix}.{c}" for c in entry['referred_columns']],
+                                              name=entry['name'])
+        table.append_constraint(constraint)
+        return AddConstraint(constraint) if create else DropConstraint(constraint)
+
     def write_initial_load_chunk(self, schema_name: str, table_name: str, data_chunk: List[Dict[str, Any]]) -> None:
         """
         Write a chunk of data during initial load using SQLAlchemy Core execution.
@@ -401,6 +1332,37 @@ class SqlAlchemyTargetConnector(TargetConnector):
         first_row = data_chunk[0]
         column_names = list(first_row.keys())
 
+        if self.engine.dialect.name == 'postgresql' and self.config.get('pg_copy', True):
+            self._copy_initial_load_chunk(schema_name, table_name, column_names, data_chunk)
+            return
+        if self.engine.dialect.name == 'mysql' and self.config.get('mysql_bulk_mode', 'multi_values') != 'executemany':
+            rows = [[row.get(c) for c in column_names] for row in data_chunk]
+            if self._in_load_transaction:
+                self._mysql_bulk_insert(schema_name, table_name, column_names, rows)
+            else:
+                with self.connection.begin():
+                    self._mysql_bulk_insert(schema_name, table_name, column_names, rows)
+            current_app.logger.info(f"Inserted {len(data_chunk)} rows into '{schema_name}'.'{table_name}'.")
+            return
+        if self.engine.dialect.name == 'oracle' and self.config.get('oracle_array_dml', True):
+            # Direct-path inserts must be committed before the next one on the table (ORA-12838),
+            # so APPEND_VALUES is only used for chunks committed on their own
+            append_values = bool(self.config.get('oracle_append_values')) and not self._in_load_transaction
+            sql = self._oracle_insert_sql(schema_name, table_name, column_names, append_values)
+            rows = [[row.get(c) for c in column_names] for row in data_chunk]
+            label = f"initial load of '{schema_name}'.'{table_name}'"
+            # Keep loading past rows the target rejects (logged and counted) instead of failing
+            # the chunk; 'oracle_batch_errors': False makes any rejected row fail it
+            batch_errors = bool(self.config.get('oracle_batch_errors', True))
+            if self._in_load_transaction:
+                rejected = self._oracle_array_dml(sql, rows, label, batch_errors)
+            else:
+                with self.connection.begin():
+                    rejected = self._oracle_array_dml(sql, rows, label, batch_errors)
+            current_app.logger.info(f"Inserted {len(data_chunk) - rejected} rows into '{schema_name}'.'{table_name}'"
+                                    f"{f', {rejected} rejected' if rejected else ''}.")
+            return
+
         # Create SQLAlchemy Column objects minimally (type can often be omitted for INSERT)
         sqlalchemy_columns = [Column(name) for name in column_names]
 
@@ -417,10 +1379,14 @@ class SqlAlchemyTargetConnector(TargetConnector):
 
         try:
             # Perform bulk insert using the constructed Table object
-            with self.connection.begin(): # Use transaction
-                # SQLAlchemy's insert construct will build statement using columns
-                # from the Table object and values from the data_chunk list of dicts.
+            if self._in_load_transaction:
+                # Committed by load_transaction() together with the rest of the range
                 self.connection.execute(target_table.insert(), data_chunk)
+            else:
+                with self.connection.begin(): # Use transaction
+                    # SQLAlchemy's insert construct will build statement using columns
+                    # from the Table object and values from the data_chunk list of dicts.
+                    self.connection.execute(target_table.insert(), data_chunk)
 
             current_app.logger.info(f"Inserted {len(data_chunk)} rows into '{schema_name}'.'{table_name}'.") # Changed log level to debug
 
@@ -438,4 +1404,175 @@ class SqlAlchemyTargetConnector(TargetConnector):
                 f"Chunk size: {len(data_chunk)}, Columns: {column_names}"
                 , exc_info=True
             )
-            raise
\ No newline at end of file
+            raise
+
+    def _copy_initial_load_chunk(self, schema_name: str, table_name: str, column_names: List[str],
+                                 data_chunk: List[Dict[str, Any]]) -> None:
+        """
+        PostgreSQL initial load path: stream the chunk through COPY ... FROM STDIN.
+
+        Rows are rendered in COPY text format into one StringIO buffer that is kept and
+        reused for every chunk, and sent through the psycopg2 cursor of the current
+        connection, so the copy takes part in the surrounding transaction.
+        """
+        preparer = self.engine.dialect.identifier_preparer
+        table_sql = f"{preparer.quote_schema(schema_name)}.{preparer.quote(table_name)}" if schema_name \
+            else preparer.quote(table_name)
+        copy_sql = f"COPY {table_sql} ({', '.join(preparer.quote(c) for c in column_names)}) FROM STDIN"
+
+        buffer = self._copy_buffer
+        buffer.seek(0)
+        buffer.truncate()
+        write_text_rows(buffer, ([row.get(c) for c in column_names] for row in data_chunk))
+        buffer.seek(0)
+
+        try:
+            if self._in_load_transaction:
+                self._copy_expert(copy_sql, buffer)
+            else:
+                with self.connection.begin():
+                    self._copy_expert(copy_sql, buffer)
+            current_app.logger.info(f"Copied {len(data_chunk)} rows into '{schema_name}'.'{table_name}'.")
+        except Exception as e:
+            current_app.logger.error(
+                f"Error copying initial load chunk to '{schema_name}'.'{table_name}': {e}. "
+                f"Chunk size: {len(data_chunk)}, Columns: {column_names}", exc_info=True)
+            raise
+
+    def _mysql_bulk_insert(self, schema_name: str, table_name: str, column_names: List[str],
+                           rows: List[List[Any]]) -> None:
+        """
+        MySQL initial load path ('mysql_bulk_mode').
+
+        'multi_values' (the default) sends the chunk as multi-row INSERT ... VALUES
+        statements, each grown up to the server's max_allowed_packet.
+
+        'load_data' writes the chunk as tab-separated text to a temp file that is reused for
+        every chunk and loads it with LOAD DATA LOCAL INFILE. It has to be chosen explicitly
+        because it enables local_infile on the client, which lets the server (or anything
+        impersonating it) read any file the worker can read; only use it against trusted
+        servers. When the server refuses local infile (or the chunk holds binary values)
+        the chunk falls back to multi-row INSERTs.
+        """
+        preparer = self.engine.dialect.identifier_preparer
+        table_sql = f"{preparer.quote_schema(schema_name)}.{preparer.quote(table_name)}" if schema_name \
+            else preparer.quote(table_name)
+        col_list = ", ".join(preparer.quote(c) for c in column_names)
+        # MySQL has no boolean literal in LOAD DATA input or bound parameters; store 1/0
+        rows = [[int(v) if isinstance(v, bool) else v for v in row] for row in rows]
+
+        cursor = self.connection.connection.cursor()
+        try:
+            use_load_data = (self.config.get('mysql_bulk_mode') == 'load_data'
+                             and not self._mysql_local_infile_refused
+                             and not any(isinstance(v, (bytes, bytearray)) for row in rows for v in row))
+            if use_load_data:
+                try:
+                    self._mysql_load_data(cursor, table_sql, col_list, rows)
+                    return
+                except pymysql.err.MySQLError as e:
+                    if not e.args or e.args[0] not in _MYSQL_LOCAL_INFILE_REFUSED:
+                        raise
+                    current_app.logger.warning(f"LOAD DATA LOCAL INFILE refused ({e}); "
+                                               f"using multi-row INSERT for the initial load.")
+                    self._mysql_local_infile_refused = True
+
+            if self._mysql_max_packet is None:
+                cursor.execute("SELECT @@max_allowed_packet")
+                self._mysql_max_packet = int(cursor.fetchone()[0])
+            # PyMySQL rewrites INSERT ... VALUES executemany into multi-row statements of at most this size
+            cursor.max_stmt_length = max(self._mysql_max_packet - 64 * 1024, 64 * 1024)
+            placeholders = ", ".join(["%s"] * len(column_names))
+            cursor.executemany(f"INSERT INTO {table_sql} ({col_list}) VALUES ({placeholders})", rows)
+        finally:
+            cursor.close()
+
+    def _mysql_load_data(self, cursor, table_sql: str, col_list: str, rows: List[List[Any]]) -> None:
+        if self._load_file is None:
+            self._load_file = tempfile.NamedTemporaryFile(
+                mode='w', encoding='utf-8', newline='\n', prefix='rm-load-', suffix='.tsv', delete=False)
+        load_file = self._load_file
+        load_file.seek(0)
+        load_file.truncate()
+        write_text_rows(load_file, rows, binary_prefix=None)
+        load_file.flush()
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table_sql} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({col_list})",
+            (load_file.name,))
+        # LOCAL implies IGNORE: duplicate keys and conversion errors only raise warnings, so
+        # fail the chunk here as the INSERT path would
+        loaded = cursor.rowcount
+        cursor.execute("SHOW WARNINGS LIMIT 5")
+        warnings = [row for row in cursor.fetchall() if row[0] != 'Note']
+        if warnings or loaded != len(rows):
+            code, message = (warnings[0][1], warnings[0][2]) if warnings else (0, 'rows were skipped')
+            raise pymysql.err.DataError(code, f"LOAD DATA loaded {loaded} of {len(rows)} row(s) into {table_sql}: "
+                                              f"{message}")
+
+    def _copy_expert(self, copy_sql: str, buffer: io.StringIO) -> None:
+        cursor = self.connection.connection.cursor()
+        try:
+            cursor.copy_expert(copy_sql, buffer, size=self.COPY_READ_SIZE)
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def load_transaction(self, table_key: Optional[str] = None, range_id: Optional[str] = None) -> Iterator[None]:
+        """
+        Commit every initial load chunk written inside the block as one transaction.
+
+        With config 'load_range_table' set, range_id is recorded for table_key in that
+        table (created on first use in the target schema, one row per task, table and
+        range) before the transaction commits, so the range's rows and the record of it
+        being loaded commit together (see loaded_ranges).
+        """
+        if not self.connection:
+            raise ConnectionError("Not connected to target database.")
+        range_table = self._get_load_range_table() if range_id is not None else None
+        with self.connection.begin():
+            self._in_load_transaction = True
+            try:
+                yield
+            finally:
+                self._in_load_transaction = False
+            if range_table is not None:
+                self.connection.execute(insert(range_table).values(
+                    task_id=str(self.config.get('task_id')), table_key=table_key, range_id=range_id))
+
+    def loaded_ranges(self, table_key: str) -> Set[str]:
+        """Ranges of table_key recorded by load_transaction for this task (config 'load_range_table')."""
+        table = self._get_load_range_table()
+        if table is None:
+            return set()
+        with self.connection.begin():
+            rows = self.connection.execute(
+                select(table.c.range_id).where(table.c.task_id == str(self.config.get('task_id')),
+                                               table.c.table_key == table_key))
+            return {row[0] for row in rows}
+
+    def reset_loaded_ranges(self, table_key: str) -> None:
+        table = self._get_load_range_table()
+        if table is None:
+            return
+        with self.connection.begin():
+            self.connection.execute(delete(table).where(table.c.task_id == str(self.config.get('task_id')),
+                                                        table.c.table_key == table_key))
+
+    def _get_load_range_table(self) -> Optional[Table]:
+        name = self.config.get('load_range_table')
+        if not name:
+            return None
+        if not self.connection:
+            raise ConnectionError("Not connected to target database.")
+        if self._load_range_table is None:
+            table = Table(name, MetaData(),
+                          Column('task_id', String(64), primary_key=True),
+                          Column('table_key', String(256), primary_key=True),
+                          Column('range_id', String(256), primary_key=True),
+                          schema=self.config.get('target_schema') or None)
+            # Before any load transaction: DDL commits implicitly on Oracle and MySQL
+            with self.connection.begin():
+                table.create(self.connection, checkfirst=True)
+            self._load_range_table = table
+        return self._load_range_table
@@ -1,7 +1,8 @@
 # interfaces.py (or separate files)
 
 import abc
-from typing import Any, Dict, List, Generator, Optional
+import contextlib
+from typing import Any, Callable, ContextManager, Dict, List, Generator, Optional, Set, Tuple
 
 class SourceConnector(abc.ABC):
     """Abstract Base Class for Source Connectors."""
@@ -37,6 +38,24 @@ class SourceConnector(abc.ABC):
         """
         pass
 
+    def iter_changes(self, last_position: Optional[Dict[str, Any]]) -> Generator[tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]], None, None]:
+        """
+        Stream CDC events since last_position as (batch, position) pairs.
+
+        Each position covers exactly the events yielded so far, so a caller can apply and
+        persist batch by batch and keep memory bounded however far behind it is.
+        Connectors that cannot stream fall back to one get_changes call.
+
+        Args:
+            last_position: See get_changes.
+
+        Yields:
+            A tuple of (list of standardized change events, position after that list).
+        """
+        changes, new_position = self.get_changes(last_position)
+        if changes or new_position != last_position:
+            yield changes, new_position
+
     @abc.abstractmethod
     def get_current_position(self) -> Optional[Dict[str, Any]]:
         """
@@ -101,6 +120,52 @@ class SourceConnector(abc.ABC):
                  yield [dict(row) for row in rows] # Assuming row objects can be dict-like
 
 
+    def get_snapshot_position(self) -> Optional[Dict[str, Any]]:
+        """
+        Fix a consistent snapshot point for initial load.
+
+        Returns:
+            The position CDC must start from once every table has been read at the
+            snapshot (see set_snapshot), or None if the source cannot read consistent
+            snapshots. The default is None.
+        """
+        return None
+
+    def set_snapshot(self, position: Optional[Dict[str, Any]]) -> None:
+        """
+        Make initial load reads return data as of the snapshot behind position.
+
+        Args:
+            position: A position returned by get_snapshot_position, or None to read current data.
+        """
+        pass
+
+    def get_load_ranges(self, schema_name: str, table_name: str, max_ranges: int) -> List[Dict[str, Any]]:
+        """
+        Split a table into independent ranges that can be loaded in parallel.
+
+        Args:
+            schema_name: The name of the schema.
+            table_name: The name of the table.
+            max_ranges: Upper bound on the number of ranges returned.
+
+        Returns:
+            A list of JSON-serializable range descriptors, each with a unique 'id'. Together
+            the ranges must cover every row exactly once. The default is the whole table.
+        """
+        return [{'id': 'all', 'kind': 'table'}]
+
+    def read_load_range(self, schema_name: str, table_name: str, load_range: Dict[str, Any],
+                        chunk_size: int) -> Generator[List[Dict[str, Any]], None, None]:
+        """
+        Read one range returned by get_load_ranges in chunks of up to chunk_size rows.
+
+        Yields:
+            A list of dictionaries, where each dictionary represents a row.
+        """
+        yield from self.perform_initial_load_chunk(schema_name, table_name, chunk_size)
+
+
 class TargetConnector(abc.ABC):
     """Abstract Base Class for Target Connectors."""
 
@@ -115,16 +180,28 @@ class TargetConnector(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def apply_changes(self, changes: List[Dict[str, Any]]) -> None:
+    def apply_changes(self, changes: List[Dict[str, Any]], position: Optional[Dict[str, Any]] = None) -> None:
         """
         Apply a batch of standardized change events to the target.
         Implementations should handle INSERT, UPDATE, DELETE operations, ideally idempotently.
 
         Args:
             changes: A list of standardized change event dictionaries from the SourceConnector.
+            position: Source position reached after this batch. Connectors that keep a
+                      checkpoint (see read_checkpoint) commit it together with the changes.
         """
         pass
 
+    def read_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """
+        Source position stored in the target together with the last applied batch.
+
+        When available it is the exact resume point: changes up to it are applied and
+        none after it, so CDC can restart there without replaying anything twice. The
+        default keeps no checkpoint and returns None.
+        """
+        return None
+
     @abc.abstractmethod
     def create_schema_if_not_exists(self, schema_name: str) -> None:
         """Create the schema in the target if it doesn't already exist."""
@@ -166,6 +243,81 @@ class TargetConnector(abc.ABC):
         # or using bulk loading capabilities if available. This needs specific implementation.
         raise NotImplementedError("Initial load writing not implemented by default.")
 
+    def defer_indexes(self, schema_name: str, table_name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Drop (or disable) the indexes and constraints of a table before its initial load.
+
+        Returns a JSON-serializable description of what was deferred, to be handed to
+        rebuild_indexes once the table is loaded. The default defers nothing.
+        """
+        return None
+
+    def rebuild_indexes(self, schema_name: str, table_name: str, deferred: List[Dict[str, Any]],
+                        on_progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """
+        Re-create what defer_indexes deferred; safe to call again after an interruption.
+
+        Args:
+            deferred: The value defer_indexes returned for this table.
+            on_progress: Called with (objects done, objects total) as the rebuild advances.
+        """
+        return None
+
+    def prepare_tables(self, tables: List[Tuple[str, str]]) -> None:
+        """
+        Load whatever per-table state apply_changes needs for these (schema, table) pairs.
+
+        Called once before the CDC loop so the first batch does not pay for it inside
+        the apply transaction. The default does nothing; tables not prepared here are
+        still handled on first use.
+        """
+        return None
+
+    def foreign_key_tables(self, tables: List[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        """
+        The (schema, table) pairs among tables that take part in a foreign key on the target.
+
+        Net-change compaction keeps changes to these tables in order relative to other
+        rows. The default knows of no foreign keys.
+        """
+        return set()
+
+    def get_apply_metrics(self) -> Dict[str, Any]:
+        """
+        Counters about how changes and load chunks were applied (e.g. rejected rows).
+
+        The values are cumulative for the connection and are merged into task.metrics.
+        The default reports nothing.
+        """
+        return {}
+
+    def load_transaction(self, table_key: Optional[str] = None,
+                         range_id: Optional[str] = None) -> ContextManager[None]:
+        """
+        Context in which several write_initial_load_chunk calls commit (or roll back) as one.
+
+        Parallel initial load writes each range inside one load transaction, so a range
+        interrupted by a failure or a stop request leaves no rows behind and can simply
+        be loaded again. With table_key and range_id, connectors that track loaded
+        ranges (see loaded_ranges) record the range in the same transaction. The
+        default provides no atomicity.
+        """
+        return contextlib.nullcontext()
+
+    def loaded_ranges(self, table_key: str) -> Set[str]:
+        """
+        Ids of the ranges of table_key committed by load_transaction, for this task.
+
+        A range whose rows committed just before a crash may be missing from the saved
+        load progress; a resumed load treats these as done instead of loading them
+        again. The default tracks nothing and returns an empty set.
+        """
+        return set()
+
+    def reset_loaded_ranges(self, table_key: str) -> None:
+        """Forget the ranges of table_key recorded by load_transaction. The default does nothing."""
+        return None
+
 
 class SchemaConverter(abc.ABC):
     """Abstract Base Class for Schema Converters."""
@@ -17,5 +17,6 @@ class Endpoint(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.now())
     target_schema = db.Column(db.String(100))  # New field for target schema
     endpoint_type = db.Column(db.String(20), nullable=False, default='source')  # source or target
+    pool_options = db.Column(db.JSON)  # Target connection pool/driver tuning (see connectors/engine_registry.py)
     def __repr__(self):
         return f'<Endpoint {self.name}>'
@@ -15,6 +15,8 @@ class ReplicationTask(db.Model):
     status = db.Column(db.String(20), default='stopped')
     options = db.Column(db.JSON)
     last_position = db.Column(db.JSON)
+    # Per-table range progress of an interrupted parallel initial load ({'SCHEMA.TABLE': {...}})
+    load_progress = db.Column(db.JSON)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     last_updated = db.Column(db.DateTime,
                              default=lambda: datetime.now(timezone.utc),
@@ -54,6 +54,7 @@ def build_connector_config(endpoint: Endpoint) -> Dict[str, Any]:
         'dataset': endpoint.dataset or '',
         'credentials_json': endpoint.credentials_json or '',
         'target_schema': endpoint.target_schema or '',
+        'pool': endpoint.pool_options,
     }
     # Return only keys with actual values (or customize based on connector needs)
     return {k: v for k, v in config.items() if v is not None}
\ No newline at end of file
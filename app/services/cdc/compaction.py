@@ -0,0 +1,106 @@
+# compaction.py
+"""
+Net-change compaction of a CDC batch.
+
+Changes to the same row (same schema, table and primary key) are collapsed into their
+net effect before apply:
+
+    insert + update(s)   -> one insert with the final values
+    update + update(s)   -> one update with the merged values
+    update(s) + delete   -> one delete
+    insert + ... + delete -> nothing
+
+Changes to a row are collapsed across changes to other rows: a net insert stays where the
+row was first inserted, while net updates and deletes move to the row's last change.
+Nothing is merged across a real cross-row dependency, which acts as an order barrier:
+
+    - a change without primary key values or carrying raw SQL (it may touch any row),
+    - an update that changes the primary key (for both the old and the new key),
+    - a change to one of barrier_tables, the tables taking part in foreign keys on the
+      target, since moving a change across it could put a child row before its parent.
+
+A delete followed by a re-insert of the same key is kept as both changes. Barrier
+changes are passed through untouched.
+"""
+
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+
+def _row_key(change: Dict[str, Any]) -> Optional[Tuple]:
+    """(schema, table, pk values) of a change, or None when it can't be compacted."""
+    primary_keys = change.get('primary_keys')
+    if not primary_keys or change.get('operation') not in ('insert', 'update', 'delete') or 'sql' in change:
+        return None
+    if change['operation'] == 'update':
+        after = change.get('after_data') or {}
+        # A key change moves the row to another key; keep it as a barrier for both keys
+        if any(col in after and after[col] != val for col, val in primary_keys.items()):
+            return None
+    return change.get('schema'), change.get('table'), tuple(sorted(primary_keys.items()))
+
+
+def compact_changes(changes: List[Dict[str, Any]],
+                    barrier_tables: Optional[Collection[Tuple[str, str]]] = None) -> List[Dict[str, Any]]:
+    """
+    Collapse a batch into the net change per primary key.
+
+    Args:
+        changes: Change events in commit order, as produced by the source connector.
+        barrier_tables: (schema, table) pairs whose changes must keep their order relative
+                        to changes to other rows (see the module docstring).
+
+    Returns:
+        A new list; the input events are not modified.
+    """
+    barrier_tables = barrier_tables or ()
+    out: List[Optional[Dict[str, Any]]] = []
+    slots: Dict[Tuple, int] = {}  # row key -> index in out of the row's net change
+
+    for change in changes:
+        key = _row_key(change)
+        if key is None:
+            primary_keys = change.get('primary_keys')
+            if change.get('operation') == 'update' and primary_keys and 'sql' not in change:
+                # Key-changing update: nothing to the old or the new key merges across it
+                after = change.get('after_data') or {}
+                for values in (primary_keys, {col: after.get(col, val) for col, val in primary_keys.items()}):
+                    slots.pop((change.get('schema'), change.get('table'), tuple(sorted(values.items()))), None)
+            else:
+                slots.clear()
+            out.append(change)
+            continue
+
+        index = slots.get(key)
+        if (change.get('schema'), change.get('table')) in barrier_tables:
+            if index != len(out) - 1:
+                # Only merge with the row's change right before it; nothing merges across it
+                slots.clear()
+                index = None
+        if index is None:
+            slots[key] = len(out)
+            out.append(change)
+            continue
+
+        net = out[index]
+        operation = change['operation']
+        if net['operation'] == 'insert' and operation == 'update':
+            out[index] = {**net, 'after_data': {**(net.get('after_data') or {}), **(change.get('after_data') or {})}}
+        elif net['operation'] == 'insert' and operation == 'delete':
+            out[index] = None
+            del slots[key]
+        elif net['operation'] == 'update' and operation in ('update', 'delete'):
+            out[index] = None
+            if operation == 'update':
+                change = {**change,
+                          'before_data': net.get('before_data') or change.get('before_data'),
+                          'after_data': {**(net.get('after_data') or {}), **(change.get('after_data') or {})}}
+            else:
+                change = {**change, 'before_data': net.get('before_data') or change.get('before_data')}
+            slots[key] = len(out)
+            out.append(change)
+        else:
+            # delete + insert (row re-created), or a sequence the source shouldn't produce
+            slots[key] = len(out)
+            out.append(change)
+
+    return [change for change in out if change is not None]
@@ -0,0 +1,164 @@
+# log_registry.py
+"""
+In-memory registry of the redo log files added to a LogMiner session.
+
+LogMiner keeps its list of log files until END_LOGMNR, so once a file is registered it
+never has to be looked up or added again. The registry remembers every registered
+(thread#, sequence#) with its SCN range and, on a log switch, only queries the catalog
+for sequences newer than the ones it already knows. SCN coverage checks are answered
+from memory instead of V$ARCHIVED_LOG / V$LOGMNR_LOGS.
+"""
+
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import oracledb as cx_Oracle
+
+logger = logging.getLogger(__name__)
+
+# NEXT_CHANGE# of the CURRENT online log is reported as 2^48 - 1 (open-ended)
+OPEN_ENDED_SCN = 2 ** 48 - 1
+
+# ORA-01289: cannot add duplicate logfile
+_ORA_DUPLICATE_LOGFILE = 1289
+
+
+class RedoLogFile(NamedTuple):
+    thread: int
+    sequence: int
+    name: str
+    first_scn: int
+    next_scn: Optional[int]  # None while the log is still being written
+    online: bool
+
+
+class RedoLogRegistry:
+    """Tracks which redo log files are registered with the current LogMiner session."""
+
+    def __init__(self):
+        self._logs: Dict[Tuple[int, int], RedoLogFile] = {}
+        self._max_archived_seq: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._logs)
+
+    def reset(self) -> None:
+        """Forget every registration (LogMiner drops its file list on END_LOGMNR)."""
+        self._logs.clear()
+        self._max_archived_seq.clear()
+
+    def oldest_scn(self) -> Optional[int]:
+        return min((log.first_scn for log in self._logs.values()), default=None)
+
+    def covers(self, start_scn: int) -> bool:
+        """True if the registered logs form an unbroken range from start_scn onwards."""
+        logs = sorted(self._logs.values(), key=lambda l: (l.first_scn, l.thread, l.sequence))
+        if not logs or logs[0].first_scn > start_scn:
+            return False
+        reached = logs[0].first_scn
+        for log in logs:
+            if log.first_scn > reached:
+                return False  # gap between consecutive logs
+            if log.next_scn is None:
+                return True
+            reached = max(reached, log.next_scn)
+        return True
+
+    def sync(self, cursor, start_scn: int) -> int:
+        """
+        Register logs that appeared since the last sync and that hold SCNs >= start_scn.
+
+        Online logs that have since been archived are swapped for their archived copy,
+        because the online member file will be overwritten when the group is reused.
+
+        Returns:
+            The number of files newly added to the session.
+        """
+        added = 0
+        since_seq = min(self._max_archived_seq.values(), default=0)
+
+        cursor.execute("""
+            SELECT thread#, sequence#, name, first_change#, next_change#
+            FROM v$archived_log
+            WHERE name IS NOT NULL
+              AND status = 'A'
+              AND deleted = 'NO'
+              AND standby_dest = 'NO'
+              AND next_change# > :start_scn
+              AND sequence# > :since_seq
+            ORDER BY thread#, sequence#
+        """, {'start_scn': start_scn, 'since_seq': since_seq})
+        archived = cursor.fetchall()
+
+        for thread, seq, name, first_scn, next_scn in archived:
+            key = (thread, seq)
+            known = self._logs.get(key)
+            if known and not known.online:
+                continue  # already registered (or a second archive destination)
+            if known and known.online:
+                self._remove_logfile(cursor, known.name)
+            self._add_logfile(cursor, RedoLogFile(thread, seq, name, first_scn, next_scn, online=False))
+            added += 1
+            self._max_archived_seq[thread] = max(self._max_archived_seq.get(thread, 0), seq)
+
+        cursor.execute("""
+            SELECT l.thread#, l.sequence#, MIN(f.member), l.first_change#, l.next_change#
+            FROM v$log l
+            JOIN v$logfile f ON f.group# = l.group#
+            WHERE l.status IN ('CURRENT', 'ACTIVE')
+              AND f.type = 'ONLINE'
+              AND NVL(f.status, 'VALID') NOT IN ('INVALID', 'DELETED')
+            GROUP BY l.thread#, l.sequence#, l.first_change#, l.next_change#
+            ORDER BY l.thread#, l.sequence#
+        """)
+        online = cursor.fetchall()
+
+        for thread, seq, member, first_scn, next_scn in online:
+            key = (thread, seq)
+            if key in self._logs:
+                continue
+            open_ended = next_scn is None or next_scn >= OPEN_ENDED_SCN
+            self._add_logfile(cursor, RedoLogFile(
+                thread, seq, member, first_scn, None if open_ended else next_scn, online=True))
+            added += 1
+
+        if added:
+            logger.info(f"[LogMiner] Registered {added} new redo log file(s); {len(self._logs)} in session.")
+        return added
+
+    def prune(self, cursor, below_scn: int) -> int:
+        """Remove archived logs that end at or before below_scn from the session."""
+        removed = 0
+        for key, log in list(self._logs.items()):
+            if not log.online and log.next_scn is not None and log.next_scn <= below_scn:
+                self._remove_logfile(cursor, log.name)
+                del self._logs[key]
+                removed += 1
+        if removed:
+            logger.debug(f"[LogMiner] Removed {removed} fully mined log file(s) from the session.")
+        return removed
+
+    def registered(self) -> List[RedoLogFile]:
+        return sorted(self._logs.values(), key=lambda l: (l.first_scn, l.thread, l.sequence))
+
+    def _add_logfile(self, cursor, log: RedoLogFile) -> None:
+        # The first file of a new list uses NEW, later ones ADDFILE
+        option = "DBMS_LOGMNR.ADDFILE" if self._logs else "DBMS_LOGMNR.NEW"
+        try:
+            cursor.execute(
+                f"BEGIN DBMS_LOGMNR.ADD_LOGFILE(LOGFILENAME => :log_name, OPTIONS => {option}); END;",
+                {'log_name': log.name}
+            )
+            logger.debug(f"[LogMiner] Added {'online' if log.online else 'archived'} log {log.name} "
+                         f"(thread {log.thread}, seq {log.sequence}, SCN {log.first_scn}-{log.next_scn})")
+        except cx_Oracle.DatabaseError as e:
+            error_obj, = e.args
+            if error_obj.code != _ORA_DUPLICATE_LOGFILE:
+                raise
+        self._logs[(log.thread, log.sequence)] = log
+
+    def _remove_logfile(self, cursor, name: str) -> None:
+        try:
+            cursor.execute("BEGIN DBMS_LOGMNR.REMOVE_LOGFILE(LOGFILENAME => :log_name); END;", {'log_name': name})
+        except cx_Oracle.DatabaseError as e:
+            logger.warning(f"[LogMiner] Could not remove log file {name} from session: {e}")
@@ -1,11 +1,17 @@
 # logminer.py (Refactored)
 
+import queue
+import threading
 import time  # Add this import at the top with other imports
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Generator # Added Generator
+from typing import Any, Callable, Dict, List, Optional, Tuple, Generator # Added Generator
 
 # Assuming interfaces.py is in the same directory or adjust import path
 from app.interfaces import SourceConnector
+from app.services.cdc.redo_parser import RedoSqlParser, RedoParseError
+from app.services.cdc.log_registry import RedoLogRegistry
+from app.services.cdc.transaction_buffer import TransactionBuffer
 
 import oracledb as cx_Oracle
 # Print the version being used
@@ -38,6 +44,21 @@ except AttributeError:
         LOGMINER_PRINT_PRETTY_SQL = 4
         LOGMINER_CONTINUOUS_MINE = 2
 
+# Above this many selected tables the V$LOGMNR_CONTENTS filter is bound as a collection
+MAX_INLINE_TABLE_FILTERS = 100
+
+# Batches buffered per catch-up range before its worker waits for the consumer
+CATCHUP_QUEUE_BATCHES = 4
+_CATCHUP_DONE = object()
+
+# LogMiner renders datetime literals in SQL_REDO with the mining session's NLS formats;
+# pin them to ISO layouts so RedoSqlParser never has to guess the instance defaults.
+SESSION_NLS_FORMATS = {
+    'NLS_DATE_FORMAT': 'YYYY-MM-DD HH24:MI:SS',
+    'NLS_TIMESTAMP_FORMAT': 'YYYY-MM-DD HH24:MI:SS.FF',
+    'NLS_TIMESTAMP_TZ_FORMAT': 'YYYY-MM-DD HH24:MI:SS.FF TZH:TZM',
+}
+
 class OracleLogMinerConnector(SourceConnector):
     """
     SourceConnector implementation for Oracle using LogMiner.
@@ -49,6 +70,29 @@ class OracleLogMinerConnector(SourceConnector):
         self.config: Dict[str, Any] = {}
         self._logminer_started: bool = False
         self.logger = logging.getLogger(__name__)  # Add this line
+        # --- Long-lived session state ---
+        # The session stays open across polls; only the end SCN moves forward.
+        # It is fully restarted when the current redo log sequence changes
+        # (log boundary crossed) or when a cheap restart fails.
+        self._session_start_scn: Optional[int] = None
+        self._session_end_scn: Optional[int] = None
+        self._session_log_seq: Optional[int] = None
+        # Redo log files registered with the session, and a once-per-connection privilege check
+        self._log_registry = RedoLogRegistry()
+        self._privileges_validated: bool = False
+        # SQL_REDO parsing (primary keys are looked up once per table)
+        self._redo_parser = RedoSqlParser()
+        self._pk_columns_cache: Dict[Tuple[str, str], List[str]] = {}
+        self._pk_lookup_lock = threading.Lock()  # catch-up workers share self.conn for lookups
+        # (predicate, binds) for the task's selected tables, built once per connection
+        self._table_filter: Optional[Tuple[str, Dict[str, Any]]] = None
+        # Transaction assembly mode state (see _iter_assembled_changes)
+        self._txn_buffer = TransactionBuffer()
+        self._assembly_read_pos: Optional[Tuple[int, str, int]] = None
+        self._assembly_checkpoint: Optional[Dict[str, Any]] = None
+        self._assembly_skip: Optional[Dict[str, Any]] = None
+        # Initial load reads are consistent as of this SCN when set (see set_snapshot)
+        self._snapshot_scn: Optional[int] = None
 
     def connect(self, config: Dict[str, Any]) -> None:
         """Establish connection to Oracle XE."""
@@ -56,28 +100,17 @@ class OracleLogMinerConnector(SourceConnector):
             self.disconnect()
 
         self.config = config
+        self._table_filter = None
+        self._privileges_validated = False
+        self._txn_buffer = TransactionBuffer(
+            spill_threshold=int(config.get('txn_spill_threshold', 10000)),
+            max_buffered_events=int(config.get('txn_max_buffered_events', 100000)),
+            spill_dir=config.get('txn_spill_dir')
+        )
+        self._reset_assembly()
         try:
-            port = int(config.get('port', 1521))
-            dsn = cx_Oracle.makedsn(
-                config['host'],
-                port,
-                service_name=config.get('service_name', 'XEPDB1')
-            )
             logger.info(f"Connect : user :{config['username']},service_name :{config['service_name']}  to Oracle XE database")
-#            self.conn = cx_Oracle.connect(
-#                user=config['username'],
-#                password=config['password'],
-#                dsn=dsn,
-#                mode=cx_Oracle.SYSDBA
-#            )
-            self.conn = cx_Oracle.connect(
-                user="C##REP_USER",
-                password="rep_user",
-                dsn=dsn,
-                mode=cx_Oracle.SYSDBA
-            )
-
-            self.conn.autocommit = False
+            self.conn = self._create_connection()
             logger.info("Connected to Oracle XE database")
             # Set container context immediately after connecting
 #            with self.conn.cursor() as cursor:
@@ -92,6 +125,36 @@ class OracleLogMinerConnector(SourceConnector):
             logger.error(f"Connection failed: {e}")
             raise
 
+    def _create_connection(self) -> cx_Oracle.Connection:
+        """
+        Open a new Oracle connection from self.config (also used by parallel workers).
+
+        Every connection gets the SESSION_NLS_FORMATS, so datetimes in SQL_REDO are ISO.
+        """
+        port = int(self.config.get('port', 1521))
+        dsn = cx_Oracle.makedsn(
+            self.config['host'],
+            port,
+            service_name=self.config.get('service_name', 'XEPDB1')
+        )
+#        conn = cx_Oracle.connect(
+#            user=self.config['username'],
+#            password=self.config['password'],
+#            dsn=dsn,
+#            mode=cx_Oracle.SYSDBA
+#        )
+        conn = cx_Oracle.connect(
+            user="C##REP_USER",
+            password="rep_user",
+            dsn=dsn,
+            mode=cx_Oracle.SYSDBA
+        )
+        conn.autocommit = False
+        with conn.cursor() as cursor:
+            cursor.execute("ALTER SESSION SET " + " ".join(
+                f"{name} = '{value}'" for name, value in SESSION_NLS_FORMATS.items()))
+        return conn
+
     def disconnect(self) -> None:
         """Disconnect from Oracle."""
         if self._logminer_started and self.conn:
@@ -336,41 +399,41 @@ class OracleLogMinerConnector(SourceConnector):
 
         try:
             with self.conn.cursor() as cursor:
-                # Get current SCN to use as end point
-                cursor.execute("SELECT current_scn FROM v$database")
-                current_scn = cursor.fetchone()[0]
+                # Current SCN (end point) and log sequence in one round trip
+                current_scn, log_seq = self._probe_scn_and_log_sequence(cursor)
 
-                # Validate SCN range
-                if not self._validate_scn_range(start_scn):
-                    self.logger.warning(f"Using current SCN {current_scn} instead of {start_scn}")
-                    start_scn = current_scn
+                # Privileges don't change for the life of the connection
+                if not self._privileges_validated:
+                    if not self.validate_logminer_privileges():
+                        raise RuntimeError("Missing required LogMiner privileges")
+                    self._privileges_validated = True
 
-                if not self.validate_logminer_privileges():
-                    raise RuntimeError("Missing required LogMiner privileges")
-
-                # Log current log status for debugging
-                self._log_available_logs()
-
-                # Try adding logs multiple times if needed
+                # Register only logs the registry doesn't know yet, then validate from memory
                 max_attempts = 3
                 for attempt in range(max_attempts):
-                    if self._add_logfiles(start_scn, current_scn):
-                        if self._verify_log_files(cursor, start_scn, current_scn):
-                            break
+                    self._log_registry.sync(cursor, min(start_scn, current_scn))
+                    oldest_scn = self._log_registry.oldest_scn()
+                    if oldest_scn is not None and not (oldest_scn <= start_scn <= current_scn):
+                        self.logger.warning(
+                            f"Start SCN {start_scn} is outside the available log range "
+                            f"({oldest_scn}-{current_scn}). Using current SCN {current_scn} instead.")
+                        start_scn = current_scn
+                    if self._log_registry.covers(start_scn):
+                        break
                     if attempt < max_attempts - 1:
                         self.logger.info(f"Force log switch and retry (attempt {attempt + 1})")
+                        if self.logger.isEnabledFor(logging.DEBUG):
+                            self._log_available_logs()
                         self.force_log_switch()
                         time.sleep(5)  # Increased delay for archiving to complete
                 else:
                     self.logger.error("Failed to add valid log files after multiple attempts")
                     return False
 
-                options = (
-                        LOGMINER_DICT_FROM_ONLINE_CATALOG |
-                        LOGMINER_COMMITTED_DATA_ONLY |
-                        LOGMINER_PRINT_PRETTY_SQL |
-                        LOGMINER_CONTINUOUS_MINE
-                )
+                # Archived logs entirely below the start SCN are no longer needed
+                self._log_registry.prune(cursor, start_scn)
+
+                options = self._logminer_options()
 
                 self.logger.info(f"Starting LogMiner with SCN range: {start_scn}-{current_scn}, options: {options}")
                 cursor.callproc("DBMS_LOGMNR.START_LOGMNR", [
@@ -383,6 +446,9 @@ class OracleLogMinerConnector(SourceConnector):
                 ])
 
                 self._logminer_started = True
+                self._session_start_scn = int(start_scn)
+                self._session_end_scn = int(current_scn)
+                self._session_log_seq = log_seq
                 self.logger.info("LogMiner session started successfully")
                 return True
 
@@ -390,6 +456,90 @@ class OracleLogMinerConnector(SourceConnector):
             self.logger.error(f"Failed to start LogMiner session: {e}", exc_info=True)
             return False
 
+    def _logminer_options(self, committed_data_only: Optional[bool] = None) -> int:
+        """Option bitmask passed to DBMS_LOGMNR.START_LOGMNR."""
+        options = (
+                LOGMINER_DICT_FROM_ONLINE_CATALOG |
+                LOGMINER_PRINT_PRETTY_SQL |
+                LOGMINER_CONTINUOUS_MINE
+        )
+        # In transaction assembly mode transactions are buffered on our side, not in Oracle's PGA
+        if committed_data_only is None:
+            committed_data_only = not self.config.get('logminer_transaction_assembly')
+        if committed_data_only:
+            options |= LOGMINER_COMMITTED_DATA_ONLY
+        return options
+
+    def _probe_scn_and_log_sequence(self, cursor) -> Tuple[int, Optional[int]]:
+        """Fetch the current SCN and CURRENT log sequence# in a single round trip."""
+        cursor.execute("""
+            SELECT (SELECT current_scn FROM v$database),
+                   (SELECT MAX(sequence#) FROM v$log WHERE status = 'CURRENT')
+            FROM dual
+        """)
+        current_scn, log_seq = cursor.fetchone()
+        return int(current_scn), log_seq
+
+    def _ensure_logminer_session(self, start_scn: int) -> Optional[int]:
+        """
+        Make sure a LogMiner session covering start_scn up to the current SCN is active.
+
+        In long-lived mode (the default, config key 'logminer_long_lived_session') an
+        open session is reused: the end SCN is widened by re-issuing START_LOGMNR over
+        the log files already registered, which skips privilege checks, log listing and
+        ADD_LOGFILE. When the current redo log sequence changes, only the newly switched
+        or archived logs are registered (see RedoLogRegistry); the session is rebuilt
+        from scratch only if that or the cheap restart fails.
+
+        Returns:
+            The effective start SCN of the mined range, or None if the session could not
+            be started.
+        """
+        long_lived = self.config.get('logminer_long_lived_session', True)
+
+        if not long_lived or not self._logminer_started:
+            if self._logminer_started:
+                self._end_logminer_session()
+            return start_scn if self._start_logminer_session(start_scn) else None
+
+        try:
+            with self.conn.cursor() as cursor:
+                current_scn, log_seq = self._probe_scn_and_log_sequence(cursor)
+
+                if log_seq != self._session_log_seq:
+                    # Register just the newly switched/archived logs; the session keeps the rest
+                    self.logger.info(
+                        f"[LogMiner] Log boundary crossed (sequence {self._session_log_seq} -> {log_seq}), "
+                        f"registering new logs from SCN {start_scn}")
+                    self._log_registry.sync(cursor, start_scn)
+                    if not self._log_registry.covers(start_scn):
+                        raise RuntimeError(f"Registered logs no longer cover SCN {start_scn}")
+                    self._log_registry.prune(cursor, start_scn)
+                    self._session_log_seq = log_seq
+                elif current_scn <= self._session_end_scn and start_scn == self._session_start_scn:
+                    # Nothing new was generated since the last poll; the open session is still valid.
+                    return start_scn
+
+                self.logger.debug(
+                    f"[LogMiner] Widening session range to {start_scn}-{current_scn} "
+                    f"(was {self._session_start_scn}-{self._session_end_scn})")
+                cursor.callproc("DBMS_LOGMNR.START_LOGMNR", [
+                    int(start_scn),
+                    int(current_scn),
+                    None,
+                    None,
+                    None,
+                    self._logminer_options()
+                ])
+                self._session_start_scn = int(start_scn)
+                self._session_end_scn = int(current_scn)
+                return start_scn
+
+        except (cx_Oracle.Error, RuntimeError) as e:
+            self.logger.warning(f"[LogMiner] Reusing session failed ({e}), restarting from SCN {start_scn}")
+            self._end_logminer_session()
+            return start_scn if self._start_logminer_session(start_scn) else None
+
     def _log_available_logs(self):
         """Log detailed information about available logs."""
         if not self.conn:
@@ -560,57 +710,762 @@ class OracleLogMinerConnector(SourceConnector):
 
     def get_changes(self, last_position: Optional[Dict[str, Any]]) -> Tuple[
         List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Fetch the next bounded set of changes after last_position.
+
+        At most 'cdc_max_rows_per_poll' rows are returned; callers that want flat memory
+        should use iter_changes directly.
+        """
+        changes: List[Dict[str, Any]] = []
+        new_position = last_position
+        for batch, position in self.iter_changes(last_position):
+            changes.extend(batch)
+            new_position = position
+        return changes, new_position
+
+    def iter_changes(self, last_position: Optional[Dict[str, Any]]) -> Generator[
+        Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]], None, None]:
+        """
+        Stream changes after last_position as bounded (batch, position) pairs.
+
+        Rows are read from V$LOGMNR_CONTENTS with tunable 'cdc_arraysize' and
+        'cdc_prefetchrows', in commit order: (COMMIT_SCN, XID, SCN, RS_ID, SSN). That order
+        is an ORDER BY Oracle has to sort, so rather than sorting everything the session
+        covers, each query only reads transactions committed within the next
+        'cdc_commit_scn_window' SCNs (default 100000; 0 reads the whole session in one
+        query), window after window up to the session's end SCN. Every query mines the
+        session's redo again, so a window returning less than a batch doubles the next
+        one. The order COMMITTED_DATA_ONLY
+        returns transactions in is not relied on: transactions committed at the same SCN
+        come back in no defined order, and the resume predicate below needs a total one.
+        Batches hold up to 'cdc_batch_size' rows and a poll stops after
+        'cdc_max_rows_per_poll' rows.
+
+        The position yielded with each batch identifies its last row exactly by
+        'commit_scn', 'xid', 'row_scn', 'rs_id' and 'ssn'; its 'scn' is where the mining
+        session restarts. With COMMITTED_DATA_ONLY a transaction is only returned in full
+        when the session starts before its first change, so 'scn' stays below every
+        transaction that commits after the position: the poll's own start SCN, moved up
+        to just below the oldest open transaction (v$transaction, read before the
+        session is opened) once a poll has returned every committed row. Resuming
+        re-mines from 'scn' and continues after the row in commit order, so nothing is
+        skipped or read twice. Legacy positions holding only 'scn' resume after that SCN.
+
+        With 'catchup_parallelism' > 1, a backlog of archived logs found when no session is
+        open is first mined by that many worker connections (see _plan_catchup_ranges).
+
+        A position from get_snapshot_position carries 'snapshot_scn': rows of transactions
+        committed at or before it are already in the initial load and are skipped.
+        """
         if not self.conn:
             raise ConnectionError("Not connected to Oracle.")
 
+        batch_size = int(self.config.get('cdc_batch_size', 1000))
+        max_rows = int(self.config.get('cdc_max_rows_per_poll', 50000))
+        arraysize = int(self.config.get('cdc_arraysize', 1000))
+        prefetchrows = int(self.config.get('cdc_prefetchrows', arraysize + 1))
+
+        if self.config.get('logminer_transaction_assembly'):
+            yield from self._iter_assembled_changes(last_position, batch_size, max_rows, arraysize, prefetchrows)
+            return
+
         start_scn = last_position.get('scn', 0) if last_position else 0
-        changes = []
-        max_scn = start_scn
+
+        # A large archived-log backlog is mined in parallel before tailing resumes
+        if int(self.config.get('catchup_parallelism', 1)) > 1 and not self._logminer_started and start_scn:
+            ranges = self._plan_catchup_ranges(start_scn)
+            if ranges:
+                last_position, caught_up = yield from self._iter_catchup_changes(
+                    ranges, last_position, batch_size, max_rows, arraysize, prefetchrows)
+                if not caught_up:
+                    return  # stopped at 'cdc_max_rows_per_poll'; the next poll catches up from there
+                start_scn = last_position['scn']
 
         try:
-            self.logger.info(f"Starting LogMiner session from SCN: {start_scn}")
-            if not self._start_logminer_session(start_scn):
-                # If failed to start, try with current SCN
-                current_scn = self.get_current_position().get('scn')
-                if current_scn and current_scn != start_scn:
-                    self.logger.info(f"Retrying with current SCN: {current_scn}")
-                    if not self._start_logminer_session(current_scn):
-                        raise RuntimeError("Failed to start LogMiner session even with current SCN")
-                    start_scn = current_scn
-                else:
-                    raise RuntimeError("Failed to start LogMiner session")
+            # Every transaction that commits after this poll's rows started above the horizon
+            with self.conn.cursor() as cursor:
+                _, horizon = self._restart_horizon(cursor)
+            start_scn = self._open_session_at(start_scn)
+            end_scn = self._session_end_scn
+            resume_filter, resume_binds = self._resume_filter(last_position, start_scn)
+            # Commit order needs a sort; bound it to one window of commit SCNs per query
+            window = int(self.config.get('cdc_commit_scn_window', 100000))
+            position = last_position or {}
+            resume_commit = position.get('commit_scn') or 0
+            if position.get('row_scn') is not None:
+                resume_commit -= 1  # the position's own commit may have rows left
+            window_start = max(start_scn, resume_commit, position.get('snapshot_scn') or 0)
+
+            with self.conn.cursor() as cursor:
+                cursor.arraysize = arraysize
+                cursor.prefetchrows = prefetchrows
+
+                batch: List[Dict[str, Any]] = []
+                emitted = 0
+                drained = False
+                while not drained and emitted < max_rows:
+                    window_filter = f"{resume_filter} AND COMMIT_SCN > :window_start"
+                    window_binds = {**resume_binds, 'window_start': window_start}
+                    if window > 0 and window_start + window < end_scn:
+                        window_filter += " AND COMMIT_SCN <= :window_end"
+                        window_binds['window_end'] = window_start = window_start + window
+                    else:
+                        drained = True  # this query reaches the end of the session
+                    logger.debug("Querying V$LOGMNR_CONTENTS...")
+                    self._execute_contents_query(cursor, window_filter, window_binds)
+                    window_rows = 0
+                    for event in self._events_from_cursor(cursor):
+                        if emitted >= max_rows:
+                            drained = False
+                            break
+                        if len(batch) >= batch_size:
+                            yield batch, self._position_of(batch[-1], start_scn)
+                            batch = []
+                        batch.append(event)
+                        emitted += 1
+                        window_rows += 1
+                    if window_rows < batch_size:
+                        window *= 2  # every query re-mines the session; cross quiet stretches quickly
+
+                if batch:
+                    yield batch, self._position_of(batch[-1], max(start_scn, horizon) if drained else start_scn)
+                logger.debug(f"Streamed {emitted} change(s) after SCN {start_scn}")
+
+        except cx_Oracle.Error as e:
+            logger.error(f"Error getting changes: {e}")
+            raise
+
+    @staticmethod
+    def _resume_filter(position: Optional[Dict[str, Any]], start_scn: int) -> Tuple[str, Dict[str, Any]]:
+        """V$LOGMNR_CONTENTS predicate for the rows after position, mined from start_scn."""
+        position = position or {}
+        conditions = ["SCN > :start_scn"]
+        binds: Dict[str, Any] = {'start_scn': start_scn}
+        if position.get('row_scn') is not None:
+            conditions.append(
+                "(COMMIT_SCN > :commit_scn OR (COMMIT_SCN = :commit_scn AND "
+                "(RAWTOHEX(XID) > :xid OR (RAWTOHEX(XID) = :xid AND "
+                "(SCN > :row_scn OR (SCN = :row_scn AND "
+                "(RS_ID > :rs_id OR (RS_ID = :rs_id AND SSN > :ssn))))))))")
+            binds.update(commit_scn=position['commit_scn'], xid=position['xid'], row_scn=position['row_scn'],
+                         rs_id=position['rs_id'], ssn=position.get('ssn', 0))
+        elif position.get('rs_id'):
+            # Legacy position of a row in (SCN, RS_ID, SSN) order
+            if position.get('scn') == start_scn:
+                conditions[0] = ("(SCN > :start_scn OR (SCN = :start_scn AND "
+                                 "(RS_ID > :rs_id OR (RS_ID = :rs_id AND SSN > :ssn))))")
+                binds.update(rs_id=position['rs_id'], ssn=position.get('ssn', 0))
+        elif position.get('commit_scn') is not None:
+            # Every transaction committed at or before 'commit_scn' has been emitted
+            conditions.append("COMMIT_SCN > :commit_scn")
+            binds['commit_scn'] = position['commit_scn']
+        if position.get('snapshot_scn'):
+            conditions.append("COMMIT_SCN > :snapshot_scn")
+            binds['snapshot_scn'] = position['snapshot_scn']
+        return " AND ".join(conditions), binds
+
+    @staticmethod
+    def _resume_predicate(position: Optional[Dict[str, Any]]) -> Callable[[Dict[str, Any]], bool]:
+        """_resume_filter for events assembled on our side: True when event comes after position."""
+        position = position or {}
+        commit_bounds = [position.get('snapshot_scn')]
+        row_key = None
+        if position.get('row_scn') is not None:
+            row_key = (position['commit_scn'], position['xid'], position['row_scn'], position['rs_id'],
+                       position.get('ssn') or 0)
+        elif position.get('rs_id'):
+            legacy_key = (position['scn'], position['rs_id'], position.get('ssn') or 0)
+        elif position.get('commit_scn') is not None:
+            commit_bounds.append(position['commit_scn'])
+        commit_bound = max((b for b in commit_bounds if b), default=None)
+
+        def after(event: Dict[str, Any]) -> bool:
+            if commit_bound is not None and event['commit_scn'] <= commit_bound:
+                return False
+            if row_key is not None:
+                return (event['commit_scn'], event['xid'], event['scn'], event['rs_id'],
+                        event.get('ssn') or 0) > row_key
+            if position.get('rs_id'):
+                return (event['scn'], event['rs_id'], event.get('ssn') or 0) > legacy_key
+            return True
+
+        return after
+
+    def _execute_contents_query(self, cursor, scn_filter: str, binds: Dict[str, Any],
+                                table_filter: Optional[Tuple[str, Dict[str, Any]]] = None) -> None:
+        """Run the committed-DML V$LOGMNR_CONTENTS query in commit order (see iter_changes)."""
+        use_undo = bool(self.config.get('logminer_use_sql_undo', False))
+        table_filter, filter_binds = table_filter or self._get_table_filter()
+        cursor.execute(f"""
+            SELECT OPERATION_CODE, SCN, RS_ID, SSN, COMMIT_SCN, RAWTOHEX(XID),
+                   SQL_REDO, {'SQL_UNDO' if use_undo else 'NULL'}, CSF,
+                   TIMESTAMP, SEG_OWNER, TABLE_NAME, ROW_ID
+            FROM V$LOGMNR_CONTENTS
+            WHERE {scn_filter}
+              AND OPERATION_CODE IN (1,2,3)  -- INSERT, UPDATE, DELETE
+              AND {table_filter}
+            ORDER BY COMMIT_SCN, XID, SCN, RS_ID, SSN
+        """, {**binds, **filter_binds})
+
+    def _events_from_cursor(self, cursor) -> Generator[Dict[str, Any], None, None]:
+        """Build complete change events from an executed _execute_contents_query cursor."""
+        redo_parts: List[str] = []
+        undo_parts: List[str] = []
+        for (op_code, scn, rs_id, ssn, commit_scn, xid, sql_redo, sql_undo, csf,
+             ts, schema, table, row_id) in cursor:
+            # Statements longer than 4000 chars are split over rows flagged CSF=1
+            redo_parts.append(sql_redo or '')
+            undo_parts.append(sql_undo or '')
+            if csf == 1:
+                continue
+            event = self._build_change_event(
+                op_code, scn, ts, schema, table, row_id,
+                ''.join(redo_parts), ''.join(undo_parts) or None
+            )
+            event.update(rs_id=rs_id, ssn=ssn, commit_scn=commit_scn, xid=xid)
+            redo_parts.clear()
+            undo_parts.clear()
+            yield event
+
+    def _execute_raw_contents_query(self, cursor, scn_filter: str, binds: Dict[str, Any],
+                                    table_filter: Optional[Tuple[str, Dict[str, Any]]] = None) -> None:
+        """Run the uncommitted DML plus START/COMMIT/ROLLBACK query in (SCN, RS_ID, SSN) order."""
+        use_undo = bool(self.config.get('logminer_use_sql_undo', False))
+        table_filter, filter_binds = table_filter or self._get_table_filter()
+        cursor.execute(f"""
+            SELECT OPERATION_CODE, SCN, RS_ID, SSN, RAWTOHEX(XID),
+                   SQL_REDO, {'SQL_UNDO' if use_undo else 'NULL'}, CSF,
+                   TIMESTAMP, SEG_OWNER, TABLE_NAME, ROW_ID
+            FROM V$LOGMNR_CONTENTS
+            WHERE {scn_filter}
+              AND (OPERATION_CODE IN (6,7,36)  -- START, COMMIT, ROLLBACK
+                   OR (OPERATION_CODE IN (1,2,3) AND {table_filter}))
+            ORDER BY SCN, RS_ID, SSN
+        """, {**binds, **filter_binds})
+
+    def _raw_rows_from_cursor(self, cursor) -> Generator[Tuple, None, None]:
+        """
+        (op_code, scn, rs_id, ssn, xid, event) per record of an executed _execute_raw_contents_query
+        cursor; event is the complete change event for DML and None for transaction records.
+        """
+        redo_parts: List[str] = []
+        undo_parts: List[str] = []
+        for (op_code, scn, rs_id, ssn, xid, sql_redo, sql_undo, csf,
+             ts, schema, table, row_id) in cursor:
+            if op_code not in (1, 2, 3):
+                yield op_code, scn, rs_id, ssn, xid, None
+                continue
+            redo_parts.append(sql_redo or '')
+            undo_parts.append(sql_undo or '')
+            if csf == 1:
+                continue
+            event = self._build_change_event(
+                op_code, scn, ts, schema, table, row_id,
+                ''.join(redo_parts), ''.join(undo_parts) or None
+            )
+            event.update(rs_id=rs_id, ssn=ssn, xid=xid)
+            redo_parts.clear()
+            undo_parts.clear()
+            yield op_code, scn, rs_id, ssn, xid, event
+
+    def _plan_catchup_ranges(self, start_scn: int) -> List[Tuple[int, int, List[str]]]:
+        """
+        Split the archived-log backlog after start_scn into SCN ranges for parallel mining.
+
+        Only archived logs that end below the oldest online log are considered, so the
+        live tail is always left to the regular session. Range boundaries fall on log
+        boundaries: each range is [lo, hi) with the archived logs overlapping it.
+        Returns an empty list when the backlog is too small ('catchup_min_logs') or has
+        gaps, in which case the regular session handles it.
+        """
+        parallelism = int(self.config.get('catchup_parallelism', 1))
+        min_logs = int(self.config.get('catchup_min_logs', 4))
+
+        try:
+            if not self._privileges_validated:
+                if not self.validate_logminer_privileges():
+                    raise RuntimeError("Missing required LogMiner privileges")
+                self._privileges_validated = True
 
             with self.conn.cursor() as cursor:
-                logger.info("Querying V$LOGMNR_CONTENTS...")
                 cursor.execute("""
-                    SELECT OPERATION_CODE, SCN, SQL_REDO, TIMESTAMP,
-                           SEG_OWNER, TABLE_NAME, ROW_ID
-                    FROM V$LOGMNR_CONTENTS
-                    WHERE SCN > :start_scn
-                      AND OPERATION_CODE IN (1,2,3)  -- INSERT, UPDATE, DELETE
-                      AND SEG_OWNER NOT LIKE 'SYS%'
-                    ORDER BY SCN
+                    SELECT a.thread#, a.sequence#, MIN(a.name), a.first_change#, a.next_change#
+                    FROM v$archived_log a
+                    WHERE a.name IS NOT NULL
+                      AND a.status = 'A'
+                      AND a.deleted = 'NO'
+                      AND a.standby_dest = 'NO'
+                      AND a.next_change# > :start_scn
+                      AND a.next_change# <= (SELECT MIN(first_change#) FROM v$log)
+                    GROUP BY a.thread#, a.sequence#, a.first_change#, a.next_change#
+                    ORDER BY a.first_change#, a.thread#, a.sequence#
                 """, {'start_scn': start_scn})
+                logs = cursor.fetchall()
+        except cx_Oracle.Error as e:
+            logger.warning(f"[LogMiner] Could not plan parallel catch-up, mining serially: {e}")
+            return []
 
-                logger.info(f"Found {cursor.rowcount} changes")
-                for op_code, scn, sql_redo, ts, schema, table, row_id in cursor:
-                    changes.append({
-                        'scn': scn,
-                        'timestamp': ts,
-                        'operation': {1: 'insert', 2: 'delete', 3: 'update'}.get(op_code),
-                        'schema': schema,
-                        'table': table,
-                        'sql': sql_redo
-                    })
-                    max_scn = max(max_scn, scn)
+        if len(logs) < min_logs:
+            return []
+        if logs[0][3] > start_scn + 1:
+            logger.warning(f"[LogMiner] Archived logs start at SCN {logs[0][3]}, after {start_scn}; "
+                           f"skipping parallel catch-up.")
+            return []
 
-            new_position = {'scn': max_scn} if max_scn > start_scn else last_position
-            return changes, new_position
+        # With several redo threads, only SCNs below every thread's last backlog log are complete
+        thread_end: Dict[int, int] = {}
+        for thread, _, _, _, next_scn in logs:
+            thread_end[thread] = max(thread_end.get(thread, 0), next_scn)
+        end_scn = min(thread_end.values())
+
+        per_range = int(self.config.get('catchup_logs_per_range') or -(-len(logs) // parallelism))
+        bounds = [start_scn]
+        for i in range(per_range, len(logs), per_range):
+            if bounds[-1] < logs[i][3] < end_scn:
+                bounds.append(logs[i][3])
+        bounds.append(end_scn)
+
+        ranges = []
+        for lo, hi in zip(bounds, bounds[1:]):
+            names = [name for _, _, name, first_scn, next_scn in logs if first_scn < hi and next_scn > lo]
+            ranges.append((lo, hi, names))
+        logger.info(f"[LogMiner] Catching up {len(logs)} archived log(s), SCN {start_scn}-{end_scn}, "
+                    f"in {len(ranges)} range(s) with {parallelism} worker(s).")
+        return ranges
+
+    def _iter_catchup_changes(self, ranges: List[Tuple[int, int, List[str]]],
+                              last_position: Optional[Dict[str, Any]], batch_size: int, max_rows: int,
+                              arraysize: int, prefetchrows: int) -> Generator[
+            Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]], None, Tuple[Dict[str, Any], bool]]:
+        """
+        Mine catch-up ranges on parallel worker connections and assemble transactions here.
+
+        A COMMITTED_DATA_ONLY session per range would lose the rows of transactions that
+        cross a range boundary, so workers mine their range raw (uncommitted DML plus
+        START/COMMIT/ROLLBACK records, like _iter_assembled_changes) and the consumer
+        feeds the ranges, in order, through the TransactionBuffer. Transactions are
+        emitted in the commit order of the regular session, (COMMIT_SCN, XID), and only
+        after last_position.
+
+        Every range gets a bounded queue; workers read ahead while the consumer drains
+        the ranges one after another. Once max_rows rows are emitted, catch-up stops
+        after the transactions of the current commit SCN.
+
+        Returns:
+            (position, caught_up). When caught up, every transaction committed below the
+            last range end has been emitted and the regular session resumes from position;
+            otherwise position is where the stop happened and the next poll catches up
+            from it.
+        """
+        parallelism = int(self.config.get('catchup_parallelism', 1))
+        queues = [queue.Queue(maxsize=CATCHUP_QUEUE_BATCHES) for _ in ranges]
+        cancel = threading.Event()
+        after_position = self._resume_predicate(last_position)
+        end_scn = ranges[-1][1]
+
+        # The main session must not hold the log files the workers are mining
+        self._end_logminer_session()
+        self._txn_buffer.clear()
 
+        executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='logminer-catchup')
+        try:
+            for i, (lo, hi, names) in enumerate(ranges):
+                # The first range starts after the restart SCN of last_position
+                scn_filter = ("SCN > :lo" if i == 0 else "SCN >= :lo") + " AND SCN < :hi"
+                executor.submit(self._mine_catchup_range, lo, hi, names, scn_filter, {'lo': lo, 'hi': hi},
+                                queues[i], cancel, batch_size, arraysize, prefetchrows)
+
+            batch: List[Dict[str, Any]] = []
+            emitted = 0
+            committing: List[str] = []  # XIDs committed at commit_scn, emitted together in XID order
+            commit_scn = None
+            for op_code, scn, rs_id, ssn, xid, event in self._drain_catchup_queues(ranges, queues, end_scn):
+                if committing and scn != commit_scn:
+                    for xid_done in sorted(committing):
+                        for committed in self._txn_buffer.commit(xid_done):
+                            committed['commit_scn'] = commit_scn
+                            if not after_position(committed):
+                                continue
+                            batch.append(committed)
+                            emitted += 1
+                            if len(batch) >= batch_size:
+                                yield batch, self._position_of(batch[-1], self._catchup_restart_scn(scn))
+                                batch = []
+                    committing = []
+                    if emitted >= max_rows and op_code is not None:
+                        # Stop between commit SCNs: everything committed up to commit_scn is out
+                        handoff = {'scn': self._catchup_restart_scn(scn), 'commit_scn': commit_scn}
+                        if batch:
+                            yield batch, dict(handoff)
+                        logger.info(f"[LogMiner] Catch-up paused at commit SCN {commit_scn} after {emitted} row(s).")
+                        return handoff, False
+                if op_code in (1, 2, 3):
+                    self._txn_buffer.add(xid, scn, event)
+                elif op_code == 6:
+                    self._txn_buffer.begin(xid, scn)
+                elif op_code == 36:
+                    self._txn_buffer.discard(xid)
+                elif op_code == 7:
+                    committing.append(xid)
+                    commit_scn = scn
+
+            restart_scn = self._catchup_restart_scn(end_scn)
+            if emitted:
+                handoff = {'scn': restart_scn, 'commit_scn': end_scn - 1}
+            else:
+                # Nothing after last_position was committed in the backlog
+                handoff = {**(last_position or {}), 'scn': restart_scn}
+            if batch:
+                yield batch, dict(handoff)
+            logger.info(f"[LogMiner] Catch-up done up to SCN {end_scn}; "
+                        f"{self._txn_buffer.open_transactions} transaction(s) still open.")
+            return handoff, True
+        finally:
+            cancel.set()
+            # Unblock workers waiting on a full queue so they can see the cancel flag
+            for range_queue in queues:
+                while not range_queue.empty():
+                    range_queue.get_nowait()
+            executor.shutdown(wait=True)
+            self._txn_buffer.clear()
+
+    @staticmethod
+    def _drain_catchup_queues(ranges: List[Tuple[int, int, List[str]]], queues: List[queue.Queue],
+                              end_scn: int) -> Generator[Tuple, None, None]:
+        """Raw rows of every range in order, then an end marker at end_scn."""
+        for (lo, hi, _), range_queue in zip(ranges, queues):
+            while True:
+                item = range_queue.get()
+                if item is _CATCHUP_DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield from item
+            logger.debug(f"[LogMiner] Catch-up range {lo}-{hi} drained.")
+        yield None, end_scn, None, None, None, None
+
+    def _catchup_restart_scn(self, read_scn: int) -> int:
+        """Restart SCN while catching up: below every open transaction and the next row read."""
+        oldest_open = self._txn_buffer.oldest_open_scn()
+        return (min(oldest_open, read_scn) if oldest_open is not None else read_scn) - 1
+
+    def _mine_catchup_range(self, lo: int, hi: int, log_names: List[str], scn_filter: str,
+                            binds: Dict[str, Any], out: queue.Queue, cancel: threading.Event,
+                            batch_size: int, arraysize: int, prefetchrows: int) -> None:
+        """Worker: mine [lo, hi) raw on a dedicated connection and push row batches to out."""
+
+        def put(item) -> bool:
+            while not cancel.is_set():
+                try:
+                    out.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        if cancel.is_set():
+            return
+        conn = None
+        try:
+            conn = self._create_connection()
+            with conn.cursor() as cursor:
+                try:
+                    cursor.execute("ALTER SESSION SET CONTAINER = CDB$ROOT")
+                except cx_Oracle.DatabaseError as e:
+                    logger.debug(f"[LogMiner] Catch-up worker stays in its current container: {e}")
+                for i, name in enumerate(log_names):
+                    option = "DBMS_LOGMNR.NEW" if i == 0 else "DBMS_LOGMNR.ADDFILE"
+                    cursor.execute(
+                        f"BEGIN DBMS_LOGMNR.ADD_LOGFILE(LOGFILENAME => :log_name, OPTIONS => {option}); END;",
+                        {'log_name': name}
+                    )
+                cursor.callproc("DBMS_LOGMNR.START_LOGMNR", [
+                    int(lo), int(hi), None, None, None, self._logminer_options(committed_data_only=False)
+                ])
+                try:
+                    cursor.arraysize = arraysize
+                    cursor.prefetchrows = prefetchrows
+                    self._execute_raw_contents_query(cursor, scn_filter, binds, self._build_table_filter(conn))
+                    batch: List[Tuple] = []
+                    for row in self._raw_rows_from_cursor(cursor):
+                        batch.append(row)
+                        if len(batch) >= batch_size:
+                            if not put(batch):
+                                return
+                            batch = []
+                    if batch and not put(batch):
+                        return
+                finally:
+                    cursor.execute("BEGIN DBMS_LOGMNR.END_LOGMNR(); END;")
+            put(_CATCHUP_DONE)
+        except Exception as e:
+            logger.error(f"[LogMiner] Catch-up worker for SCN {lo}-{hi} failed: {e}")
+            put(e)
+        finally:
+            if conn:
+                try:
+                    conn.close()
+                except cx_Oracle.Error:
+                    pass
+
+    def _open_session_at(self, start_scn: int) -> int:
+        """Ensure a mining session from start_scn (falling back to the current SCN); returns the SCN used."""
+        self.logger.debug(f"Ensuring LogMiner session from SCN: {start_scn}")
+        if self._ensure_logminer_session(start_scn) is None:
+            # If failed to start, try with current SCN
+            current_scn = self.get_current_position().get('scn')
+            if current_scn and current_scn != start_scn:
+                self.logger.info(f"Retrying with current SCN: {current_scn}")
+                if self._ensure_logminer_session(current_scn) is None:
+                    raise RuntimeError("Failed to start LogMiner session even with current SCN")
+                return current_scn
+            raise RuntimeError("Failed to start LogMiner session")
+        return start_scn
+
+    def _iter_assembled_changes(self, last_position: Optional[Dict[str, Any]], batch_size: int, max_rows: int,
+                                arraysize: int, prefetchrows: int) -> Generator[
+        Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]], None, None]:
+        """
+        Transaction assembly mode ('logminer_transaction_assembly').
+
+        The session is started without COMMITTED_DATA_ONLY, so Oracle does not buffer
+        open transactions in PGA. Uncommitted DML plus START/COMMIT/ROLLBACK markers
+        (operation codes 6/7/36) are read instead, grouped by XID in a TransactionBuffer
+        that spills large transactions to disk, and each transaction is emitted in commit
+        order when its COMMIT is read.
+
+        Positions are {'scn', 'commit_scn', 'commit_rs_id', 'xid', 'txn_offset'}: 'scn' is
+        just below the oldest transaction still open, so a restart re-mines everything not
+        yet emitted; transactions committed before 'commit_scn', or at it with a COMMIT
+        record ordered before 'commit_rs_id' (several transactions can commit at one SCN),
+        are then skipped, and 'txn_offset' events of a transaction cut across batches are
+        not emitted twice. A position written by the commit-ordered session (switching
+        modes on an existing task) is honoured the same way: events it already covers,
+        up to its row or every transaction committed at or before its commit SCN, are
+        skipped.
+        Within one connection mining simply continues from the last row read.
+        """
+        resuming = (self._assembly_read_pos is not None and last_position is not None
+                    and last_position == self._assembly_checkpoint)
+        if not resuming:
+            self._reset_assembly()
+            self._assembly_checkpoint = last_position
+            if last_position and last_position.get('commit_scn') is not None and 'txn_offset' in last_position:
+                self._assembly_skip = last_position
+            elif last_position:
+                # A position of the commit-ordered session (row, commit SCN boundary or snapshot):
+                # skip with its resume predicate until past every commit SCN it covers
+                bound = max(last_position.get('commit_scn') or 0, last_position.get('snapshot_scn') or 0,
+                            last_position.get('scn') or 0 if last_position.get('rs_id') else 0)
+                self._assembly_skip = {'after': self._resume_predicate(last_position), 'commit_scn': bound}
+            start_scn = last_position.get('scn', 0) if last_position else 0
+        else:
+            start_scn = self._assembly_read_pos[0]
+
+        try:
+            start_scn = self._open_session_at(start_scn)
+            read_pos = self._assembly_read_pos
+            if read_pos and read_pos[0] == start_scn:
+                resume_filter = ("(SCN > :start_scn OR (SCN = :start_scn AND "
+                                 "(RS_ID > :rs_id OR (RS_ID = :rs_id AND SSN > :ssn))))")
+                resume_binds = {'rs_id': read_pos[1], 'ssn': read_pos[2]}
+            else:
+                resume_filter = "SCN > :start_scn"
+                resume_binds = {}
+
+            with self.conn.cursor() as cursor:
+                cursor.arraysize = arraysize
+                cursor.prefetchrows = prefetchrows
+                self._execute_raw_contents_query(cursor, resume_filter, {'start_scn': start_scn, **resume_binds})
+
+                batch: List[Dict[str, Any]] = []
+                batch_position: Optional[Dict[str, Any]] = None
+                rows_read = 0
+                for op_code, scn, rs_id, ssn, xid, event in self._raw_rows_from_cursor(cursor):
+                    if rows_read >= max_rows:
+                        break
+
+                    if op_code in (1, 2, 3):
+                        self._txn_buffer.add(xid, scn, event)
+                    elif op_code == 6:
+                        self._txn_buffer.begin(xid, scn)
+                    elif op_code == 36:
+                        self._txn_buffer.discard(xid)
+                    elif op_code == 7:
+                        total = self._txn_buffer.size(xid)
+                        skip = self._events_to_skip(xid, scn, rs_id, total)
+                        after = (self._assembly_skip or {}).get('after')
+                        emitted = 0
+                        for event in self._txn_buffer.commit(xid):
+                            emitted += 1
+                            if emitted <= skip:
+                                continue
+                            event['commit_scn'] = scn
+                            if after is not None and not after(event):
+                                continue
+                            batch.append(event)
+                            batch_position = self._assembly_position(scn, rs_id, xid,
+                                                                     emitted if emitted < total else None)
+                            if len(batch) >= batch_size:
+                                self._assembly_checkpoint = batch_position
+                                yield batch, batch_position
+                                batch = []
+
+                    self._assembly_read_pos = (scn, rs_id, ssn)
+                    rows_read += 1
+
+                if batch:
+                    self._assembly_checkpoint = batch_position
+                    yield batch, batch_position
+                logger.debug(
+                    f"Read {rows_read} redo row(s) after SCN {start_scn}; "
+                    f"{self._txn_buffer.open_transactions} transaction(s) open, "
+                    f"{self._txn_buffer.buffered_events} event(s) buffered in memory")
+
+        except GeneratorExit:
+            # The consumer stopped mid-stream: re-mine from its last checkpoint next time
+            self._reset_assembly()
+            raise
         except cx_Oracle.Error as e:
             logger.error(f"Error getting changes: {e}")
+            self._reset_assembly()
             raise
 
+    def _events_to_skip(self, xid: str, commit_scn: int, commit_rs_id: str, total: int) -> int:
+        """Number of events of a committing transaction already emitted before a restart."""
+        skip = self._assembly_skip
+        if not skip:
+            return 0
+        if commit_scn > skip['commit_scn']:
+            # Past the checkpoint: nothing else to skip
+            self._assembly_skip = None
+            return 0
+        if 'after' in skip:
+            return 0  # filtered event by event with the commit-ordered resume predicate
+        if commit_scn < skip['commit_scn']:
+            return total
+        if xid != skip.get('xid'):
+            # Same commit SCN: transactions whose COMMIT precedes the checkpoint's were emitted
+            if skip.get('commit_rs_id') is not None and commit_rs_id < skip['commit_rs_id']:
+                return total
+            return 0
+        offset = skip.get('txn_offset')
+        return total if offset is None else offset
+
+    def _assembly_position(self, commit_scn: int, commit_rs_id: str, xid: str,
+                           txn_offset: Optional[int]) -> Dict[str, Any]:
+        """Checkpoint after (part of) a committed transaction; see _iter_assembled_changes."""
+        # While a transaction is only partly emitted it must itself be re-mined after a crash
+        oldest_open = self._txn_buffer.oldest_open_scn(exclude=None if txn_offset else xid)
+        restart_scn = min(oldest_open, commit_scn) if oldest_open is not None else commit_scn
+        return {'scn': restart_scn - 1, 'commit_scn': commit_scn, 'commit_rs_id': commit_rs_id, 'xid': xid,
+                'txn_offset': txn_offset}
+
+    def _reset_assembly(self) -> None:
+        self._txn_buffer.clear()
+        self._assembly_read_pos = None
+        self._assembly_checkpoint = None
+        self._assembly_skip = None
+
+    @staticmethod
+    def _position_of(event: Dict[str, Any], restart_scn: int) -> Dict[str, Any]:
+        """Checkpoint after one V$LOGMNR_CONTENTS row, re-mined from restart_scn (see iter_changes)."""
+        return {
+            'scn': restart_scn,
+            'commit_scn': event.get('commit_scn'),
+            'xid': event.get('xid'),
+            'row_scn': event['scn'],
+            'rs_id': event.get('rs_id'),
+            'ssn': event.get('ssn'),
+        }
+
+    @staticmethod
+    def _restart_horizon(cursor) -> Tuple[int, int]:
+        """(current SCN, SCN just below the oldest open transaction or the current SCN)."""
+        cursor.execute("""
+            SELECT d.current_scn, (SELECT MIN(t.start_scn) FROM v$transaction t)
+            FROM v$database d
+        """)
+        current_scn, oldest_open_scn = cursor.fetchone()
+        restart_scn = min(current_scn, oldest_open_scn - 1) if oldest_open_scn else current_scn
+        return int(current_scn), int(restart_scn)
+
+    def _get_table_filter(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the V$LOGMNR_CONTENTS predicate restricting rows to the task's tables.
+
+        The selected tables come from config['tables'] ([{'schema': ..., 'table': ...}]).
+        Up to MAX_INLINE_TABLE_FILTERS tables are bound as a (SEG_OWNER, TABLE_NAME) IN
+        list; larger selections are bound as one SYS.ODCIVARCHAR2LIST collection so the
+        statement text (and its cursor) stays the same whatever the list size. Without a
+        table selection every non-SYS schema is mined, as before.
+        """
+        if self._table_filter is None:
+            self._table_filter = self._build_table_filter(self.conn)
+            tables = self.config.get('tables') or []
+            logger.info(f"[LogMiner] Mining restricted to {len(tables) or 'all non-SYS'} table(s).")
+        return self._table_filter
+
+    def _build_table_filter(self, conn: cx_Oracle.Connection) -> Tuple[str, Dict[str, Any]]:
+        """(predicate, binds) for _get_table_filter; collection binds belong to conn."""
+        tables = [(t['schema'], t['table']) for t in self.config.get('tables') or []]
+        if not tables:
+            return "SEG_OWNER NOT LIKE 'SYS%'", {}
+        if len(tables) <= MAX_INLINE_TABLE_FILTERS:
+            pairs = []
+            binds: Dict[str, Any] = {}
+            for i, (owner, table) in enumerate(tables):
+                pairs.append(f"(:own{i}, :tab{i})")
+                binds[f'own{i}'] = owner
+                binds[f'tab{i}'] = table
+            return f"(SEG_OWNER, TABLE_NAME) IN ({', '.join(pairs)})", binds
+        list_type = conn.gettype("SYS.ODCIVARCHAR2LIST")
+        table_list = list_type.newobject()
+        table_list.extend([f"{owner}.{table}" for owner, table in tables])
+        return (
+            "SEG_OWNER || '.' || TABLE_NAME IN (SELECT COLUMN_VALUE FROM TABLE(:table_list))",
+            {'table_list': table_list}
+        )
+
+    def _build_change_event(self, op_code: int, scn: int, ts: Any, schema: str, table: str,
+                            row_id: Optional[str], sql_redo: str, sql_undo: Optional[str]) -> Dict[str, Any]:
+        """Turn one V$LOGMNR_CONTENTS row into a structured change event."""
+        event = {
+            'scn': scn,
+            'timestamp': ts,
+            'operation': {1: 'insert', 2: 'delete', 3: 'update'}.get(op_code),
+            'schema': schema,
+            'table': table,
+            'row_id': row_id,
+        }
+        try:
+            parsed = self._redo_parser.parse(sql_redo, sql_undo, self._get_cached_primary_key(schema, table))
+            event['before_data'] = parsed['before_data']
+            event['after_data'] = parsed['after_data']
+            event['primary_keys'] = parsed['primary_keys']
+        except RedoParseError as e:
+            # Keep the raw statement so the change can be inspected; the target will skip it
+            logger.warning(f"Could not parse SQL_REDO at SCN {scn} for {schema}.{table}: {e}")
+            event['sql'] = sql_redo
+        return event
+
+    def _get_cached_primary_key(self, schema: str, table: str) -> List[str]:
+        """Primary key columns of a source table, looked up once per table."""
+        key = (schema, table)
+        pk_columns = self._pk_columns_cache.get(key)
+        if pk_columns is None:
+            with self._pk_lookup_lock:
+                pk_columns = self._pk_columns_cache.get(key)
+                if pk_columns is None:
+                    try:
+                        with self.conn.cursor() as pk_cursor:
+                            pk_columns = self._get_primary_key_columns(pk_cursor, schema, table)
+                    except cx_Oracle.Error as e:
+                        logger.warning(f"Could not read primary key of {schema}.{table}: {e}")
+                        pk_columns = []
+                    self._pk_columns_cache[key] = pk_columns
+        return pk_columns
+
     def validate_logminer_privileges(self) -> bool:
         """Comprehensive privilege validation with proper error handling"""
         checks = [
@@ -657,6 +1512,13 @@ class OracleLogMinerConnector(SourceConnector):
             return False
 
 
+    def _reset_session_state(self) -> None:
+        """Forget the range tracked for the long-lived session."""
+        self._session_start_scn = None
+        self._session_end_scn = None
+        self._session_log_seq = None
+        self._log_registry.reset()
+
     def _end_logminer_session(self):
         """Stops the current LogMiner session."""
         if self.conn and self._logminer_started:
@@ -665,6 +1527,7 @@ class OracleLogMinerConnector(SourceConnector):
                 with self.conn.cursor() as cursor:
                     cursor.execute("BEGIN DBMS_LOGMNR.END_LOGMNR(); END;")
                 self._logminer_started = False
+                self._reset_session_state()
                 logger.info("[LogMiner] Session ended successfully.")
             except cx_Oracle.Error as e:
                  # ORA-01307: no LogMiner session is active - Ignore safely
@@ -672,6 +1535,7 @@ class OracleLogMinerConnector(SourceConnector):
                  if error_obj.code == 1307:
                      logger.warning("[LogMiner] Attempted to end session, but none was active (ORA-01307).")
                      self._logminer_started = False # Ensure state is correct
+                     self._reset_session_state()
                  else:
                      logger.error(f"[LogMiner] Error ending LogMiner session: {e}", exc_info=True)
                      # Don't prevent disconnect, just log error
@@ -707,6 +1571,39 @@ class OracleLogMinerConnector(SourceConnector):
             logger.error(f"Error fetching current SCN: {e}", exc_info=True)
             return None
 
+    def get_snapshot_position(self) -> Optional[Dict[str, Any]]:
+        """
+        Pick the SCN of a consistent initial load snapshot and where CDC must start after it.
+
+        Tables are read AS OF 'snapshot_scn' (see set_snapshot), which sees exactly the
+        transactions committed at or before it. CDC starts just below the first SCN of
+        the oldest transaction open at that point, because LogMiner lists its rows under
+        their redo SCN; rows of transactions committed by the snapshot are skipped using
+        COMMIT_SCN. The undo retention must cover the whole load (ORA-01555 otherwise).
+        """
+        if not self.conn: raise ConnectionError("Not connected to Oracle.")
+        try:
+            with self.conn.cursor() as cursor:
+                snapshot_scn, start_scn = self._restart_horizon(cursor)
+        except cx_Oracle.Error as e:
+            logger.error(f"Error fetching snapshot SCN: {e}", exc_info=True)
+            return None
+        logger.info(f"Initial load snapshot at SCN {snapshot_scn}; CDC will start after SCN {start_scn}.")
+        return {'scn': start_scn, 'snapshot_scn': snapshot_scn}
+
+    def set_snapshot(self, position: Optional[Dict[str, Any]]) -> None:
+        """Read initial load data AS OF position['snapshot_scn'] (None reads current data)."""
+        self._snapshot_scn = int(position['snapshot_scn']) if position and position.get('snapshot_scn') else None
+
+    def _table_expr(self, schema_name: str, table_name: str, partition: Optional[str] = None) -> str:
+        """FROM clause of an initial load query, as of the snapshot SCN when one is set."""
+        expr = f'"{schema_name}"."{table_name}"'
+        if partition:
+            expr += f' PARTITION ("{partition}")'
+        if self._snapshot_scn:
+            expr += f" AS OF SCN {self._snapshot_scn}"
+        return expr
+
     def get_schemas_and_tables(self) -> Dict[str, List[str]]:
         """Retrieve accessible schemas and their tables from Oracle."""
         if not self.conn:
@@ -829,9 +1726,9 @@ class OracleLogMinerConnector(SourceConnector):
         pks = [row[0] for row in cursor]
         logger.info(f"_get_primary_key_columns:  {pks}")
 
-        # If no PKs found, try uppercase
+        # If no PKs found, retry with the names as given (quoted mixed-case identifiers)
         if not pks:
-            cursor.execute(query, {'schema': schema_name.upper(), 'table': table_name.upper()})
+            cursor.execute(query, {'owner': schema_name, 'tbl': table_name})
             pks = [row[0] for row in cursor]
             logger.info(f"_get_primary_key_columns second attempt:  {pks}")
 
@@ -911,43 +1808,240 @@ class OracleLogMinerConnector(SourceConnector):
 
     # Optional: Implement initial load with pagination
     def perform_initial_load_chunk(self, schema_name: str, table_name: str, chunk_size: int = 1000) -> Generator[List[Dict[str, Any]], None, None]:
-        """Generator to fetch table data in chunks using Oracle pagination."""
+        """
+        Generator to fetch table data in chunks.
+
+        Tables with a primary key are read with keyset pagination: every chunk starts
+        right after the last key of the previous one (WHERE pk > :last ORDER BY pk FETCH
+        FIRST n ROWS), so each chunk is an index range scan and the cost per chunk stays
+        flat however deep into the table we are. Tables without a usable key are streamed
+        from one open cursor with fetchmany.
+        """
         if not self.conn:
             raise ConnectionError("Not connected to Oracle.")
 
-        print(f"Starting initial load for {schema_name}.{table_name}...") # Replace with logging
-        offset = 0
+        logger.info(f"Starting initial load for {schema_name}.{table_name}...")
         try:
-            with self.conn.cursor() as cursor:
-                 # Get column names to build dictionaries correctly
-                 table_schema = self.get_table_schema(schema_name, table_name)
-                 column_names = [col['name'] for col in table_schema['columns']]
-                 column_list_str = ", ".join([f'"{c}"' for c in column_names]) # Quote column names
+            # Get column names to build dictionaries correctly
+            table_schema = self.get_table_schema(schema_name, table_name)
+            column_names = [col['name'] for col in table_schema['columns']]
+            column_list_str = ", ".join([f'"{c}"' for c in column_names]) # Quote column names
+            pk_columns = self._get_cached_primary_key(schema_name, table_name)
+
+            if pk_columns and all(pk in column_names for pk in pk_columns):
+                chunks = self._keyset_chunks(schema_name, table_name, column_names, column_list_str,
+                                             pk_columns, chunk_size)
+            else:
+                logger.info(f"No usable primary key on {schema_name}.{table_name}; streaming with fetchmany.")
+                chunks = self._streamed_chunks(self._table_expr(schema_name, table_name), column_names,
+                                               column_list_str, chunk_size)
+
+            rows_read = 0
+            for chunk in chunks:
+                rows_read += len(chunk)
+                yield chunk
+
+            logger.info(f"Completed initial load for {schema_name}.{table_name} ({rows_read} rows).")
 
-                 while True:
-                    query = f"""
-                        SELECT {column_list_str}
-                        FROM "{schema_name}"."{table_name}"
-                        ORDER BY ROWID -- Or use primary key for deterministic order if possible
-                        OFFSET :offset ROWS FETCH NEXT :chunk_size ROWS ONLY
-                    """
-                    cursor.execute(query, {'offset': offset, 'chunk_size': chunk_size})
-                    rows = cursor.fetchall()
+        except cx_Oracle.Error as e:
+            logger.error(f"Error during initial load for {schema_name}.{table_name}: {e}")
+            raise # Re-raise the exception
 
-                    if not rows:
-                        break # No more data
+    def _keyset_chunks(self, schema_name: str, table_name: str, column_names: List[str], column_list_str: str,
+                       pk_columns: List[str], chunk_size: int) -> Generator[List[Dict[str, Any]], None, None]:
+        """Chunks of chunk_size rows in primary key order, each seeking past the last key read."""
+        order_by = ", ".join(f'"{c}"' for c in pk_columns)
+        # (k1, k2, ...) > (:k0, :k1, ...) expanded, since Oracle has no row-value comparison
+        terms = []
+        for i, pk in enumerate(pk_columns):
+            equal = [f'"{prev}" = :k{j}' for j, prev in enumerate(pk_columns[:i])]
+            terms.append("(" + " AND ".join(equal + [f'"{pk}" > :k{i}']) + ")")
+        seek = " OR ".join(terms)
+        table_expr = self._table_expr(schema_name, table_name)
+
+        first_query = f"""
+            SELECT {column_list_str}
+            FROM {table_expr}
+            ORDER BY {order_by}
+            FETCH FIRST :chunk_size ROWS ONLY
+        """
+        next_query = f"""
+            SELECT {column_list_str}
+            FROM {table_expr}
+            WHERE {seek}
+            ORDER BY {order_by}
+            FETCH FIRST :chunk_size ROWS ONLY
+        """
+        key_idx = [column_names.index(pk) for pk in pk_columns]
 
-                    # Convert rows to list of dictionaries
-                    chunk = [dict(zip(column_names, row)) for row in rows]
-                    yield chunk
+        with self.conn.cursor() as cursor:
+            cursor.arraysize = chunk_size
+            cursor.prefetchrows = chunk_size + 1
+            cursor.execute(first_query, {'chunk_size': chunk_size})
+            while True:
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                yield [dict(zip(column_names, row)) for row in rows]
+                if len(rows) < chunk_size:
+                    break
+                last = rows[-1]
+                binds = {f'k{i}': last[idx] for i, idx in enumerate(key_idx)}
+                binds['chunk_size'] = chunk_size
+                cursor.execute(next_query, binds)
+
+    def _streamed_chunks(self, table_expr: str, column_names: List[str], column_list_str: str, chunk_size: int,
+                         where: Optional[str] = None, binds: Optional[Dict[str, Any]] = None
+                         ) -> Generator[List[Dict[str, Any]], None, None]:
+        """Chunks of chunk_size rows from a single scan of table_expr, in no particular order."""
+        query = f"SELECT {column_list_str} FROM {table_expr}"
+        if where:
+            query += f" WHERE {where}"
+        with self.conn.cursor() as cursor:
+            cursor.arraysize = chunk_size
+            cursor.prefetchrows = chunk_size + 1
+            cursor.execute(query, binds or {})
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(zip(column_names, row)) for row in rows]
 
-                    offset += len(rows) # Move to the next offset
+    def get_load_ranges(self, schema_name: str, table_name: str, max_ranges: int) -> List[Dict[str, Any]]:
+        """
+        Split a table into up to max_ranges ranges for parallel initial load.
 
-                 print(f"Completed initial load for {schema_name}.{table_name}.") # Replace with logging
+        ROWID ranges built from DBA_EXTENTS are preferred: they follow the physical layout,
+        so every range is a contiguous block scan of roughly the same size. Without access
+        to DBA_EXTENTS a partitioned table is split into groups of consecutive partitions
+        (ALL_TAB_PARTITIONS), and otherwise a single-column numeric or character primary
+        key is split into NTILE buckets. A table none of these apply to is loaded as one range.
+        """
+        if not self.conn:
+            raise ConnectionError("Not connected to Oracle.")
+        if max_ranges <= 1:
+            return [{'id': 'all', 'kind': 'table'}]
+
+        for splitter in (self._rowid_load_ranges, self._partition_load_ranges, self._pk_load_ranges):
+            try:
+                ranges = splitter(schema_name, table_name, max_ranges)
+            except cx_Oracle.DatabaseError as e:
+                logger.info(f"{splitter.__name__} not usable for {schema_name}.{table_name}: {e}")
+                continue
+            if ranges:
+                logger.info(f"Split {schema_name}.{table_name} into {len(ranges)} {ranges[0]['kind']} range(s).")
+                return ranges
+        return [{'id': 'all', 'kind': 'table'}]
+
+    def _rowid_load_ranges(self, schema_name: str, table_name: str, max_ranges: int) -> List[Dict[str, Any]]:
+        with self.conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT e.blocks,
+                       DBMS_ROWID.ROWID_CREATE(1, o.data_object_id, e.relative_fno, e.block_id, 0),
+                       DBMS_ROWID.ROWID_CREATE(1, o.data_object_id, e.relative_fno, e.block_id + e.blocks - 1, 32767)
+                FROM dba_extents e
+                JOIN dba_objects o
+                  ON o.owner = e.owner
+                 AND o.object_name = e.segment_name
+                 AND NVL(o.subobject_name, '-') = NVL(e.partition_name, '-')
+                WHERE e.owner = :owner
+                  AND e.segment_name = :tbl
+                  AND o.object_type IN ('TABLE', 'TABLE PARTITION', 'TABLE SUBPARTITION')
+                ORDER BY o.data_object_id, e.relative_fno, e.block_id
+            """, {'owner': schema_name.upper(), 'tbl': table_name.upper()})
+            extents = cursor.fetchall()
+        if not extents:
+            return []
 
+        # Consecutive extents are grouped so each range covers about the same number of blocks
+        target_blocks = max(1, sum(blocks for blocks, _, _ in extents) // max_ranges)
+        ranges: List[Dict[str, Any]] = []
+        group_blocks, lo = 0, None
+        for blocks, first_rowid, last_rowid in extents:
+            if lo is None:
+                lo = first_rowid
+            group_blocks += blocks
+            if group_blocks >= target_blocks and len(ranges) < max_ranges - 1:
+                ranges.append({'id': f"r{len(ranges)}", 'kind': 'rowid', 'lo': lo, 'hi': last_rowid})
+                group_blocks, lo = 0, None
+        if lo is not None:
+            ranges.append({'id': f"r{len(ranges)}", 'kind': 'rowid', 'lo': lo, 'hi': extents[-1][2]})
+        return ranges
+
+    def _partition_load_ranges(self, schema_name: str, table_name: str, max_ranges: int) -> List[Dict[str, Any]]:
+        with self.conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT partition_name
+                FROM all_tab_partitions
+                WHERE table_owner = :owner AND table_name = :tbl
+                ORDER BY partition_position
+            """, {'owner': schema_name.upper(), 'tbl': table_name.upper()})
+            partitions = [row[0] for row in cursor]
+        if not partitions:
+            return []
+        # Consecutive partitions are grouped into at most max_ranges ranges of near-equal count
+        count = min(max_ranges, len(partitions))
+        bounds = [len(partitions) * i // count for i in range(count + 1)]
+        return [{'id': f"p{i}", 'kind': 'partition', 'partitions': partitions[bounds[i]:bounds[i + 1]]}
+                for i in range(count)]
+
+    def _pk_load_ranges(self, schema_name: str, table_name: str, max_ranges: int) -> List[Dict[str, Any]]:
+        pk_columns = self._get_cached_primary_key(schema_name, table_name)
+        if len(pk_columns) != 1:
+            return []
+        pk = pk_columns[0]
+        with self.conn.cursor() as cursor:
+            cursor.execute(f"""
+                SELECT MIN("{pk}")
+                FROM (SELECT "{pk}", NTILE(:n) OVER (ORDER BY "{pk}") AS bucket
+                      FROM {self._table_expr(schema_name, table_name)})
+                GROUP BY bucket
+                ORDER BY 1
+            """, {'n': max_ranges})
+            starts = [row[0] for row in cursor]
+        # Range bounds are persisted as load progress, so they must be plain JSON values
+        if not all(isinstance(v, (int, float, str)) for v in starts):
+            return []
+        # Ranges are half-open [lo, next lo) and contiguous; the outer ones are open-ended
+        # so keys outside the planned span are still read
+        return [{'id': f"k{i}", 'kind': 'pk', 'column': pk,
+                 'lo': starts[i] if i > 0 else None, 'hi': starts[i + 1] if i < len(starts) - 1 else None}
+                for i in range(len(starts))]
+
+    def read_load_range(self, schema_name: str, table_name: str, load_range: Dict[str, Any],
+                        chunk_size: int) -> Generator[List[Dict[str, Any]], None, None]:
+        """Stream one range from get_load_ranges in chunks of chunk_size rows."""
+        if not self.conn:
+            raise ConnectionError("Not connected to Oracle.")
+
+        kind = load_range.get('kind')
+        if kind not in ('rowid', 'partition', 'pk'):
+            yield from self.perform_initial_load_chunk(schema_name, table_name, chunk_size)
+            return
+
+        table_schema = self.get_table_schema(schema_name, table_name)
+        column_names = [col['name'] for col in table_schema['columns']]
+        column_list_str = ", ".join([f'"{c}"' for c in column_names])
+        # Progress saved before partitions were grouped holds a single 'partition'
+        partitions = load_range.get('partitions') or [load_range.get('partition')]
+        where, binds = None, None
+        if kind == 'rowid':
+            where = "ROWID BETWEEN CHARTOROWID(:lo) AND CHARTOROWID(:hi)"
+            binds = {'lo': load_range['lo'], 'hi': load_range['hi']}
+        elif kind == 'pk':
+            column = load_range['column']
+            bounds = [(f'"{column}" >= :lo', 'lo'), (f'"{column}" < :hi', 'hi')]
+            bounds = [(cond, key) for cond, key in bounds if load_range.get(key) is not None]
+            where = " AND ".join(cond for cond, _ in bounds) or None
+            binds = {key: load_range[key] for _, key in bounds}
+
+        try:
+            for partition in partitions:
+                table_expr = self._table_expr(schema_name, table_name, partition)
+                yield from self._streamed_chunks(table_expr, column_names, column_list_str, chunk_size, where, binds)
         except cx_Oracle.Error as e:
-            print(f"Error during initial load for {schema_name}.{table_name}: {e}") # Replace with logging
-            raise # Re-raise the exception
+            logger.error(f"Error loading range {load_range.get('id')} of {schema_name}.{table_name}: {e}")
+            raise
 
     def _validate_scn_range(self, start_scn: int) -> bool:
         """Validate that the SCN is within available log range"""
@@ -0,0 +1,179 @@
+# parallel_apply.py
+"""
+Parallel apply of CDC batches over several target connections ("lanes").
+
+Every change is routed to a lane by a hash of its row key (schema, table, primary
+key), so all changes to one row go through the same lane and are applied in commit
+order. Each lane is a thread with its own target connector that applies its share of
+a batch in one transaction. Lanes work through their queues independently, so a fast
+lane may already apply later batches while a slow one is still busy.
+
+A batch is only complete when every lane has committed its share. The checkpoint
+barrier tracks this per batch: committed_position() is the position of the newest
+batch all lanes have committed, and only that position may be stored as the task's
+last_position. A restart therefore replays at most the batches that were in flight.
+
+Changes without a usable row key (no primary key, key-changing updates, raw SQL) can't
+be routed safely; a batch containing one is applied on a single lane after all lanes
+have drained, and the other lanes wait until it is committed.
+
+Rows of different tables are applied in parallel, so targets that enforce foreign keys
+between replicated tables should keep the serial apply.
+"""
+
+import logging
+import queue
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+from app.interfaces import TargetConnector
+from app.services.cdc.compaction import _row_key
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ParallelApplier:
+    """
+    Applies batches over N lanes and reports the position all lanes have committed.
+
+    Args:
+        app: Flask application; lanes push its app context (connectors log via current_app).
+        target_factory: Called with the lane number; returns a new, connected TargetConnector.
+        lanes: Number of lanes (target connections).
+        queue_depth: Batches a lane may have queued before submit() blocks.
+    """
+
+    def __init__(self, app, target_factory: Callable[[int], TargetConnector], lanes: int = 4,
+                 queue_depth: int = 4):
+        self.app = app
+        self.lanes = max(1, lanes)
+        self._targets: List[TargetConnector] = [target_factory(i) for i in range(self.lanes)]
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=queue_depth) for _ in range(self.lanes)]
+        self._lock = threading.Condition()
+        self._lane_committed: List[int] = [0] * self.lanes  # last batch seq committed per lane
+        self._positions: Dict[int, Optional[Dict[str, Any]]] = {}  # batch seq -> position, until committed
+        self._committed_position: Optional[Dict[str, Any]] = None
+        self._seq = 0
+        self._error: Optional[BaseException] = None
+        self._threads = [threading.Thread(target=self._run_lane, args=(i,), name=f'apply-lane-{i}', daemon=True)
+                         for i in range(self.lanes)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, changes: List[Dict[str, Any]], position: Optional[Dict[str, Any]]) -> None:
+        """
+        Queue a batch; position is where the source resumes once the batch is applied.
+
+        Blocks while lanes are queue_depth batches behind. Raises the error of a failed lane.
+        """
+        self._raise_lane_error()
+        shares: List[List[Dict[str, Any]]] = [[] for _ in range(self.lanes)]
+        barrier = False
+        for change in changes:
+            key = _row_key(change)
+            if key is None:
+                barrier = True
+                break
+            shares[zlib.crc32(repr(key).encode()) % self.lanes].append(change)
+
+        if barrier:
+            self.drain()
+            shares = [list(changes)] + [[] for _ in range(self.lanes - 1)]
+
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._positions[seq] = position
+        for lane, share in enumerate(shares):
+            self._put(lane, (seq, share))
+        if barrier:
+            self.drain()
+
+    def committed_position(self) -> Optional[Dict[str, Any]]:
+        """Position of the newest batch every lane has committed (None before the first)."""
+        with self._lock:
+            return self._committed_position
+
+    def drain(self) -> Optional[Dict[str, Any]]:
+        """Wait until every queued batch is committed; returns committed_position()."""
+        with self._lock:
+            while self._error is None and min(self._lane_committed) < self._seq:
+                self._lock.wait(timeout=1.0)
+        self._raise_lane_error()
+        return self.committed_position()
+
+    def get_apply_metrics(self) -> Dict[str, Any]:
+        """Counters of all lanes added up."""
+        metrics: Dict[str, Any] = {}
+        for target in self._targets:
+            for name, value in target.get_apply_metrics().items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    metrics[name] = metrics.get(name, 0) + value
+        lookups = metrics.get('statement_cache_hits', 0) + metrics.get('statement_cache_misses', 0)
+        if lookups:
+            metrics['statement_cache_hit_rate'] = round(metrics['statement_cache_hits'] / lookups, 4)
+        return metrics
+
+    def close(self) -> None:
+        """Stop the lanes (after their queued batches) and disconnect them."""
+        for lane in range(self.lanes):
+            self._put(lane, _STOP, force=True)
+        for thread in self._threads:
+            thread.join()
+        for target in self._targets:
+            try:
+                target.disconnect()
+            except Exception as e:
+                logger.warning(f"Error closing apply lane connection: {e}")
+
+    def _put(self, lane: int, item: Any, force: bool = False) -> None:
+        while True:
+            if not force:
+                self._raise_lane_error()
+            elif not self._threads[lane].is_alive():
+                return
+            try:
+                self._queues[lane].put(item, timeout=1.0)
+                return
+            except queue.Full:
+                continue
+
+    def _raise_lane_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Parallel apply lane failed: {self._error}") from self._error
+
+    def _run_lane(self, lane: int) -> None:
+        target = self._targets[lane]
+        with self.app.app_context():
+            while True:
+                item = self._queues[lane].get()
+                if item is _STOP:
+                    return
+                if self._error is not None:
+                    continue  # a lane failed; keep consuming so submit/close never block
+                seq, changes = item
+                try:
+                    if changes:
+                        target.apply_changes(changes)
+                except BaseException as e:
+                    logger.error(f"Apply lane {lane} failed on batch {seq}: {e}", exc_info=True)
+                    with self._lock:
+                        self._error = e
+                        self._lock.notify_all()
+                    continue
+                self._lane_committed_up_to(lane, seq)
+
+    def _lane_committed_up_to(self, lane: int, seq: int) -> None:
+        with self._lock:
+            self._lane_committed[lane] = seq
+            barrier = min(self._lane_committed)
+            # Advance the checkpoint to the newest batch every lane has committed
+            done = [s for s in self._positions if s <= barrier]
+            for s in sorted(done):
+                position = self._positions.pop(s)
+                if position:
+                    self._committed_position = position
+            self._lock.notify_all()
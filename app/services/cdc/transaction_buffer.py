@@ -0,0 +1,138 @@
+# transaction_buffer.py
+"""
+Python-side transaction buffer used when LogMiner runs without COMMITTED_DATA_ONLY.
+
+Change events are grouped by transaction id (XID) as they are mined. A transaction is
+released in full when its COMMIT is read and dropped on ROLLBACK. Large transactions
+are spilled to local segment files so worker memory stays bounded no matter how many
+rows a single transaction touches.
+"""
+
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _OpenTransaction:
+    __slots__ = ('xid', 'first_scn', 'events', 'spill_path', 'spilled')
+
+    def __init__(self, xid: str, first_scn: int):
+        self.xid = xid
+        self.first_scn = first_scn
+        self.events: List[Dict[str, Any]] = []
+        self.spill_path: Optional[str] = None
+        self.spilled = 0
+
+    def __len__(self) -> int:
+        return self.spilled + len(self.events)
+
+
+class TransactionBuffer:
+    """
+    Buffers uncommitted change events per transaction, spilling large ones to disk.
+
+    Args:
+        spill_threshold: Events kept in memory per transaction before its buffered events
+                         are appended to the transaction's segment file.
+        max_buffered_events: Upper bound on events held in memory across all open
+                             transactions; the largest transaction is spilled when exceeded.
+        spill_dir: Directory for segment files (a private temp dir by default).
+    """
+
+    def __init__(self, spill_threshold: int = 10000, max_buffered_events: int = 100000,
+                 spill_dir: Optional[str] = None):
+        self.spill_threshold = spill_threshold
+        self.max_buffered_events = max_buffered_events
+        self._spill_root = spill_dir
+        self._spill_dir: Optional[str] = None
+        self._open: Dict[str, _OpenTransaction] = {}
+        self._in_memory = 0
+
+    @property
+    def open_transactions(self) -> int:
+        return len(self._open)
+
+    @property
+    def buffered_events(self) -> int:
+        return self._in_memory
+
+    def begin(self, xid: str, scn: int) -> None:
+        if xid not in self._open:
+            self._open[xid] = _OpenTransaction(xid, scn)
+
+    def add(self, xid: str, scn: int, event: Dict[str, Any]) -> None:
+        txn = self._open.get(xid)
+        if txn is None:
+            # Transaction started before mining did (or its start record was filtered)
+            txn = self._open[xid] = _OpenTransaction(xid, scn)
+        txn.events.append(event)
+        self._in_memory += 1
+        if len(txn.events) >= self.spill_threshold:
+            self._spill(txn)
+        elif self._in_memory > self.max_buffered_events:
+            self._spill(max(self._open.values(), key=lambda t: len(t.events)))
+
+    def size(self, xid: str) -> int:
+        txn = self._open.get(xid)
+        return len(txn) if txn else 0
+
+    def oldest_open_scn(self, exclude: Optional[str] = None) -> Optional[int]:
+        """First SCN of the oldest open transaction (where mining must restart after a crash)."""
+        return min((t.first_scn for x, t in self._open.items() if x != exclude), default=None)
+
+    def commit(self, xid: str) -> Iterator[Dict[str, Any]]:
+        """Yield the events of a committed transaction in redo order, then forget it."""
+        txn = self._open.get(xid)
+        if txn is None:
+            return
+        try:
+            if txn.spill_path:
+                with open(txn.spill_path, 'rb') as f:
+                    while True:
+                        try:
+                            segment = pickle.load(f)
+                        except EOFError:
+                            break
+                        yield from segment
+            yield from txn.events
+        finally:
+            self.discard(xid)
+
+    def discard(self, xid: str) -> None:
+        """Drop a transaction (ROLLBACK, or already applied before a restart)."""
+        txn = self._open.pop(xid, None)
+        if txn is None:
+            return
+        self._in_memory -= len(txn.events)
+        if txn.spill_path:
+            try:
+                os.remove(txn.spill_path)
+            except OSError as e:
+                logger.warning(f"Could not remove transaction spill file {txn.spill_path}: {e}")
+
+    def clear(self) -> None:
+        for xid in list(self._open):
+            self.discard(xid)
+        if self._spill_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def _spill(self, txn: _OpenTransaction) -> None:
+        if not txn.events:
+            return
+        if txn.spill_path is None:
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(prefix='rm-txn-', dir=self._spill_root)
+            txn.spill_path = os.path.join(self._spill_dir, f"{txn.xid}.seg")
+            logger.info(f"Transaction {txn.xid} exceeds {self.spill_threshold} buffered events; "
+                        f"spilling to {txn.spill_path}")
+        with open(txn.spill_path, 'ab') as f:
+            pickle.dump(txn.events, f, protocol=pickle.HIGHEST_PROTOCOL)
+        txn.spilled += len(txn.events)
+        self._in_memory -= len(txn.events)
+        txn.events = []
@@ -0,0 +1,254 @@
+# initial_load.py
+"""
+Parallel initial load.
+
+A table is split into ranges by the source connector (get_load_ranges) and the ranges
+are loaded by a pool of worker threads. Every worker owns one source and one target
+connection pair for the duration of a table, reads a range with read_load_range and
+writes it inside one target load_transaction, so a range is either fully loaded or not
+at all.
+
+Progress is tracked per table as {'ranges': [...], 'done': [range ids], 'rows': n}.
+The caller persists it after every finished range; a restarted load reuses the same
+ranges and skips the ones already done. A range committed on the target just before a
+crash may be missing from that progress, so each load transaction also records its
+range on the target (TargetConnector.loaded_ranges) and a resumed load skips those too.
+
+Target tables are emptied up front by clear_tables, and indexes and constraints
+deferred during the load (TargetConnector.defer_indexes) are rebuilt afterwards by
+rebuild_deferred_indexes; both work one table per worker connection.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.interfaces import SourceConnector, TargetConnector
+
+logger = logging.getLogger(__name__)
+
+
+class LoadStopped(Exception):
+    """Raised when a parallel load is interrupted by a stop request."""
+
+
+class ParallelTableLoader:
+    """
+    Loads tables range by range over parallel reader/writer connection pairs.
+
+    Args:
+        app: Flask application; workers push its app context (connectors log via current_app).
+        source_factory: Returns a new, connected SourceConnector.
+        target_factory: Returns a new, connected TargetConnector.
+        parallelism: Number of reader/writer pairs.
+        chunk_size: Rows per read/write chunk.
+        stop_check: Polled while loading; returns True when the load must stop.
+    """
+
+    def __init__(self, app, source_factory: Callable[[], SourceConnector],
+                 target_factory: Callable[[], TargetConnector], parallelism: int = 4,
+                 chunk_size: int = 1000, stop_check: Optional[Callable[[], bool]] = None):
+        self.app = app
+        self.source_factory = source_factory
+        self.target_factory = target_factory
+        self.parallelism = max(1, parallelism)
+        self.chunk_size = chunk_size
+        self.stop_check = stop_check
+        self._local = threading.local()
+        self._pairs: List[Tuple[SourceConnector, TargetConnector]] = []
+        self._pairs_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def load_table(self, source: SourceConnector, schema_name: str, table_name: str, target_schema: str,
+                   progress: Optional[Dict[str, Any]],
+                   on_progress: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """
+        Load one table, resuming from progress when given.
+
+        Args:
+            source: Connected source used to plan the ranges (on the calling thread).
+            progress: Progress saved by an earlier, interrupted run of this table, or None.
+            on_progress: Called on the calling thread with the updated progress after
+                         every finished range.
+
+        Returns:
+            The final progress of the table.
+
+        Raises:
+            LoadStopped: stop_check requested a stop; finished ranges are kept.
+        """
+        table_key = f"{schema_name}.{table_name}"
+        tracker = self.target_factory()
+        try:
+            if progress and progress.get('ranges'):
+                done = list(progress.get('done') or [])
+                # Ranges whose rows committed on the target after the progress was last saved
+                loaded = tracker.loaded_ranges(table_key)
+                recovered = [r['id'] for r in progress['ranges'] if r['id'] in loaded and r['id'] not in done]
+                if recovered:
+                    logger.info(f"{table_key}: {len(recovered)} range(s) were loaded after the last saved progress.")
+                progress = {**progress, 'done': done + recovered}
+                if recovered:
+                    on_progress(progress)
+            else:
+                tracker.reset_loaded_ranges(table_key)
+                ranges = source.get_load_ranges(schema_name, table_name, self.parallelism * 4)
+                progress = {'ranges': ranges, 'done': [], 'rows': 0}
+                on_progress(progress)
+        finally:
+            tracker.disconnect()
+
+        pending = [r for r in progress['ranges'] if r['id'] not in set(progress['done'])]
+        logger.info(f"Loading {schema_name}.{table_name}: {len(pending)} of {len(progress['ranges'])} range(s) "
+                    f"left, {self.parallelism} worker(s).")
+
+        executor = ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix='initial-load')
+        futures: Dict[Future, Dict[str, Any]] = {}
+        try:
+            for load_range in pending:
+                future = executor.submit(self._load_range, schema_name, table_name, target_schema, load_range)
+                futures[future] = load_range
+
+            not_done = set(futures)
+            while not_done:
+                finished, not_done = wait(not_done, timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    rows = future.result()
+                    load_range = futures[future]
+                    progress = {**progress,
+                                'done': progress['done'] + [load_range['id']],
+                                'rows': progress.get('rows', 0) + rows}
+                    on_progress(progress)
+                    logger.debug(f"Range {load_range['id']} of {schema_name}.{table_name} loaded ({rows} rows).")
+                if self.stop_check and self.stop_check():
+                    raise LoadStopped(f"Stop requested while loading {schema_name}.{table_name}.")
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            self._stop.clear()
+            # The pool's threads are gone; their connection pairs go with them
+            self.close()
+
+        logger.info(f"Loaded {schema_name}.{table_name}: {progress.get('rows', 0)} rows.")
+        return progress
+
+    def close(self) -> None:
+        """Disconnect every worker connection pair."""
+        with self._pairs_lock:
+            pairs, self._pairs = self._pairs, []
+            self._local = threading.local()
+        for source, target in pairs:
+            for connector in (source, target):
+                try:
+                    connector.disconnect()
+                except Exception as e:
+                    logger.warning(f"Error closing initial load connection: {e}")
+
+    def _worker_pair(self) -> Tuple[SourceConnector, TargetConnector]:
+        pair = getattr(self._local, 'pair', None)
+        if pair is None:
+            pair = self._local.pair = (self.source_factory(), self.target_factory())
+            with self._pairs_lock:
+                self._pairs.append(pair)
+        return pair
+
+    def _load_range(self, schema_name: str, table_name: str, target_schema: str,
+                    load_range: Dict[str, Any]) -> int:
+        with self.app.app_context():
+            if self._stop.is_set():
+                raise LoadStopped()
+            source, target = self._worker_pair()
+            rows = 0
+            with target.load_transaction(f"{schema_name}.{table_name}", load_range['id']):
+                for chunk in source.read_load_range(schema_name, table_name, load_range, self.chunk_size):
+                    if self._stop.is_set():
+                        # Leaving the load transaction rolls the partial range back
+                        raise LoadStopped()
+                    if chunk:
+                        target.write_initial_load_chunk(target_schema, table_name, chunk)
+                        rows += len(chunk)
+            return rows
+
+
+def clear_tables(app, target_factory: Callable[[], TargetConnector], tables: List[Tuple[str, str]],
+                 parallelism: int = 4) -> None:
+    """
+    Empty target tables (TargetConnector.truncate_table) before a load, several at a time.
+
+    Args:
+        app: Flask application; workers push its app context.
+        target_factory: Returns a new, connected TargetConnector (one per table).
+        tables: (schema, table) pairs.
+        parallelism: Tables cleared at the same time.
+
+    Raises:
+        The first error of a worker, after the other running clears have finished.
+    """
+    def _clear(schema_name: str, table_name: str) -> None:
+        with app.app_context():
+            target = target_factory()
+            try:
+                target.truncate_table(schema_name, table_name)
+            finally:
+                target.disconnect()
+
+    logger.info(f"Clearing {len(tables)} target table(s), {parallelism} at a time.")
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix='clear-table') as executor:
+        futures = [executor.submit(_clear, schema_name, table_name) for schema_name, table_name in tables]
+    for future in futures:
+        future.result()
+
+
+def rebuild_deferred_indexes(app, target_factory: Callable[[], TargetConnector],
+                             tables: List[Tuple[str, str, List[Dict[str, Any]]]], parallelism: int = 4,
+                             on_progress: Optional[Callable[[str, str, int, int], None]] = None) -> None:
+    """
+    Rebuild the deferred indexes of several tables, tables in parallel.
+
+    Args:
+        app: Flask application; workers push its app context.
+        target_factory: Returns a new, connected TargetConnector (one per worker).
+        tables: (schema, table, deferred) triples, deferred as returned by defer_indexes.
+        parallelism: Tables rebuilt at the same time.
+        on_progress: Called on the calling thread with (schema, table, done, total) after
+                     every rebuilt object.
+
+    Raises:
+        The first error of a worker, after the other running rebuilds have finished.
+    """
+    events: queue.Queue = queue.Queue()
+
+    def _rebuild(schema_name: str, table_name: str, deferred: List[Dict[str, Any]]) -> None:
+        with app.app_context():
+            target = target_factory()
+            try:
+                target.rebuild_indexes(schema_name, table_name, deferred,
+                                       lambda done, total: events.put((schema_name, table_name, done, total)))
+            finally:
+                target.disconnect()
+
+    def _report() -> None:
+        while True:
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                return
+            if on_progress:
+                on_progress(*event)
+
+    logger.info(f"Rebuilding deferred indexes of {len(tables)} table(s), {parallelism} at a time.")
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix='index-rebuild') as executor:
+        not_done = {executor.submit(_rebuild, *table) for table in tables}
+        while not_done:
+            finished, not_done = wait(not_done, timeout=1.0, return_when=FIRST_COMPLETED)
+            _report()
+            for future in finished:
+                if future.exception() is not None:
+                    wait(not_done)
+                    _report()
+                    raise future.exception()
+    _report()
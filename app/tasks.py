@@ -5,6 +5,7 @@ import logging
 from typing import Dict, Any, Optional
 
 from celery import Celery
+from celery.signals import worker_process_shutdown, worker_shutdown
 from redis import Redis
 
 # Assuming interfaces.py is in app/
@@ -12,7 +13,11 @@ from app.interfaces import SourceConnector, TargetConnector
 # Import necessary components from your app package
 from app import db, create_app # *** Import create_app factory ***
 from app.models import ReplicationTask, Endpoint
+from app.connectors import engine_registry
 from app.replication_worker import build_connector_config, get_source_connector, get_target_connector
+from app.services.cdc.compaction import compact_changes
+from app.services.cdc.parallel_apply import ParallelApplier
+from app.services.initial_load import LoadStopped, ParallelTableLoader, clear_tables, rebuild_deferred_indexes
 
 # --- Celery App Definition and Init (Keep as before) ---
 celery_app = Celery(__name__)
@@ -21,6 +26,14 @@ logger = logging.getLogger(__name__) # Use standard logger
 # Keep init_celery if it's defined here, otherwise it's likely in celery.py
 # def init_celery(app: Flask): ... (definition with ContextTask)
 
+
+# Target engines are shared per worker process (see engine_registry); close their pooled
+# connections when a prefork child exits, or the worker itself for solo/thread pools.
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _dispose_target_engines(**kwargs):
+    engine_registry.dispose_all()
+
 # --- Task Definition ---
 @celery_app.task(bind=True)
 def run_replication(self, task_id: int):
@@ -44,6 +57,7 @@ def run_replication(self, task_id: int):
         target_endpoint: Optional[Endpoint] = None
         source_connector: Optional[SourceConnector] = None
         target_connector: Optional[TargetConnector] = None
+        applier: Optional[ParallelApplier] = None
         stop_requested = False
         redis_client = None
         stop_key = None
@@ -98,6 +112,24 @@ def run_replication(self, task_id: int):
             source_config = build_connector_config(source_endpoint)
             target_config = build_connector_config(target_endpoint)
             target_config['target_schema'] = target_endpoint.target_schema
+            target_config['task_id'] = task.id  # names the per-task staging tables
+            # Per-task connector tuning lives in task.options['source'] / task.options['target']
+            task_options = task.options or {}
+            source_config.update(task_options.get('source') or {})
+            # Lets the source restrict change capture to the selected tables
+            source_config['tables'] = task.tables or []
+            target_config.update(task_options.get('target') or {})
+            # exactly_once commits the source position with every batch into a checkpoint table on the
+            # target and resumes from it, so nothing is replayed and plain INSERTs are safe
+            exactly_once = bool(task_options.get('exactly_once', False))
+            if exactly_once:
+                target_config.setdefault('checkpoint_table', 'rm_checkpoint')
+            # merge_enabled makes inserts idempotent upserts on the target unless overridden
+            target_config.setdefault('apply_mode', 'upsert' if task.merge_enabled and not exactly_once else 'plain')
+            # Seconds to wait between empty CDC polls (fractions allowed)
+            poll_interval = float(task_options.get('poll_interval', 5))
+            # Collapse each CDC batch to its net change per primary key before apply
+            compact = bool(task_options.get('compact_changes', False))
 
             logger.info(f"[Task {task_id}] Getting connectors...")
             source_connector = get_source_connector(source_endpoint)
@@ -145,38 +177,114 @@ def run_replication(self, task_id: int):
                 if not target_schema_name:
                      raise ValueError("[Task {task_id}] Initial load requires target schema.")
 
+                load_progress = dict(task.load_progress or {})
+
+                # Read every table at one snapshot and start CDC right after it, so the load can run online.
+                # A resumed load keeps the snapshot its finished tables were read at.
+                snapshot = task.last_position if load_progress and (task.last_position or {}).get('snapshot_scn') else None
+                if snapshot is None:
+                    snapshot = source_connector.get_snapshot_position()
+                    if snapshot:
+                        load_progress = {}  # progress of an earlier run belongs to another snapshot
+                        task.load_progress = None
+                        task.last_position = snapshot
+                        db.session.commit()
+                        logger.info(f"[Task {task_id}] Initial load snapshot fixed; CDC will start from {snapshot}.")
+                source_connector.set_snapshot(snapshot)
+
+                # Tables are loaded range by range over several connection pairs when load_parallelism > 1
+                load_parallelism = int(task_options.get('load_parallelism', 1))
+                load_chunk_size = int(task_options.get('load_chunk_size', 1000))
+                # defer_indexes drops target keys/indexes before loading a table and rebuilds them at the end
+                defer_indexes = bool(task_options.get('defer_indexes', False))
+
+                def _connected_target():
+                    connector = get_target_connector(target_endpoint)
+                    connector.connect(dict(target_config))
+                    return connector
+
+                def _defer_table_indexes(key, table_name):
+                    if not defer_indexes or 'deferred_indexes' in (load_progress.get(key) or {}):
+                        return  # deferred by an earlier run; its saved definitions are still needed
+                    deferred = target_connector.defer_indexes(target_schema_name, table_name)
+                    load_progress[key] = {**(load_progress.get(key) or {}), 'deferred_indexes': deferred or []}
+                    task.load_progress = dict(load_progress)
+                    db.session.commit()
+
+                loader = None
+                if load_parallelism > 1:
+                    # Every range commits together with a record of it on the target (see loaded_ranges)
+                    target_config.setdefault('load_range_table', 'rm_load_ranges')
+
+                    def _connected_source():
+                        connector = get_source_connector(source_endpoint)
+                        connector.connect(dict(source_config))
+                        connector.set_snapshot(snapshot)
+                        return connector
+
+                    loader = ParallelTableLoader(
+                        flask_app,
+                        source_factory=_connected_source,
+                        target_factory=_connected_target,
+                        parallelism=load_parallelism,
+                        chunk_size=load_chunk_size,
+                        stop_check=lambda: bool(redis_client and stop_key and redis_client.exists(stop_key)),
+                    )
+
+                # Empty every target table that starts from scratch before loading any, several at a time.
+                # Tables with loaded ranges of an earlier run are resumed instead.
+                def _resumed(table_ref):
+                    saved = load_progress.get(f"{table_ref['schema']}.{table_ref['table']}") or {}
+                    return saved.get('complete') or (loader and saved.get('ranges'))
+
+                to_clear = [table_ref['table'] for table_ref in selected_tables if not _resumed(table_ref)]
+                if to_clear:
+                    logger.info(f"[Task {task_id}] Clearing {len(to_clear)} target table(s) before initial load...")
+                    clear_tables(flask_app, _connected_target, [(target_schema_name, t) for t in to_clear],
+                                 parallelism=int(task_options.get('clear_parallelism', 4)))
+
                 for table_ref in selected_tables:
                     # ... (load chunks for table_ref) ...
                     schema_name, table_name = table_ref['schema'], table_ref['table']
+                    table_key = f"{schema_name}.{table_name}"
+                    saved_progress = load_progress.get(table_key)
+                    if saved_progress and saved_progress.get('complete'):
+                        logger.info(f"[Task {task_id}] {table_key} was fully loaded by an earlier run, skipping.")
+                        continue
                     logger.info(
                         f"[Task {task_id}] Processing initial load for source {schema_name}.{table_name} -> target {target_schema_name}.{table_name}")
 
-                    # *** TRUNCATE/CLEAR TARGET TABLE ***
-                    cleared_successfully = False  # Flag to track success
-                    try:
-                        logger.info(
-                            f"[Task {task_id}] Clearing target table {target_schema_name}.{table_name} before initial load...")
-                        target_connector.truncate_table(target_schema_name, table_name)
-                        # Assuming truncate_table now returns normally if skipped, or raises error on failure
-                        cleared_successfully = True  # Assume success if no exception
-                        logger.info(
-                            f"[Task {task_id}] Target table {target_schema_name}.{table_name} clear operation completed (may have been skipped if table didn't exist).")
-                    except Exception as clear_err:
-                        # If clearing fails (e.g., permissions error on DELETE), log error and stop task
-                        logger.error(
-                            f"[Task {task_id}] Failed during target table clear operation for {target_schema_name}.{table_name}: {clear_err}",
-                            exc_info=True)
-                        raise  # Stop the task by re-raising
-
-                    # *** Proceed only if clear appeared successful (didn't raise error) ***
-                    if cleared_successfully:
-                        # --- Proceed with fetching and writing chunks ---
-                        logger.info(f"[Task {task_id}] Performing chunked load for {schema_name}.{table_name}...")
-                        chunk_iterator = source_connector.perform_initial_load_chunk(
-                            schema_name=schema_name,
-                            table_name=table_name,
-                            chunk_size=1000
-                        )
+                    if loader:
+                        if saved_progress and saved_progress.get('ranges'):
+                            # Rows of finished ranges stay; unfinished ranges were rolled back
+                            logger.info(f"[Task {task_id}] Resuming {table_key}: "
+                                        f"{len(saved_progress.get('done') or [])} range(s) already loaded.")
+                        _defer_table_indexes(table_key, table_name)
+
+                        def save_progress(progress, key=table_key):
+                            load_progress[key] = {**(load_progress.get(key) or {}), **progress}
+                            task.load_progress = dict(load_progress)
+                            db.session.commit()
+                        try:
+                            final_progress = loader.load_table(source_connector, schema_name, table_name,
+                                                               target_schema_name, saved_progress, save_progress)
+                        except LoadStopped:
+                            logger.info(f"[Task {task_id}] Stop requested during parallel load of {table_key}.")
+                            stop_requested = True
+                            break
+                        save_progress({**final_progress, 'complete': True})
+                        continue
+
+                    # The target table was cleared with the others before the loop
+                    _defer_table_indexes(table_key, table_name)
+
+                    # --- Proceed with fetching and writing chunks ---
+                    logger.info(f"[Task {task_id}] Performing chunked load for {schema_name}.{table_name}...")
+                    chunk_iterator = source_connector.perform_initial_load_chunk(
+                        schema_name=schema_name,
+                        table_name=table_name,
+                        chunk_size=load_chunk_size
+                    )
 
                     chunk_count = 0
                     for chunk in chunk_iterator:
@@ -191,21 +299,75 @@ def run_replication(self, task_id: int):
                               logger.debug(f"[Task {task_id}] Writing initial load chunk {chunk_count}...")
                               target_connector.write_initial_load_chunk(target_schema_name, table_name, chunk)
                     if stop_requested: break # Break outer table loop
+                    # A restart skips this table instead of clearing and reloading it
+                    load_progress[table_key] = {**(load_progress.get(table_key) or {}), 'complete': True}
+                    task.load_progress = dict(load_progress)
+                    db.session.commit()
 
                 if stop_requested:
                      logger.info(f"[Task {task_id}] Initial load stopped prematurely by request.")
                      raise Exception("Task stopped during initial load by user request.")
                 else:
+                    to_rebuild = [(target_schema_name, key.split('.', 1)[1], progress['deferred_indexes'])
+                                  for key, progress in load_progress.items()
+                                  if progress.get('deferred_indexes') and not progress.get('indexes_rebuilt')]
+                    if to_rebuild:
+                        def index_progress(schema, table_name, done, total):
+                            key = next(k for k in load_progress if k.split('.', 1)[1] == table_name)
+                            load_progress[key] = {**load_progress[key], 'indexes_done': done,
+                                                  'indexes_total': total, 'indexes_rebuilt': done == total}
+                            task.load_progress = dict(load_progress)
+                            db.session.commit()
+                            logger.info(f"[Task {task_id}] Index rebuild of {schema}.{table_name}: {done}/{total}.")
+
+                        rebuild_deferred_indexes(flask_app, _connected_target, to_rebuild,
+                                                 parallelism=int(task_options.get('index_rebuild_parallelism', 4)),
+                                                 on_progress=index_progress)
                     logger.info(f"[Task {task_id}] Initial load process completed.")
                     # Commit status update (needs context - already have it)
                     task.initial_load = False
+                    task.load_progress = None
                     db.session.commit()
+                    source_connector.set_snapshot(None)
+                    if exactly_once and task.last_position:
+                        # Replace any checkpoint of an earlier run with the position the load leads to
+                        target_connector.apply_changes([], position=task.last_position)
                     logger.info(f"[Task {task_id}] Initial load completion status committed.")
 
             # --- CDC Loop ---
             if not stop_requested:
                 logger.info(f"[Task {task_id}] Starting CDC loop...")
+                # Reflect the target tables now rather than inside the first apply transaction
+                target_connector.prepare_tables([(t['schema'], t['table']) for t in selected_tables])
+                # Compaction doesn't move changes to tables in foreign keys past changes to other rows
+                fk_tables = (target_connector.foreign_key_tables([(t['schema'], t['table']) for t in selected_tables])
+                             if compact else set())
+                # apply_lanes > 1 applies batches over that many target connections, hashed by row key
+                apply_lanes = int(task_options.get('apply_lanes', 1))
+                if apply_lanes > 1:
+                    def _lane_target(lane):
+                        connector = get_target_connector(target_endpoint)
+                        # Staging tables are named after task_id; lanes must not share them.
+                        # Lanes resume from the checkpoint barrier, not from a target checkpoint.
+                        connector.connect({**target_config, 'task_id': f"{task.id}_{lane}", 'checkpoint_table': None})
+                        connector.prepare_tables([(t['schema'], t['table']) for t in selected_tables])
+                        return connector
+
+                    applier = ParallelApplier(flask_app, _lane_target, lanes=apply_lanes)
+                    logger.info(f"[Task {task_id}] Applying changes over {apply_lanes} parallel lanes.")
+                    if exactly_once:
+                        logger.warning(f"[Task {task_id}] exactly_once is not available with apply lanes; "
+                                       f"batches in flight at a stop may be applied again.")
                 last_pos = task.last_position
+                if exactly_once and not applier:
+                    checkpoint = target_connector.read_checkpoint()
+                    if checkpoint and checkpoint != last_pos:
+                        # The target checkpoint is authoritative: it commits with the applied changes
+                        logger.info(f"[Task {task_id}] Resuming from target checkpoint {checkpoint} "
+                                    f"(task position was {last_pos}).")
+                        last_pos = checkpoint
+                        task.last_position = checkpoint
+                        db.session.commit()
                 check_interval_counter = 0
                 while True:
                     check_interval_counter += 1
@@ -217,41 +379,75 @@ def run_replication(self, task_id: int):
                          break
 
                     try:
-                        # Get changes
-                        logger.debug(f"[Task {task_id}] Calling source_connector.get_changes...")
-                        changes, new_pos = source_connector.get_changes(last_pos)
-                        logger.debug(f"[Task {task_id}] get_changes returned {len(changes)} changes.")
-
-                        if changes or (new_pos and new_pos != last_pos):
-                             # Apply changes (connector might use context)
-                             if changes:
-                                 logger.info(f"[Task {task_id}] Applying {len(changes)} change(s).")
-                                 target_connector.apply_changes(changes)
-
-                             # Update metrics & position in task object
-                             metrics = task.metrics or {}
-                             for change in changes:
-                                 op = change.get('operation')
-                                 if op == 'insert': metrics['inserts'] = metrics.get('inserts', 0) + 1
-                                 elif op == 'update': metrics['updates'] = metrics.get('updates', 0) + 1
-                                 elif op == 'delete': metrics['deletes'] = metrics.get('deletes', 0) + 1
-                             metrics['last_updated'] = datetime.now(timezone.utc).isoformat()
-                             task.metrics = metrics
-
-                             if new_pos and new_pos != last_pos:
-                                 last_pos = new_pos
-                                 task.last_position = last_pos
-
-                             # Commit changes (needs context - already have it)
-                             logger.debug(f"[Task {task_id}] Committing metrics and position changes...")
-                             db.session.commit()
-                             logger.debug(f"[Task {task_id}] Commit successful.")
-
-                             if changes: continue # Check for more changes immediately
+                        # Stream changes batch by batch so memory stays flat however far behind we are
+                        logger.debug(f"[Task {task_id}] Calling source_connector.iter_changes...")
+                        had_changes = False
+                        for changes, new_pos in source_connector.iter_changes(last_pos):
+                            logger.debug(f"[Task {task_id}] iter_changes yielded {len(changes)} changes.")
+                            if not changes and not (new_pos and new_pos != last_pos):
+                                continue
+
+                            # Apply changes (connector might use context)
+                            to_apply = compact_changes(changes, fk_tables) if compact else changes
+                            if changes:
+                                logger.info(f"[Task {task_id}] Applying {len(to_apply)} of {len(changes)} change(s).")
+                                had_changes = True
+                            if applier:
+                                # Every batch goes through the lanes so the checkpoint advances in order
+                                applier.submit(to_apply, new_pos)
+                            elif exactly_once and new_pos:
+                                # The changes and the position they lead to commit together on the target
+                                target_connector.apply_changes(to_apply, position=new_pos)
+                            elif to_apply:
+                                target_connector.apply_changes(to_apply)
+
+                            # Update metrics & position in task object (new dict so the JSON column is flagged dirty)
+                            metrics = dict(task.metrics or {})
+                            for change in changes:
+                                op = change.get('operation')
+                                if op == 'insert': metrics['inserts'] = metrics.get('inserts', 0) + 1
+                                elif op == 'update': metrics['updates'] = metrics.get('updates', 0) + 1
+                                elif op == 'delete': metrics['deletes'] = metrics.get('deletes', 0) + 1
+                            if compact and changes:
+                                # Captured vs applied changes; the ratio is captured per applied change
+                                metrics['changes_captured'] = metrics.get('changes_captured', 0) + len(changes)
+                                metrics['changes_applied'] = metrics.get('changes_applied', 0) + len(to_apply)
+                                metrics['compaction_ratio'] = round(
+                                    metrics['changes_captured'] / max(metrics['changes_applied'], 1), 3)
+                            metrics.update((applier or target_connector).get_apply_metrics())
+                            metrics['last_updated'] = datetime.now(timezone.utc).isoformat()
+                            task.metrics = metrics
+
+                            if new_pos and new_pos != last_pos:
+                                last_pos = new_pos
+                                if not applier:
+                                    task.last_position = last_pos
+                            if applier and applier.committed_position():
+                                # Only what every lane has committed is safe to resume from
+                                task.last_position = applier.committed_position()
+
+                            # Commit changes (needs context - already have it)
+                            logger.debug(f"[Task {task_id}] Committing metrics and position changes...")
+                            db.session.commit()
+                            logger.debug(f"[Task {task_id}] Commit successful.")
+
+                            # Stop between batches so a long catch-up can be interrupted
+                            if redis_client and stop_key and redis_client.exists(stop_key):
+                                logger.info(f"[Task {task_id}] Stop requested while streaming changes.")
+                                stop_requested = True
+                                break
+
+                        if stop_requested: break
+                        if had_changes: continue # Check for more changes immediately
+
+                        if applier:
+                            # Idle: let the lanes finish so the checkpoint catches up with last_pos
+                            task.last_position = applier.drain() or task.last_position
+                            db.session.commit()
 
                         # No changes, sleep
-                        logger.debug(f"[Task {task_id}] No changes detected, sleeping...")
-                        time.sleep(5)
+                        logger.debug(f"[Task {task_id}] No changes detected, sleeping {poll_interval}s...")
+                        time.sleep(poll_interval)
 
                     except Exception as loop_exc:
                          logger.error(f"[Task {task_id}] Error within CDC loop processing: {loop_exc}", exc_info=True)
@@ -306,6 +502,18 @@ def run_replication(self, task_id: int):
 
                 logger.info(f"[Task {task_id}] Source connector was not initialized, skipping disconnect.")
 
+            if applier:
+                logger.info(f"[Task {task_id}] Stopping apply lanes...")
+                try:
+                    applier.close()
+                    # Keep the position of batches the lanes committed before stopping
+                    if task and applier.committed_position():
+                        task.last_position = applier.committed_position()
+                        db.session.commit()
+                except Exception as lane_e:
+                    logger.error(f"[Task {task_id}] Error stopping apply lanes: {lane_e}", exc_info=True)
+                    db.session.rollback()
+
             if target_connector:
 
                 logger.info(f"[Task {task_id}] Disconnecting target connector...")
@@ -0,0 +1,41 @@
+import io
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from app.connectors.bulk_format import text_value, write_text_rows
+
+
+def test_null_bool_and_numbers():
+    assert text_value(None) == '\\N'
+    assert text_value(True) == 't'
+    assert text_value(False) == 'f'
+    assert text_value(42) == '42'
+    assert text_value(Decimal('1.50')) == '1.50'
+
+
+def test_text_is_escaped():
+    assert text_value('a\tb\nc\\d\re') == 'a\\tb\\nc\\\\d\\re'
+
+
+def test_temporal_values_are_iso():
+    assert text_value(datetime(2024, 3, 11, 9, 15, 1, 500)) == '2024-03-11T09:15:01.000500'
+    assert text_value(date(2024, 3, 11)) == '2024-03-11'
+    assert text_value(time(9, 15)) == '09:15:00'
+
+
+def test_intervals():
+    assert text_value(timedelta(days=1, hours=2)) == '1 days 7200 seconds'
+    assert text_value(timedelta(seconds=1, microseconds=500)) == '0 days 1.000500 seconds'
+    assert text_value(-timedelta(hours=1)) == '-1 days 82800 seconds'
+
+
+def test_binary_values():
+    assert text_value(b'\x0a\xff') == '\\\\x0aff'
+    assert text_value(b'a\tb', binary_prefix=None) == 'a\\tb'
+
+
+def test_write_text_rows():
+    buffer = io.StringIO()
+    write_text_rows(buffer, [[1, 'a', None], [2, 'b\tc', b'\x01']])
+
+    assert buffer.getvalue() == '1\ta\t\\N\n2\tb\\tc\t\\\\x01\n'
@@ -0,0 +1,79 @@
+from app.services.cdc.compaction import compact_changes
+
+
+def _change(operation, pk, table='T', **after):
+    change = {'operation': operation, 'schema': 'S', 'table': table, 'primary_keys': {'ID': pk}}
+    if operation != 'delete':
+        change['after_data'] = {'ID': pk, **after}
+    return change
+
+
+def _shape(changes):
+    return [(c['table'], c['operation'], c['primary_keys']['ID'], c.get('after_data')) for c in changes]
+
+
+def test_consecutive_changes_collapse():
+    changes = [_change('insert', 1, V='a'), _change('update', 1, V='b'), _change('update', 1, W='c')]
+
+    assert _shape(compact_changes(changes)) == [('T', 'insert', 1, {'ID': 1, 'V': 'b', 'W': 'c'})]
+
+
+def test_insert_then_delete_cancels_out():
+    changes = [_change('insert', 1, V='a'), _change('update', 1, V='b'), _change('delete', 1)]
+
+    assert compact_changes(changes) == []
+
+
+def test_interleaved_rows_collapse_per_key():
+    changes = [_change('update', 'A', V=1), _change('update', 'B', V=1),
+               _change('update', 'A', V=2), _change('update', 'B', V=2)]
+
+    assert _shape(compact_changes(changes)) == [('T', 'update', 'A', {'ID': 'A', 'V': 2}),
+                                                ('T', 'update', 'B', {'ID': 'B', 'V': 2})]
+
+
+def test_net_insert_stays_first_and_net_update_moves_last():
+    changes = [_change('insert', 'A', V=1), _change('update', 'B', V=1),
+               _change('update', 'A', V=2), _change('update', 'C', V=1), _change('update', 'B', V=2)]
+
+    assert _shape(compact_changes(changes)) == [('T', 'insert', 'A', {'ID': 'A', 'V': 2}),
+                                                ('T', 'update', 'C', {'ID': 'C', 'V': 1}),
+                                                ('T', 'update', 'B', {'ID': 'B', 'V': 2})]
+
+
+def test_delete_and_reinsert_are_both_kept():
+    changes = [_change('delete', 1), _change('insert', 1, V='a')]
+
+    assert [c['operation'] for c in compact_changes(changes)] == ['delete', 'insert']
+
+
+def test_key_change_is_a_barrier_for_both_keys():
+    move = {'operation': 'update', 'schema': 'S', 'table': 'T', 'primary_keys': {'ID': 1}, 'after_data': {'ID': 2}}
+    changes = [_change('update', 1, V='a'), _change('update', 2, V='x'), move,
+               _change('update', 1, V='b'), _change('update', 2, V='y')]
+
+    assert len(compact_changes(changes)) == 5
+
+
+def test_raw_sql_is_a_full_barrier():
+    changes = [_change('update', 'A', V=1), {'operation': 'ddl', 'sql': 'ALTER TABLE T ADD X INT'},
+               _change('update', 'A', V=2)]
+
+    assert len(compact_changes(changes)) == 3
+
+
+def test_foreign_key_tables_keep_their_order():
+    parent, child = ('S', 'P'), ('S', 'C')
+    changes = [_change('update', 'A', table='P', V=1), _change('insert', 'X', table='C', P='A'),
+               _change('update', 'A', table='P', V=2)]
+
+    assert len(compact_changes(changes, {parent, child})) == 3
+    assert len(compact_changes(changes)) == 2
+
+
+def test_input_is_not_modified():
+    changes = [_change('insert', 1, V='a'), _change('update', 1, V='b')]
+
+    compact_changes(changes)
+
+    assert changes[0]['after_data'] == {'ID': 1, 'V': 'a'}
@@ -0,0 +1,72 @@
+from app.services.cdc.log_registry import OPEN_ENDED_SCN, RedoLogRegistry
+
+
+class FakeCursor:
+    """Answers the catalog queries of RedoLogRegistry.sync and records ADD/REMOVE_LOGFILE calls."""
+
+    def __init__(self, archived, online):
+        self.archived = archived
+        self.online = online
+        self.calls = []
+        self._result = []
+
+    def execute(self, sql, binds=None):
+        if 'v$archived_log' in sql:
+            self._result = [row for row in self.archived
+                            if row[4] > binds['start_scn'] and row[1] > binds['since_seq']]
+        elif 'v$log ' in sql:
+            self._result = list(self.online)
+        elif 'ADD_LOGFILE' in sql:
+            self.calls.append(('add', binds['log_name'], 'NEW' in sql))
+        elif 'REMOVE_LOGFILE' in sql:
+            self.calls.append(('remove', binds['log_name']))
+
+    def fetchall(self):
+        return self._result
+
+
+def test_sync_registers_archived_and_online_logs():
+    cursor = FakeCursor(archived=[(1, 10, 'arc10', 100, 200), (1, 11, 'arc11', 200, 300)],
+                        online=[(1, 12, 'redo12', 300, OPEN_ENDED_SCN)])
+    registry = RedoLogRegistry()
+
+    assert registry.sync(cursor, 150) == 3
+    assert cursor.calls == [('add', 'arc10', True), ('add', 'arc11', False), ('add', 'redo12', False)]
+    assert registry.oldest_scn() == 100
+    assert registry.covers(150)
+    assert not registry.covers(50)
+
+
+def test_gap_is_not_covered():
+    cursor = FakeCursor(archived=[(1, 10, 'arc10', 100, 200), (1, 12, 'arc12', 300, 400)], online=[])
+    registry = RedoLogRegistry()
+    registry.sync(cursor, 0)
+
+    assert not registry.covers(150)
+
+
+def test_resync_only_adds_new_logs_and_swaps_archived_online_logs():
+    cursor = FakeCursor(archived=[(1, 10, 'arc10', 100, 200)], online=[(1, 11, 'redo11', 200, OPEN_ENDED_SCN)])
+    registry = RedoLogRegistry()
+    registry.sync(cursor, 0)
+    cursor.calls.clear()
+
+    # Sequence 11 was archived and 12 is the new current log
+    cursor.archived.append((1, 11, 'arc11', 200, 300))
+    cursor.online = [(1, 12, 'redo12', 300, OPEN_ENDED_SCN)]
+
+    assert registry.sync(cursor, 0) == 2
+    assert cursor.calls == [('remove', 'redo11'), ('add', 'arc11', False), ('add', 'redo12', False)]
+    assert [log.name for log in registry.registered()] == ['arc10', 'arc11', 'redo12']
+
+
+def test_prune_removes_fully_mined_archived_logs():
+    cursor = FakeCursor(archived=[(1, 10, 'arc10', 100, 200), (1, 11, 'arc11', 200, 300)],
+                        online=[(1, 12, 'redo12', 300, OPEN_ENDED_SCN)])
+    registry = RedoLogRegistry()
+    registry.sync(cursor, 0)
+    cursor.calls.clear()
+
+    assert registry.prune(cursor, 250) == 1
+    assert cursor.calls == [('remove', 'arc10')]
+    assert len(registry) == 2
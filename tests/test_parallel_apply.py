@@ -0,0 +1,128 @@
+import threading
+import time
+import zlib
+
+import pytest
+from flask import Flask
+
+from app.services.cdc.compaction import _row_key
+from app.services.cdc.parallel_apply import ParallelApplier
+
+
+class FakeTarget:
+    """Records applied changes in one log shared by all lanes; a lane can be held back."""
+
+    def __init__(self, lane, log, lock, gates):
+        self.lane = lane
+        self.log = log
+        self.lock = lock
+        self.gates = gates
+
+    def apply_changes(self, changes, position=None):
+        gate = self.gates.get(self.lane)
+        if gate is not None:
+            gate.wait(timeout=5)
+        with self.lock:
+            self.log.extend((self.lane, change['id']) for change in changes)
+        if any(change.get('fail') for change in changes):
+            raise RuntimeError('target rejected the batch')
+
+    def get_apply_metrics(self):
+        return {'rejected_rows': self.lane}
+
+    def disconnect(self):
+        pass
+
+
+@pytest.fixture
+def lanes():
+    log, lock, gates = [], threading.Lock(), {}
+    appliers = []
+
+    def make(count=2):
+        applier = ParallelApplier(Flask(__name__), lambda lane: FakeTarget(lane, log, lock, gates), lanes=count)
+        appliers.append(applier)
+        return applier
+
+    yield make, log, gates
+    for applier in appliers:
+        applier.close()
+
+
+def _change(pk, id_, **extra):
+    return {'operation': 'update', 'schema': 'S', 'table': 'T', 'primary_keys': {'ID': pk},
+            'after_data': {'ID': pk}, 'id': id_, **extra}
+
+
+def _key_per_lane(applier):
+    """One primary key routed to each lane, by the applier's own hash."""
+    keys = {}
+    pk = 0
+    while len(keys) < applier.lanes:
+        keys.setdefault(zlib.crc32(repr(_row_key(_change(pk, None))).encode()) % applier.lanes, pk)
+        pk += 1
+    return keys
+
+
+def test_changes_to_one_row_stay_in_order(lanes):
+    make, log, _ = lanes
+    applier = make(4)
+    for batch in range(5):
+        applier.submit([_change(pk, (batch, pk)) for pk in range(20)], {'scn': batch})
+
+    assert applier.drain() == {'scn': 4}
+    for pk in range(20):
+        assert [id_[0] for _, id_ in log if id_[1] == pk] == list(range(5))
+
+
+def test_checkpoint_waits_for_every_lane(lanes):
+    make, _, gates = lanes
+    applier = make(2)
+    keys = _key_per_lane(applier)
+    gates[1] = threading.Event()
+
+    applier.submit([_change(keys[0], 'a'), _change(keys[1], 'b')], {'scn': 1})
+    applier.submit([_change(keys[0], 'c')], {'scn': 2})
+
+    # Lane 0 is done with both batches, lane 1 is still on the first one
+    time.sleep(0.3)
+    assert applier.committed_position() is None
+
+    gates[1].set()
+    assert applier.drain() == {'scn': 2}
+
+
+def test_keyless_change_is_a_barrier_across_lanes(lanes):
+    make, log, gates = lanes
+    applier = make(2)
+    keys = _key_per_lane(applier)
+    gates[1] = threading.Event()
+    threading.Timer(0.3, gates[1].set).start()
+
+    applier.submit([_change(keys[0], 'before0'), _change(keys[1], 'before1')], {'scn': 1})
+    applier.submit([{'operation': 'ddl', 'sql': 'ALTER TABLE T ADD X INT', 'id': 'barrier'}], {'scn': 2})
+    applier.submit([_change(keys[0], 'after0'), _change(keys[1], 'after1')], {'scn': 3})
+
+    assert applier.drain() == {'scn': 3}
+    order = [id_ for _, id_ in log]
+    assert order.index('barrier') > max(order.index('before0'), order.index('before1'))
+    assert order.index('barrier') < min(order.index('after0'), order.index('after1'))
+
+
+def test_lane_failure_is_raised_and_checkpoint_stays(lanes):
+    make, _, _ = lanes
+    applier = make(2)
+    applier.submit([_change(1, 'ok')], {'scn': 1})
+    applier.drain()
+    applier.submit([_change(1, 'bad', fail=True)], {'scn': 2})
+
+    with pytest.raises(RuntimeError, match='lane failed'):
+        applier.drain()
+    assert applier.committed_position() == {'scn': 1}
+
+
+def test_metrics_are_added_up(lanes):
+    make, _, _ = lanes
+    applier = make(3)
+
+    assert applier.get_apply_metrics() == {'rejected_rows': 0 + 1 + 2}
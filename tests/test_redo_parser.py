@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.cdc.redo_parser import RedoParseError, RedoSqlParser
+
+
+@pytest.fixture
+def parser():
+    return RedoSqlParser()
+
+
+def test_compact_insert(parser):
+    change = parser.parse('insert into "HR"."EMP"("ID","NAME") values (\'1\',\'O\'\'Neil\');',
+                          primary_key_columns=['ID'])
+
+    assert change['operation'] == 'insert'
+    assert (change['schema'], change['table']) == ('HR', 'EMP')
+    assert change['after_data'] == {'ID': '1', 'NAME': "O'Neil"}
+    assert change['primary_keys'] == {'ID': '1'}
+
+
+def test_pretty_insert(parser):
+    change = parser.parse('insert into "HR"."EMP"\n values\n    "ID" = 1,\n    "NAME" = \'Bob\';')
+
+    # Numbers stay text, as LogMiner renders them
+    assert change['after_data'] == {'ID': '1', 'NAME': 'Bob'}
+
+
+def test_update_merges_where_clause_into_after_image(parser):
+    change = parser.parse('update "HR"."EMP" set "NAME" = \'Al\' where "ID" = \'1\' and "NAME" = \'Bob\' '
+                          'and ROWID = \'AAAR5kAAMAAAADNAAJ\';', primary_key_columns=['ID'])
+
+    assert change['before_data'] == {'ID': '1', 'NAME': 'Bob'}
+    assert change['after_data'] == {'ID': '1', 'NAME': 'Al'}
+    assert change['primary_keys'] == {'ID': '1'}
+    assert change['row_id'] == 'AAAR5kAAMAAAADNAAJ'
+
+
+def test_delete_with_null_condition(parser):
+    change = parser.parse('delete from "HR"."EMP" where "ID" = \'1\' and "NAME" IS NULL;', primary_key_columns=['ID'])
+
+    assert change['operation'] == 'delete'
+    assert change['before_data'] == {'ID': '1', 'NAME': None}
+
+
+def test_to_date_and_hextoraw(parser):
+    change = parser.parse('insert into "S"."T"("D","B") values '
+                          '(TO_DATE(\'2024-03-11 09:15:00\', \'YYYY-MM-DD HH24:MI:SS\'),HEXTORAW(\'0a1b\'));')
+
+    assert change['after_data'] == {'D': datetime(2024, 3, 11, 9, 15), 'B': b'\x0a\x1b'}
+
+
+def test_timestamp_with_region_name(parser):
+    change = parser.parse('insert into "S"."T"("TS") values (TO_TIMESTAMP_TZ('
+                          '\'2024-03-11 09:15:01.500000 EUROPE/PARIS\', \'YYYY-MM-DD HH24:MI:SS.FF TZR\'));')
+
+    value = change['after_data']['TS']
+    assert value.replace(tzinfo=None) == datetime(2024, 3, 11, 9, 15, 1, 500000)
+    assert value.utcoffset() == timedelta(hours=1)
+
+
+def test_timestamp_with_offset(parser):
+    change = parser.parse('insert into "S"."T"("TS") values (TO_TIMESTAMP_TZ('
+                          '\'2024-03-11 09:15:01 -05:30\', \'YYYY-MM-DD HH24:MI:SS TZR\'));')
+
+    assert change['after_data']['TS'] == datetime(2024, 3, 11, 9, 15, 1,
+                                                  tzinfo=timezone(-timedelta(hours=5, minutes=30)))
+
+
+def test_unistr(parser):
+    change = parser.parse('insert into "S"."T"("N") values (UNISTR(\'caf\\00e9 \\d83d\\de00 a\\\\b\'));')
+
+    assert change['after_data']['N'] == 'café \U0001F600 a\\b'
+
+
+def test_ds_interval(parser):
+    change = parser.parse('insert into "S"."T"("I") values (TO_DSINTERVAL(\'-01 02:03:04.5\'));')
+
+    assert change['after_data']['I'] == -timedelta(days=1, hours=2, minutes=3, seconds=4, microseconds=500000)
+
+
+def test_unsupported_function_raises(parser):
+    with pytest.raises(RedoParseError):
+        parser.parse('insert into "S"."T"("X") values (SOMETHING(\'1\'));')
+
+
+def test_truncated_statement_raises(parser):
+    with pytest.raises(RedoParseError):
+        parser.parse('insert into "S"."T"("X") values (')
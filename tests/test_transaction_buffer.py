@@ -0,0 +1,75 @@
+import os
+
+from app.services.cdc.transaction_buffer import TransactionBuffer
+
+
+def _events(xid, n):
+    return [{'xid': xid, 'i': i} for i in range(n)]
+
+
+def test_commit_yields_events_in_order_and_forgets_the_transaction():
+    buffer = TransactionBuffer()
+    buffer.begin('T1', 10)
+    for event in _events('T1', 3):
+        buffer.add('T1', 11, event)
+
+    assert buffer.size('T1') == 3
+    assert list(buffer.commit('T1')) == _events('T1', 3)
+    assert buffer.open_transactions == 0
+    assert buffer.buffered_events == 0
+
+
+def test_rollback_discards_the_transaction():
+    buffer = TransactionBuffer()
+    buffer.begin('T1', 10)
+    buffer.add('T1', 11, {'i': 0})
+    buffer.discard('T1')
+
+    assert list(buffer.commit('T1')) == []
+    assert buffer.open_transactions == 0
+
+
+def test_large_transaction_spills_and_commits_in_order(tmp_path):
+    buffer = TransactionBuffer(spill_threshold=4, spill_dir=str(tmp_path))
+    buffer.begin('T1', 10)
+    for event in _events('T1', 10):
+        buffer.add('T1', 11, event)
+
+    assert buffer.size('T1') == 10
+    assert buffer.buffered_events == 2
+    assert len(os.listdir(tmp_path)) == 1
+
+    assert list(buffer.commit('T1')) == _events('T1', 10)
+    buffer.clear()
+    assert os.listdir(tmp_path) == []
+
+
+def test_memory_bound_spills_the_largest_transaction(tmp_path):
+    buffer = TransactionBuffer(spill_threshold=100, max_buffered_events=5, spill_dir=str(tmp_path))
+    for event in _events('BIG', 4):
+        buffer.add('BIG', 10, event)
+    buffer.add('SMALL', 11, {'i': 0})
+    buffer.add('SMALL', 11, {'i': 1})
+
+    assert buffer.buffered_events == 2
+    assert list(buffer.commit('BIG')) == _events('BIG', 4)
+    assert list(buffer.commit('SMALL')) == [{'i': 0}, {'i': 1}]
+
+
+def test_rollback_removes_spill_file(tmp_path):
+    buffer = TransactionBuffer(spill_threshold=2, spill_dir=str(tmp_path))
+    for event in _events('T1', 3):
+        buffer.add('T1', 10, event)
+    buffer.discard('T1')
+
+    assert all(not names for _, _, names in os.walk(tmp_path))
+
+
+def test_oldest_open_scn():
+    buffer = TransactionBuffer()
+    assert buffer.oldest_open_scn() is None
+    buffer.begin('T1', 20)
+    buffer.add('T2', 15, {'i': 0})  # started before mining did
+
+    assert buffer.oldest_open_scn() == 15
+    assert buffer.oldest_open_scn(exclude='T2') == 20